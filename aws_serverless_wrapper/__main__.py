@@ -11,6 +11,61 @@ def check_wrapper_config(wrapper_config_file):
     SchemaValidator(file=validation_file).validate(wrapper_config)
 
 
+def render_embedded_wrapper_config_schema() -> str:
+    """source of _wrapper_config_schema.py with references made local to the embedded schema"""
+    from os.path import dirname, realpath
+    from json import load, dumps, loads
+    from pprint import pformat
+
+    with open(f"{dirname(realpath(__file__))}/wrapper_config_schema.json", "r") as f:
+        schema = loads(dumps(load(f)).replace('"wrapper_config_schema.json#', '"#'))
+
+    return (
+        '"""\n'
+        "wrapper_config_schema.json embedded as python literal (no file access and json parsing on a cold start)\n"
+        "generated by `python -m aws_serverless_wrapper --embed-wrapper-config-schema`, do not edit\n"
+        '"""\n\n'
+        f"wrapper_config_schema = {pformat(schema, sort_dicts=False, width=120)}\n"
+    )
+
+
+def embed_wrapper_config_schema():
+    from os.path import dirname, realpath
+
+    with open(f"{dirname(realpath(__file__))}/_wrapper_config_schema.py", "w") as f:
+        f.write(render_embedded_wrapper_config_schema())
+
+
+def import_time_report(module: str = "aws_serverless_wrapper.serverless_handler") -> list:
+    """
+    imports module in a fresh interpreter with `-X importtime`
+    returns [(imported_module, self_us, cumulative_us), ...] of all modules not already loaded at interpreter start
+    sorted by cumulative time
+    """
+    from subprocess import run
+    from sys import executable
+
+    def imported_modules(code):
+        process = run([executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True)
+        for line in process.stderr.splitlines():
+            if line.startswith("import time:") and "[us]" not in line:
+                self_us, cumulative_us, imported_module = line[len("import time:"):].split("|")
+                yield imported_module.strip(), int(self_us), int(cumulative_us)
+
+    preloaded = {i[0] for i in imported_modules("pass")}
+    report = [i for i in imported_modules(f"import {module}") if i[0] not in preloaded]
+    return sorted(report, key=lambda i: i[2], reverse=True)
+
+
+def print_import_time_report(limit: int = 25):
+    report = import_time_report()
+
+    print(f"\n\t\tcold start import of aws_serverless_wrapper: {sum(i[1] for i in report) / 1000:.1f} ms\n")
+    print(f"{'module':<60}{'self [ms]':>12}{'cumulative [ms]':>18}")
+    for imported_module, self_us, cumulative_us in report[:limit]:
+        print(f"{imported_module:<60}{self_us / 1000:>12.1f}{cumulative_us / 1000:>18.1f}")
+
+
 if __name__ == "__main__":
     from argparse import ArgumentParser
 
@@ -21,9 +76,26 @@ if __name__ == "__main__":
         type=str,
         help="specify at least one configuration file to check the schema for",
     )
+    parser.add_argument(
+        "--embed-wrapper-config-schema",
+        action="store_true",
+        help="regenerate the embedded wrapper config schema after changing wrapper_config_schema.json",
+    )
+    parser.add_argument(
+        "--import-time",
+        action="store_true",
+        help="report the time spent on importing the wrapper at a cold start",
+    )
     args = parser.parse_args()
 
-    for file in args.wrapper_config_check:
-        check_wrapper_config(file)
+    if args.embed_wrapper_config_schema:
+        embed_wrapper_config_schema()
+
+    if args.import_time:
+        print_import_time_report()
+
+    if args.wrapper_config_check:
+        for file in args.wrapper_config_check:
+            check_wrapper_config(file)
 
-    print("\n\t\tSUCCESS\n\tyour configurations are correct\n")
+        print("\n\t\tSUCCESS\n\tyour configurations are correct\n")
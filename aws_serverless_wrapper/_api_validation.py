@@ -0,0 +1,225 @@
+import logging
+from collections import OrderedDict
+from os import stat
+from os.path import abspath
+from ._environ_variables import environ
+
+__all__ = ["verify_api_input", "verify_api_response", "validator_cache", "ValidatorCache"]
+
+response_logger = logging.getLogger("API Response Check")
+
+
+class ValidatorCache:
+    """
+    per-container LRU cache of schema validators keyed by (api_name, httpMethod, direction, origin)
+    entries originating from a file are invalidated as soon as the file's mtime changes,
+    a missing file is cached as well (until it is created)
+    only the mtime of the schema file itself is checked, changes of files it references by $ref
+    are not noticed until its entry is evicted or the container is replaced
+    """
+
+    default_maxsize = 64
+
+    def __init__(self, maxsize: int = None):
+        self.__maxsize = maxsize
+        self.__entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self) -> int:
+        if self.__maxsize is not None:
+            return self.__maxsize
+        if isinstance(maxsize := environ.snapshot.VALIDATOR_CACHE_SIZE, int):
+            return maxsize
+        return self.default_maxsize
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __contains__(self, key):
+        return key in self.__entries
+
+    def clear(self):
+        self.__entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self), "maxsize": self.maxsize}
+
+    def get(self, key: tuple, origin_type: str, origin):
+        """returns the cached validator for key or loads it from origin (raises FileNotFoundError)"""
+        if key in self.__entries:
+            validator, file_name, mtime = self.__entries[key]
+            if file_name is None or _mtime(file_name) == mtime:
+                self.__entries.move_to_end(key)
+                self.hits += 1
+                if validator is None:
+                    raise FileNotFoundError(file_name)
+                return validator
+            del self.__entries[key]
+
+        self.misses += 1
+        try:
+            validator, file_name, mtime = _load_validator(origin_type, origin)
+        except FileNotFoundError:
+            if origin_type != "file":
+                raise
+            # the missing file is cached as validator None with mtime None (until the file exists)
+            validator, file_name, mtime = None, _schema_file(origin), None
+        self.__entries[key] = (validator, file_name, mtime)
+        while len(self.__entries) > self.maxsize:
+            self.__entries.popitem(last=False)
+        if validator is None:
+            raise FileNotFoundError(file_name)
+        return validator
+
+
+def _mtime(file_name):
+    try:
+        return stat(file_name).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _schema_file(origin) -> str:
+    return abspath(origin if origin.endswith(".json") else origin + ".json")
+
+
+def _load_validator(origin_type, origin):
+    from aws_schema import SchemaValidator
+    from ._compiled_schema import CompiledValidator
+
+    if origin_type == "file":
+        file_name = _schema_file(origin)
+        mtime = _mtime(file_name)
+        return SchemaValidator(file=file_name, custom_validator=CompiledValidator), file_name, mtime
+    return SchemaValidator(**{origin_type: origin}, custom_validator=CompiledValidator), None, None
+
+
+def _craft_origin(origin, api_name, specifics: list):
+    if origin[-1] == "/":
+        origin += "||".join(i for i in api_name.split("/") if i)
+
+    if specifics[0] not in origin:
+        if ".json" == origin[-5:]:
+            origin = origin[:-5]
+        origin += "-" + "-".join(specifics) + ".json"
+    elif len(specifics) > 1 and specifics[1] not in origin:
+        if ".json" == origin[-5:]:
+            origin = origin[:-5]
+        origin += "-" + specifics[1] + ".json"
+
+    return origin
+
+
+def _cached_validator(direction, api_name, specifics, origin_type, origin_value):
+    key = (api_name, specifics[0], direction, *specifics[1:], origin_type, str(origin_value))
+    if origin_type in ("file", "url"):
+        origin_value = _craft_origin(origin_value, api_name, specifics)
+    return validator_cache.get(key, origin_type, origin_value)
+
+
+def _constrains_body(schema) -> bool:
+    """if validating against schema requires the parsed body (conservatively True for combined schemas)"""
+    from re import search
+    from ._compiled_schema import accepts_everything
+
+    if not isinstance(schema, dict):
+        return False
+    if any(keyword in schema for keyword in ("$ref", "allOf", "anyOf", "oneOf", "not", "if", "dependencies")):
+        return True
+    if "body" in schema.get("properties", dict()):
+        return not accepts_everything(schema["properties"]["body"])
+    if matching := [sub for pattern, sub in schema.get("patternProperties", dict()).items() if search(pattern, "body")]:
+        return not all(accepts_everything(sub) for sub in matching)
+    return not accepts_everything(schema.get("additionalProperties", True))
+
+
+def verify_api_input(request_data: dict, api_name: str, origin_type: str, origin_value) -> dict:
+    """same behaviour as aws_schema.APIDataValidator but with a cached schema validator"""
+    from aws_schema import APIDataValidator
+    from aws_schema._parameter_casting import cast_parameter
+    from jsonschema.exceptions import ValidationError
+    from ._body_parsing import LazyBodyEvent
+
+    http_method = request_data["httpMethod"] if "httpMethod" in request_data else "nonHTTP"
+
+    try:
+        schema_validator = _cached_validator("request", api_name, [http_method], origin_type, origin_value)
+    except FileNotFoundError:
+        raise NotImplementedError(
+            {
+                "statusCode": 501,
+                "body": "API is not defined",
+                "headers": {"Content-Type": "text/plain"},
+            }
+        )
+
+    if "body" in request_data and dict.get(request_data, "body") is None:
+        del request_data["body"]
+    if http_method != "nonHTTP":
+        for key in ["body", "pathParameters", "multiValueQueryStringParameters"]:
+            if key in request_data and dict.get(request_data, key) is None:
+                request_data[key] = dict()
+        request_data["queryParameters"] = request_data.get("multiValueQueryStringParameters", dict())
+
+    validated_data = request_data
+    if isinstance(request_data, LazyBodyEvent) and not request_data.body_parsed:
+        # form-urlencoded bodies are cast along with the parameters, thus need to be parsed as well
+        if (
+            _constrains_body(schema_validator.schema)
+            or (request_data.get("headers") or dict()).get("content-type") == "application/x-www-form-urlencoded"
+        ):
+            request_data.parse_body()
+        else:
+            # validated with the raw body, the parameters are cast in place (shared with request_data)
+            validated_data = request_data.raw_copy()
+
+    if http_method != "nonHTTP":
+        cast_parameter(validated_data, schema_validator.schema)
+
+    try:
+        schema_validator.validate(validated_data)
+    except ValidationError as err:
+        APIDataValidator.handle_exception(err, True)
+
+    return request_data
+
+
+def verify_api_response(
+    response: dict, http_method: str, api_name: str, origin_type: str, origin_value,
+    return_error_in_response: bool = False
+):
+    """same behaviour as aws_schema.ResponseDataValidator but with a cached schema validator"""
+    from aws_schema import ResponseDataValidator
+    from jsonschema.exceptions import ValidationError
+
+    status_code = str(response["statusCode"])
+
+    try:
+        schema_validator = _cached_validator(
+            "response", api_name, [http_method, status_code], origin_type, origin_value
+        )
+    except FileNotFoundError:
+        exception_text = f"no specified response schema available for statusCode {status_code}\n" \
+                         f"response: {response}"
+        if return_error_in_response:
+            raise NotImplementedError(
+                {
+                    "statusCode": 501,
+                    "body": exception_text,
+                    "headers": {"Content-Type": "text/plain"},
+                }
+            )
+        response_logger.warning(exception_text)
+        return
+
+    try:
+        schema_validator.validate(response)
+    except ValidationError as err:
+        ResponseDataValidator.handle_exception(err, return_error_in_response)
+
+
+validator_cache = ValidatorCache()
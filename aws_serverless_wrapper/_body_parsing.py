@@ -1,12 +1,28 @@
+from ._json_codec import json_codec
+from .media_types import parse_media_type
 
-__all__ = ["parse_body", "ParsingError"]
+__all__ = ["parse_body", "parse_body_lazily", "LazyBodyEvent", "ParsingError"]
 
 
 class ParsingError(ValueError):
     pass
 
 
-def text_plain(data, _=None):
+binary_types = (bytes, bytearray, memoryview)
+
+
+def _text(data, encoding="utf-8"):
+    """decoded base64 bodies are bytes, text parsers need them as str"""
+    if isinstance(data, binary_types):
+        try:
+            return str(data, encoding)
+        except UnicodeDecodeError:
+            pass
+    return data
+
+
+def text_plain(data, encoding="utf-8"):
+    data = _text(data, encoding)
     if not isinstance(data, str):
         raise ParsingError(
             {
@@ -19,11 +35,10 @@ def text_plain(data, _=None):
 
 
 def application_json(data, _=None):
-    if isinstance(data, str):
-        from json import loads, JSONDecodeError
+    if isinstance(data, (str, bytes, bytearray)):
         try:
-            return loads(data)
-        except (JSONDecodeError, TypeError):
+            return json_codec.loads(data)
+        except (ValueError, TypeError):
             raise ParsingError(
                 {
                     "statusCode": 400,
@@ -32,11 +47,11 @@ def application_json(data, _=None):
                 }
             )
     else:
-        from json import dumps
-        return dumps(data)
+        return json_codec.dumps(data)
 
 
 def application_x_www_form_urlencoded(data, encoding="utf-8"):
+    data = _text(data, encoding)
     try:
         if isinstance(data, str):
             from urllib.parse import parse_qs
@@ -57,33 +72,219 @@ def application_x_www_form_urlencoded(data, encoding="utf-8"):
         )
 
 
-ContentTypeSwitch = {
+def application_octet_stream(data, encoding="utf-8"):
+    """binary data is passed on as it is (bytes, bytearray or memoryview), thus without being copied"""
+    if isinstance(data, str):
+        return data.encode(encoding)
+    return data
+
+
+class CodecRegistry(dict):
+    """
+    media type (application/json), suffix (+json) or wildcard (image/*) -> codec
+    the resolution per Content-Type header value is cached and reset when the registry changes
+    """
+
+    max_resolved = 256
+
+    def __init__(self, codecs: dict):
+        super().__init__(codecs)
+        self.__resolved = dict()
+
+    def __setitem__(self, media_type, codec):
+        dict.__setitem__(self, media_type, codec)
+        self.__resolved.clear()
+
+    def __delitem__(self, media_type):
+        dict.__delitem__(self, media_type)
+        self.__resolved.clear()
+
+    def resolve(self, content_type: str):
+        try:
+            return self.__resolved[content_type]
+        except KeyError:
+            pass
+
+        media_type = parse_media_type(content_type)
+        for key in (media_type.essence, media_type.suffix and f"+{media_type.suffix}", f"{media_type.type}/*"):
+            if key in self:
+                if len(self.__resolved) >= self.max_resolved:
+                    self.__resolved.clear()
+                codec = self.__resolved[content_type] = self[key]
+                return codec
+        raise _content_type_not_implemented(content_type)
+
+
+ContentTypeSwitch = CodecRegistry({
     "text/plain": text_plain,
     "application/json": application_json,
-    "application/x-www-form-urlencoded": application_x_www_form_urlencoded
-}
+    "+json": application_json,
+    "application/x-www-form-urlencoded": application_x_www_form_urlencoded,
+    "application/octet-stream": application_octet_stream,
+    "application/pdf": application_octet_stream,
+    "application/zip": application_octet_stream,
+    "image/*": application_octet_stream,
+    "audio/*": application_octet_stream,
+    "video/*": application_octet_stream,
+})
 
 
-def parse_body(event_or_response, encoding="utf-8"):
-    if "body" not in event_or_response or event_or_response["body"] is None:
-        return event_or_response
+def _base64_decoded(parser):
+    """the base64 body is decoded once into bytes, the parser gets them directly"""
+    from binascii import a2b_base64, Error
+
+    def parse(data, encoding):
+        if isinstance(data, str):
+            try:
+                data = a2b_base64(data)
+            except (Error, ValueError):
+                raise ParsingError(
+                    {
+                        "statusCode": 400,
+                        "body": "Body has to be base64 encoded",
+                        "headers": {"Content-Type": "text/plain"},
+                    }
+                )
+        return parser(data, encoding)
 
+    return parse
+
+
+def _base64_encoded(response: dict) -> dict:
+    from binascii import b2a_base64
+
+    response["body"] = b2a_base64(response["body"], newline=False).decode("ascii")
+    response["isBase64Encoded"] = True
+    return response
+
+
+def _content_type(event_or_response) -> str:
     if "headers" in event_or_response and "content-type" in event_or_response["headers"]:
-        content_type = event_or_response["headers"]["content-type"]
+        return event_or_response["headers"]["content-type"]
     elif "headers" in event_or_response and "Content-Type" in event_or_response["headers"]:
-        content_type = event_or_response["headers"]["Content-Type"]
+        return event_or_response["headers"]["Content-Type"]
     else:
         raise ParsingError("Content-Type must either be defined by header in event or by parameter")
 
-    encoding = encoding.lower()
-    try:
-        event_or_response["body"] = ContentTypeSwitch[content_type](event_or_response["body"], encoding)
-    except KeyError as KE:
-        raise NotImplementedError(
-            {
-                "statusCode": 501,
-                "body": f"parsing of Content-Type {KE} not implemented",
-                "headers": {"Content-Type": "text/plain"}
-            }
-        )
+
+def _content_type_not_implemented(content_type) -> NotImplementedError:
+    return NotImplementedError(
+        {
+            "statusCode": 501,
+            "body": f"parsing of Content-Type {KeyError(content_type)} not implemented",
+            "headers": {"Content-Type": "text/plain"}
+        }
+    )
+
+
+def parse_body(event_or_response, encoding="utf-8", response=False):
+    """
+    request: a body flagged with isBase64Encoded gets decoded before parsing
+    response: a binary body (bytes, bytearray, memoryview) gets base64 encoded (and flagged with isBase64Encoded)
+    """
+    if "body" not in event_or_response or event_or_response["body"] is None:
+        return event_or_response
+
+    if response and event_or_response.get("isBase64Encoded") and isinstance(event_or_response["body"], str):
+        return event_or_response
+    if response and isinstance(event_or_response["body"], binary_types):
+        # already serialized, codecs loading str and bytes (e.g. application/json) must not parse it
+        return _base64_encoded(event_or_response)
+
+    content_type = _content_type(event_or_response)
+    parser = ContentTypeSwitch.resolve(content_type)
+    if not response and event_or_response.get("isBase64Encoded"):
+        parser = _base64_decoded(parser)
+
+    encoding = parse_media_type(content_type).charset or encoding.lower()
+    event_or_response["body"] = parser(event_or_response["body"], encoding)
+    if response and isinstance(event_or_response["body"], binary_types):
+        return _base64_encoded(event_or_response)
     return event_or_response
+
+
+class LazyBodyEvent(dict):
+    """
+    event whose body gets parsed on first access of event["body"] (and cached)
+    a ParsingError is raised at the access, thus resulting in the same 400 response as parsing upfront
+    """
+
+    def __init__(self, event: dict, parser, encoding: str):
+        super().__init__(event)
+        self.__parser = parser
+        self.__encoding = encoding
+        self.__parsed = False
+
+    @property
+    def body_parsed(self) -> bool:
+        return self.__parsed
+
+    @property
+    def raw_body(self):
+        return dict.get(self, "body")
+
+    def raw_copy(self) -> dict:
+        """shallow copy with the body as it is (thus without parsing it)"""
+        return dict(dict.items(self))
+
+    def parse_body(self):
+        if not self.__parsed:
+            dict.__setitem__(self, "body", self.__parser(dict.__getitem__(self, "body"), self.__encoding))
+            self.__parsed = True
+        return self
+
+    def __getitem__(self, key):
+        if key == "body":
+            self.parse_body()
+        return dict.__getitem__(self, key)
+
+    def __setitem__(self, key, value):
+        if key == "body":
+            self.__parsed = True
+        dict.__setitem__(self, key, value)
+
+    def get(self, key, default=None):
+        if key == "body" and key in self:
+            self.parse_body()
+        return dict.get(self, key, default)
+
+    def pop(self, key, *default):
+        if key == "body" and key in self:
+            self.parse_body()
+        return dict.pop(self, key, *default)
+
+    def __iter__(self):
+        # overridden for dict(event) and {**event} not taking the fast path of CPython, which skips __getitem__
+        return dict.__iter__(self)
+
+    def keys(self):
+        return dict.keys(self)
+
+    def items(self):
+        return dict.items(self.parse_body())
+
+    def values(self):
+        return dict.values(self.parse_body())
+
+    def copy(self) -> dict:
+        return dict.copy(self.parse_body())
+
+    def __eq__(self, other):
+        return dict.__eq__(self.parse_body(), other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+
+def parse_body_lazily(event, encoding="utf-8"):
+    """as parse_body for the request, but the body only gets parsed when accessed"""
+    if "body" not in event or event["body"] is None:
+        return event
+
+    content_type = _content_type(event)
+    parser = ContentTypeSwitch.resolve(content_type)
+    if event.get("isBase64Encoded"):
+        parser = _base64_decoded(parser)
+    return LazyBodyEvent(event, parser, parse_media_type(content_type).charset or encoding.lower())
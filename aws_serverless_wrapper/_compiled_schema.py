@@ -0,0 +1,433 @@
+"""
+JSON schema (draft 7) validation by generated python code
+
+Every schema is translated once into specialized python functions (in the style of fastjsonschema),
+which only answer whether an instance is valid. Only if it is not, the instance gets validated again by
+jsonschema's Draft7Validator for raising the very same ValidationError as before.
+Parts of a schema which can not be compiled (e.g. unresolvable $ref) are delegated to jsonschema.
+"""
+from collections import OrderedDict
+from json import dumps
+from numbers import Number
+from re import compile as re_compile
+
+__all__ = ["CompiledValidator", "compile_schema", "accepts_everything"]
+
+_keywords = {
+    "$ref", "type", "enum", "const", "allOf", "anyOf", "oneOf", "not", "if",
+    "properties", "required", "patternProperties", "additionalProperties", "dependencies",
+    "propertyNames", "minProperties", "maxProperties",
+    "items", "additionalItems", "contains", "minItems", "maxItems", "uniqueItems",
+    "minLength", "maxLength", "pattern",
+    "minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum", "multipleOf",
+}
+_object_keywords = (
+    "properties", "required", "patternProperties", "additionalProperties", "dependencies",
+    "propertyNames", "minProperties", "maxProperties",
+)
+_array_keywords = ("items", "additionalItems", "contains", "minItems", "maxItems", "uniqueItems")
+_string_keywords = ("minLength", "maxLength", "pattern")
+_number_keywords = ("minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum", "multipleOf")
+
+_type_checks = {
+    "string": "isinstance(data, str)",
+    "object": "isinstance(data, dict)",
+    "array": "isinstance(data, list)",
+    "boolean": "isinstance(data, bool)",
+    "null": "data is None",
+    "number": "_is_number(data)",
+    "integer": "(isinstance(data, int) and not isinstance(data, bool) "
+               "or isinstance(data, float) and data.is_integer())",
+}
+
+
+def accepts_everything(schema) -> bool:
+    """True if schema does not constrain an instance at all (e.g. {} or only annotations like description)"""
+    return schema is True or isinstance(schema, dict) and not _keywords.intersection(schema)
+
+
+class _NotCompilable(Exception):
+    pass
+
+
+def _is_number(data):
+    return isinstance(data, Number) and not isinstance(data, bool)
+
+
+def _unbool(element, true=object(), false=object()):
+    if element is True:
+        return true
+    elif element is False:
+        return false
+    return element
+
+
+def _equal(one, two):
+    if one is two:
+        return True
+    if isinstance(one, str) or isinstance(two, str):
+        return one == two
+    if isinstance(one, (list, tuple)) and isinstance(two, (list, tuple)):
+        return len(one) == len(two) and all(_equal(i, j) for i, j in zip(one, two))
+    if isinstance(one, dict) and isinstance(two, dict):
+        return one.keys() == two.keys() and all(_equal(one[key], two[key]) for key in one)
+    return _unbool(one) == _unbool(two)
+
+
+def _in_enum(data, enum):
+    return any(_equal(each, data) for each in enum)
+
+
+def _unique(container):
+    seen = list()
+    for element in container:
+        element = _unbool(element)
+        if any(_equal(i, element) for i in seen):
+            return False
+        seen.append(element)
+    return True
+
+
+def _multiple_of_failed(data, multiple_of):
+    if isinstance(multiple_of, float):
+        quotient = data / multiple_of
+        try:
+            return int(quotient) != quotient
+        except OverflowError:
+            from fractions import Fraction
+
+            return (Fraction(data) / Fraction(multiple_of)).denominator != 1
+    return data % multiple_of
+
+
+def _valid(_):
+    return True
+
+
+def _invalid(_):
+    return False
+
+
+class _SchemaCompiler:
+    def __init__(self, root, resolver=None):
+        self.root = root
+        self.resolver = resolver
+        self.namespace = {
+            "_is_number": _is_number,
+            "_equal": _equal,
+            "_in_enum": _in_enum,
+            "_unique": _unique,
+            "_multiple_of_failed": _multiple_of_failed,
+            "_valid": _valid,
+            "_invalid": _invalid,
+        }
+        self.functions = dict()
+        self.source = list()
+        self.sub_resource_depth = 0
+        self.__interpreter = None
+
+    def compile(self):
+        name = self.function(self.root)
+        exec("\n".join(self.source), self.namespace)
+        return self.namespace[name]
+
+    def constant(self, value, prefix="_c"):
+        name = f"{prefix}{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def interpreter(self):
+        if self.__interpreter is None:
+            from jsonschema import Draft7Validator
+
+            if self.resolver is not None:
+                self.__interpreter = Draft7Validator(self.root, resolver=self.resolver)
+            else:
+                self.__interpreter = Draft7Validator(self.root)
+        return self.__interpreter
+
+    def deferred(self, node):
+        """validation of node is left to jsonschema (evaluated in the context of the root schema)"""
+        def validate_deferred(data):
+            return self.interpreter().evolve(schema=node).is_valid(data)
+
+        return self.constant(validate_deferred, "_deferred")
+
+    def function(self, node) -> str:
+        if node is True:
+            return "_valid"
+        if node is False:
+            return "_invalid"
+        if not isinstance(node, dict):
+            return self.deferred(node)
+        if accepts_everything(node):
+            return "_valid"
+
+        scope = self.resolver.resolution_scope if self.resolver is not None else None
+        key = (id(node), scope)
+        if key in self.functions:
+            return self.functions[key]
+
+        name = f"_validate{len(self.functions)}"
+        self.functions[key] = name
+
+        pushed_scope = False
+        if isinstance(node.get("$id"), str) and node is not self.root:
+            if self.resolver is not None:
+                self.resolver.push_scope(node["$id"])
+                pushed_scope = True
+            else:
+                self.sub_resource_depth += 1
+        try:
+            body = self.body(node)
+        except _NotCompilable:
+            body = [f"return {self.deferred(node)}(data)"]
+        finally:
+            if pushed_scope:
+                self.resolver.pop_scope()
+            elif isinstance(node.get("$id"), str) and node is not self.root:
+                self.sub_resource_depth -= 1
+
+        self.source.append(f"def {name}(data):")
+        self.source.extend(f"    {line}" for line in body)
+        self.source.append("    return True")
+        self.source.append("")
+        return name
+
+    def reference(self, ref) -> str:
+        if self.resolver is not None:
+            try:
+                url, resolved = self.resolver.resolve(ref)
+            except Exception:
+                raise _NotCompilable(ref)
+            self.resolver.push_scope(url)
+            try:
+                return self.function(resolved)
+            finally:
+                self.resolver.pop_scope()
+
+        if not ref.startswith("#") or self.sub_resource_depth:
+            raise _NotCompilable(ref)
+        resolved = self.root
+        for part in ref[1:].split("/")[1:]:
+            part = part.replace("~1", "/").replace("~0", "~")
+            try:
+                resolved = resolved[int(part) if isinstance(resolved, list) else part]
+            except (KeyError, IndexError, ValueError, TypeError):
+                raise _NotCompilable(ref)
+        return self.function(resolved)
+
+    def body(self, node) -> list:
+        if "$ref" in node:
+            return [f"return {self.reference(node['$ref'])}(data)"]
+
+        lines = list()
+        try:
+            if "type" in node:
+                types = node["type"] if isinstance(node["type"], list) else [node["type"]]
+                lines.append(f"if not ({' or '.join(_type_checks[t] for t in types)}): return False")
+        except (KeyError, TypeError):
+            raise _NotCompilable("type")
+
+        if "enum" in node:
+            enum = node["enum"]
+            if isinstance(enum, list) and enum and all(isinstance(i, str) for i in enum):
+                lines.append(f"if not (isinstance(data, str) and data in {self.constant(frozenset(enum))}): return False")
+            else:
+                lines.append(f"if not _in_enum(data, {self.constant(enum)}): return False")
+        if "const" in node:
+            lines.append(f"if not _equal(data, {self.constant(node['const'])}): return False")
+
+        for sub in node.get("allOf", list()):
+            lines.append(f"if not {self.function(sub)}(data): return False")
+        if "anyOf" in node:
+            calls = " or ".join(f"{self.function(sub)}(data)" for sub in node["anyOf"])
+            lines.append(f"if not ({calls or 'False'}): return False")
+        if "oneOf" in node:
+            calls = " + ".join(f"bool({self.function(sub)}(data))" for sub in node["oneOf"])
+            lines.append(f"if ({calls or '0'}) != 1: return False")
+        if "not" in node:
+            lines.append(f"if {self.function(node['not'])}(data): return False")
+        if "if" in node and ("then" in node or "else" in node):
+            lines.append(f"if {self.function(node['if'])}(data):")
+            lines.append(f"    if not {self.function(node.get('then', True))}(data): return False")
+            lines.append(f"elif not {self.function(node.get('else', True))}(data): return False")
+
+        for keywords, check, block in (
+            (_object_keywords, "isinstance(data, dict)", self.object_block),
+            (_array_keywords, "isinstance(data, list)", self.array_block),
+            (_string_keywords, "isinstance(data, str)", self.string_block),
+            (_number_keywords, "_is_number(data)", self.number_block),
+        ):
+            if any(keyword in node for keyword in keywords):
+                block_lines = block(node)
+                if block_lines:
+                    lines.append(f"if {check}:")
+                    lines.extend(f"    {line}" for line in block_lines)
+        return lines
+
+    def object_block(self, node) -> list:
+        lines = list()
+        properties = node.get("properties", dict())
+        for prop, sub in properties.items():
+            if (validate := self.function(sub)) != "_valid":
+                lines.append(f"if {prop!r} in data and not {validate}(data[{prop!r}]): return False")
+
+        if required := node.get("required", list()):
+            lines.append(f"if not ({' and '.join(f'{prop!r} in data' for prop in required)}): return False")
+
+        for pattern, sub in node.get("patternProperties", dict()).items():
+            if (validate := self.function(sub)) != "_valid":
+                search = self.constant(re_compile(pattern).search, "_pattern")
+                lines.append("for _key, _value in data.items():")
+                lines.append(f"    if {search}(_key) and not {validate}(_value): return False")
+
+        if "additionalProperties" in node:
+            additional = node["additionalProperties"]
+            known = self.constant(frozenset(properties))
+            patterns = "|".join(node.get("patternProperties", dict()))
+            if patterns:
+                search = self.constant(re_compile(patterns).search, "_pattern")
+                extras = f"(_key for _key in data if _key not in {known} and not {search}(_key))"
+            else:
+                extras = f"(_key for _key in data if _key not in {known})"
+
+            if isinstance(additional, dict):
+                if (validate := self.function(additional)) != "_valid":
+                    lines.append(f"for _key in {extras}:")
+                    lines.append(f"    if not {validate}(data[_key]): return False")
+            elif not additional:
+                if patterns:
+                    lines.append(f"if any(True for _ in {extras}): return False")
+                else:
+                    lines.append(f"if not data.keys() <= {known}: return False")
+
+        for prop, dependency in node.get("dependencies", dict()).items():
+            if isinstance(dependency, list):
+                if dependency:
+                    required = " and ".join(f"{each!r} in data" for each in dependency)
+                    lines.append(f"if {prop!r} in data and not ({required}): return False")
+            elif (validate := self.function(dependency)) != "_valid":
+                lines.append(f"if {prop!r} in data and not {validate}(data): return False")
+
+        if "propertyNames" in node and (validate := self.function(node["propertyNames"])) != "_valid":
+            lines.append(f"if not all({validate}(_key) for _key in data): return False")
+        if "minProperties" in node:
+            lines.append(f"if len(data) < {node['minProperties']!r}: return False")
+        if "maxProperties" in node:
+            lines.append(f"if len(data) > {node['maxProperties']!r}: return False")
+        return lines
+
+    def array_block(self, node) -> list:
+        lines = list()
+        items = node.get("items", dict())
+        if isinstance(items, list):
+            for index, sub in enumerate(items):
+                if (validate := self.function(sub)) != "_valid":
+                    lines.append(f"if len(data) > {index} and not {validate}(data[{index}]): return False")
+            if "additionalItems" in node:
+                additional = node["additionalItems"]
+                if isinstance(additional, dict):
+                    if (validate := self.function(additional)) != "_valid":
+                        lines.append(f"if not all({validate}(_item) for _item in data[{len(items)}:]): return False")
+                elif not additional:
+                    lines.append(f"if len(data) > {len(items)}: return False")
+        elif isinstance(items, dict):
+            if (validate := self.function(items)) != "_valid":
+                lines.append(f"if not all({validate}(_item) for _item in data): return False")
+        elif "additionalItems" in node:
+            raise _NotCompilable("additionalItems")
+        elif items is False:
+            lines.append("if data: return False")
+
+        if "contains" in node:
+            lines.append(f"if not any({self.function(node['contains'])}(_item) for _item in data): return False")
+        if "minItems" in node:
+            lines.append(f"if len(data) < {node['minItems']!r}: return False")
+        if "maxItems" in node:
+            lines.append(f"if len(data) > {node['maxItems']!r}: return False")
+        if node.get("uniqueItems"):
+            lines.append("if not _unique(data): return False")
+        return lines
+
+    def string_block(self, node) -> list:
+        lines = list()
+        if "minLength" in node:
+            lines.append(f"if len(data) < {node['minLength']!r}: return False")
+        if "maxLength" in node:
+            lines.append(f"if len(data) > {node['maxLength']!r}: return False")
+        if "pattern" in node:
+            lines.append(f"if not {self.constant(re_compile(node['pattern']).search, '_pattern')}(data): return False")
+        return lines
+
+    def number_block(self, node) -> list:
+        lines = list()
+        for keyword, operator in (
+            ("minimum", "<"), ("maximum", ">"), ("exclusiveMinimum", "<="), ("exclusiveMaximum", ">="),
+        ):
+            if keyword in node:
+                lines.append(f"if data {operator} {self.constant(node[keyword])}: return False")
+        if "multipleOf" in node:
+            lines.append(f"if _multiple_of_failed(data, {self.constant(node['multipleOf'])}): return False")
+        return lines
+
+
+# LRU, e.g. the schemas of reloaded (edited) schema files are evicted eventually
+# validators keep their compiled function, thus an eviction only affects validators created afterwards
+_compiled_schemas = OrderedDict()
+compiled_schemas_maxsize = 128
+
+
+def compile_schema(schema, resolver=None):
+    """returns a function telling if an instance is valid, cached per schema (and resolution scope)"""
+    key = (
+        dumps(schema, sort_keys=True, default=repr),
+        resolver.resolution_scope if resolver is not None else None,
+    )
+    if key in _compiled_schemas:
+        _compiled_schemas.move_to_end(key)
+        return _compiled_schemas[key]
+
+    compiled = _compiled_schemas[key] = _SchemaCompiler(schema, resolver).compile()
+    while len(_compiled_schemas) > compiled_schemas_maxsize:
+        _compiled_schemas.popitem(last=False)
+    return compiled
+
+
+class CompiledValidator:
+    """drop in replacement for jsonschema's Draft7Validator (as far as used by the wrapper and aws_schema)"""
+
+    def __init__(self, schema, resolver=None):
+        self.schema = schema
+        self.__resolver = resolver
+        self.__interpreter = None
+        self.__is_valid = compile_schema(schema, resolver)
+
+    @property
+    def interpreter(self):
+        if self.__interpreter is None:
+            from jsonschema import Draft7Validator
+
+            if self.__resolver is not None:
+                self.__interpreter = Draft7Validator(self.schema, resolver=self.__resolver)
+            else:
+                self.__interpreter = Draft7Validator(self.schema)
+        return self.__interpreter
+
+    @property
+    def resolver(self):
+        if self.__resolver is not None:
+            return self.__resolver
+        return self.interpreter.resolver
+
+    def is_valid(self, instance) -> bool:
+        return self.__is_valid(instance)
+
+    def iter_errors(self, instance):
+        if self.__is_valid(instance):
+            return iter(())
+        return self.interpreter.iter_errors(instance)
+
+    def validate(self, instance):
+        if not self.__is_valid(instance):
+            self.interpreter.validate(instance)
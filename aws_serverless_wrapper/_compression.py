@@ -0,0 +1,183 @@
+"""
+response compression negotiated by the request's Accept-Encoding header
+gzip is always available, br only if brotli (or brotlicffi) is installed
+
+compressed bodies of the CACHE_ROUTES (e.g. static responses) are cached per container
+"""
+from collections import OrderedDict
+from ._environ_variables import environ
+
+__all__ = ["compress_response", "negotiate_encoding", "compression_cache", "CompressionCache", "compressors"]
+
+default_min_size = 1024
+default_encodings = ("br", "gzip")
+
+
+def _gzip(data: bytes) -> bytes:
+    from gzip import compress
+
+    # fixed mtime: equal bodies result in equal (cacheable) compressed bodies
+    return compress(data, compresslevel=6, mtime=0)
+
+
+def _brotli():
+    try:
+        from brotli import compress
+    except ImportError:
+        from brotlicffi import compress
+
+    def brotli(data: bytes) -> bytes:
+        return compress(data, quality=5)
+
+    return brotli
+
+
+def _available_compressors() -> dict:
+    available = {"gzip": _gzip}
+    try:
+        available["br"] = _brotli()
+    except ImportError:
+        pass
+    return available
+
+
+compressors = _available_compressors()
+
+
+def _compression_config() -> dict:
+    config = environ.snapshot.RESPONSE_COMPRESSION
+    return config if isinstance(config, dict) else dict()
+
+
+def negotiate_encoding(accept_encoding: str, preferred: (list, tuple) = default_encodings) -> (str, None):
+    """
+    the available encoding with the highest quality value of the Accept-Encoding header
+    on equal quality values the order of preferred decides; None if no compression is accepted
+    """
+    qualities = dict()
+    for item in accept_encoding.split(","):
+        coding, *parameters = item.split(";")
+        quality = 1.0
+        for parameter in parameters:
+            name, _, value = parameter.strip().partition("=")
+            if name.lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding := coding.strip().lower():
+            qualities[coding] = quality
+
+    wildcard = qualities.get("*", 0.0)
+    candidates = [
+        (qualities.get(coding, wildcard), -index, coding)
+        for index, coding in enumerate(preferred)
+        if coding in compressors
+    ]
+    quality, _, coding = max(candidates, default=(0.0, 0, None))
+    return coding if quality > 0 else None
+
+
+def _compressed(encoding: str, body: str) -> str:
+    """the body compressed with encoding and base64 encoded"""
+    from binascii import b2a_base64
+
+    return b2a_base64(compressors[encoding](body.encode()), newline=False).decode("ascii")
+
+
+class CompressionCache:
+    """
+    per-container LRU cache of compressed bodies keyed by (encoding, digest of the body),
+    bounded by the sum of the compressed sizes
+    """
+
+    default_max_bytes = 1048576
+
+    def __init__(self, max_bytes: int = None):
+        self.__max_bytes = max_bytes
+        self.__entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_bytes(self) -> int:
+        if self.__max_bytes is not None:
+            return self.__max_bytes
+        return _compression_config().get("CACHE_MAX_BYTES", self.default_max_bytes)
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def clear(self):
+        self.__entries.clear()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def compressed(self, encoding: str, body: str) -> str:
+        """the body compressed with encoding and base64 encoded"""
+        from hashlib import blake2b
+
+        key = (encoding, blake2b(body.encode(), digest_size=16).digest())
+        if (compressed := self.__entries.get(key)) is not None:
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return compressed
+
+        self.misses += 1
+        compressed = _compressed(encoding, body)
+        if len(compressed) <= self.max_bytes:
+            self.__entries[key] = compressed
+            self.size += len(compressed)
+            while self.size > self.max_bytes:
+                _, evicted = self.__entries.popitem(last=False)
+                self.size -= len(evicted)
+        return compressed
+
+
+compression_cache = CompressionCache()
+
+
+def _header(headers: dict, name: str):
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def compress_response(response: dict, request_headers: (dict, None), resource: str = None) -> dict:
+    """
+    compresses a (text) response body if the client accepts it and the body exceeds MIN_SIZE,
+    the compressed body is cached if the resource is one of the CACHE_ROUTES
+    """
+    body = response.get("body") if isinstance(response, dict) else None
+    if not isinstance(body, str) or response.get("isBase64Encoded") or not request_headers:
+        return response
+
+    headers = response.get("headers") or dict()
+    if _header(headers, "content-encoding") is not None:
+        return response
+
+    config = _compression_config()
+    if len(body) < config.get("MIN_SIZE", default_min_size):
+        return response
+    if not (accept_encoding := request_headers.get("accept-encoding")):
+        return response
+    if not (encoding := negotiate_encoding(accept_encoding, config.get("ENCODINGS", default_encodings))):
+        return response
+
+    headers = dict(headers)
+    headers["Content-Encoding"] = encoding
+    vary = _header(headers, "vary")
+    headers = {k: v for k, v in headers.items() if k.lower() != "vary"}
+    headers["Vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+
+    response = dict(response)
+    if resource is not None and resource in config.get("CACHE_ROUTES", ()):
+        response["body"] = compression_cache.compressed(encoding, body)
+    else:
+        response["body"] = _compressed(encoding, body)
+    response["headers"] = headers
+    response["isBase64Encoded"] = True
+    return response
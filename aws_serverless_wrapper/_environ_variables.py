@@ -1,4 +1,4 @@
-from os import environ as os_environ
+from os import environ as os_environ, stat
 from json import load
 
 __all__ = ["environ"]
@@ -25,23 +25,74 @@ def change_dict_to_no_except_dict(data):
     return data
 
 
+class ResolvedConfig:
+    """
+    immutable snapshot of the environ with every key resolved ahead of time (incl. schema defaults)
+    nested dicts are shared with the environ and not copied
+    """
+
+    __slots__ = ("_environ",)
+
+    def __getattr__(self, key):
+        # keys unknown at build time are resolved through the complete fallback chain
+        if key.startswith("__"):
+            raise AttributeError(key)
+        return object.__getattribute__(self, "_environ")[key]
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, key):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.__slots__ or key in object.__getattribute__(self, "_environ")
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{k}={getattr(self, k)!r}' for k in self.__slots__)})"
+
+
+_resolved_config_classes = dict()
+
+
+def _resolved_config_class(keys: tuple) -> type:
+    if keys not in _resolved_config_classes:
+        _resolved_config_classes[keys] = type(ResolvedConfig.__name__, (ResolvedConfig,), {"__slots__": keys})
+    return _resolved_config_classes[keys]
+
+
 class Environ:
     def __init__(self):
         self.__config_file = str()
         self.__config = dict()
+        self.__config_mtime = None
+        self.__version = 0
+        self.__snapshot = None
+        self.__snapshot_version = None
         self._load_config_from_file()
         self._schema = dict()
 
+    @property
+    def version(self) -> int:
+        """increases with every change of the configuration, allows consumers to detect stale derived state"""
+        return self.__version
+
     def _load_config_from_file(self, file_name=None):
+        self.__version += 1
         try:
             self.__config_file = (
                 os_environ["WRAPPER_CONFIG_FILE"] if not file_name else file_name
             )
             with open(self.__config_file, "r") as f:
                 self.__config = change_dict_to_no_except_dict(load(f))
+            self.__config_mtime = stat(self.__config_file).st_mtime_ns
         except KeyError:
             self.__config_file = str()
             self.__config = dict()
+            self.__config_mtime = None
             from warnings import warn
 
             warn("No WRAPPER_CONFIG_FILE specified", ResourceWarning)
@@ -63,16 +114,58 @@ class Environ:
         else:
             return NoExceptDict()
 
-    def set_keys(self, new_keys: dict):
+    def refresh(self):
+        """reload the config file if it was exchanged or changed on disk since loading it"""
+        if "WRAPPER_CONFIG_FILE" in os_environ and self.__config_file != os_environ["WRAPPER_CONFIG_FILE"]:
+            self._load_config_from_file()
+        elif self.__config_file:
+            try:
+                if stat(self.__config_file).st_mtime_ns != self.__config_mtime:
+                    self._load_config_from_file(self.__config_file)
+            except FileNotFoundError:
+                pass
+
+    @property
+    def snapshot(self) -> ResolvedConfig:
+        """config with all keys resolved, only rebuilt if the environ changed"""
+        while self.__snapshot_version != self.__version:
+            version = self.__version
+            self.__snapshot = self.__build_snapshot()
+            self.__snapshot_version = version
+        return self.__snapshot
+
+    def __build_snapshot(self) -> ResolvedConfig:
+        keys = dict.fromkeys(required_environ_keys)
+        keys.update(dict.fromkeys(fallback_values))
+        if self._schema:
+            keys.update(dict.fromkeys(self._schema["properties"]))
+        keys.update(dict.fromkeys(self.__config))
+
+        resolved_config_class = _resolved_config_class(
+            tuple(key for key in keys if isinstance(key, str) and key.isidentifier() and key != "_environ")
+        )
+        snapshot = object.__new__(resolved_config_class)
+        object.__setattr__(snapshot, "_environ", self)
+        for key in resolved_config_class.__slots__:
+            object.__setattr__(snapshot, key, self[key])
+        return snapshot
+
+    def validate_keys(self, new_keys: dict):
         if self._schema:
-            validator(self._schema).validate(new_keys)
+            from ._compiled_schema import CompiledValidator
+
+            CompiledValidator(self._schema).validate(new_keys)
+
+    def set_keys(self, new_keys: dict, validate: bool = True):
+        if validate:
+            self.validate_keys(new_keys)
 
         self.__config.update(new_keys)
+        self.__version += 1
 
     def set_schema(self, schema: dict):
-        from jsonschema import Draft7Validator as validator
-        global validator
         self._schema = schema
+        self.__version += 1
 
     def __getitem__(self, key):
         if key not in required_environ_keys:
@@ -91,6 +184,7 @@ class Environ:
 
     def __setitem__(self, key, value):
         self.__config[key] = change_dict_to_no_except_dict(value)
+        self.__version += 1
 
     def __iter__(self):
         if "WRAPPER_CONFIG_FILE" in os_environ and self.__config_file != os_environ["WRAPPER_CONFIG_FILE"]:
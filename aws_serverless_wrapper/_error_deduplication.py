@@ -0,0 +1,80 @@
+"""
+deduplication of error log items: errors are fingerprinted by exception type, file, line and function
+within a window only the first occurrence is logged completely, repeats only increment the counters
+after the window a summary item with the number of occurrences and the first/last timestamps is logged
+
+windows end lazily (checked when an error is logged and at the end of every invocation)
+the summary of a window not ended before the container is shut down is lost, a shorter window reduces this
+"""
+from hashlib import blake2b
+from threading import Lock
+from time import monotonic
+
+__all__ = ["ErrorDeduplicator", "error_deduplicator", "fingerprint"]
+
+default_window = 60.0
+
+fingerprint_keys = ("exception_type", "exception_file", "exception_line_no", "exception_function")
+summary_keys = ("aws_log_group", "service_name", "lambda_name", "function_version") + fingerprint_keys
+
+
+def fingerprint(item: dict) -> (str, None):
+    """fingerprint of an error log item of an exception (None for items without exception, e.g. status code errors)"""
+    if "exception_type" not in item:
+        return None
+    key = "|".join(str(item.get(key)) for key in fingerprint_keys)
+    return blake2b(key.encode(), digest_size=8).hexdigest()
+
+
+class _Occurrences:
+    __slots__ = ("config", "item", "ends", "count", "first_timestamp", "last_timestamp", "last_request_id")
+
+    def __init__(self, config, item: dict, ends: float):
+        self.config = config
+        self.item = {key: item[key] for key in summary_keys if key in item}
+        self.ends = ends
+        self.count = 1
+        self.first_timestamp = self.last_timestamp = item.get("timestamp")
+        self.last_request_id = item.get("aws_request_id")
+
+    def summary(self, error_fingerprint: str) -> dict:
+        return {
+            # the last occurrence was not logged, thus its aws_request_id is not used by another item
+            "aws_request_id": self.last_request_id,
+            "timestamp": self.last_timestamp,
+            **self.item,
+            "error_fingerprint": error_fingerprint,
+            "occurrences": self.count,
+            "first_timestamp": self.first_timestamp,
+            "last_timestamp": self.last_timestamp,
+        }
+
+
+class ErrorDeduplicator:
+    def __init__(self):
+        self.windows = dict()
+        self._lock = Lock()
+
+    def occurrence(self, error_fingerprint: str, item: dict, window: float, config) -> bool:
+        """counts the occurrence, True if it is the first one in the window (thus to be logged completely)"""
+        now = monotonic()
+        with self._lock:
+            occurrences = self.windows.get(error_fingerprint)
+            if occurrences is not None and now < occurrences.ends:
+                occurrences.count += 1
+                occurrences.last_timestamp = item.get("timestamp")
+                occurrences.last_request_id = item.get("aws_request_id")
+                return False
+            self.windows[error_fingerprint] = _Occurrences(config, item, now + window)
+            return True
+
+    def expired(self, now: float = None) -> list:
+        """(config, summary item) of the ended windows with repeated occurrences, the ended windows are removed"""
+        now = monotonic() if now is None else now
+        with self._lock:
+            ended = [key for key, occurrences in self.windows.items() if now >= occurrences.ends]
+            ended = [(key, self.windows.pop(key)) for key in ended]
+        return [(occurrences.config, occurrences.summary(key)) for key, occurrences in ended if occurrences.count > 1]
+
+
+error_deduplicator = ErrorDeduplicator()
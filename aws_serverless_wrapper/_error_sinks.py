@@ -0,0 +1,363 @@
+"""
+sinks for error log items (DynamoDB table, SQS queue): items are buffered in memory and written in batches
+either at the end of the invocation or in the background, spending at most TIMEOUT seconds per flush
+items not written within the time are kept for the next flush (up to max_buffered_items)
+
+the settings of a destination (e.g. FLUSH) are taken from the config section its items originate from
+(ERROR_LOG or API_INPUT_VERIFICATION.LOG_ERRORS)
+"""
+import logging
+from threading import Lock
+from time import monotonic, sleep
+from ._environ_variables import environ
+
+__all__ = [
+    "ErrorSink",
+    "DynamoDBErrorSink",
+    "SQSErrorSink",
+    "dynamodb_error_sink",
+    "sqs_error_sink",
+    "flush_error_sinks",
+    "resource_name",
+]
+
+logger = logging.getLogger(__name__)
+
+default_timeout = 1.0
+default_mode = "invocation"
+
+
+def resource_name(name: str) -> str:
+    """name of the table/queue in the current stage and stack (same convention as dynamo_db_resource)"""
+    from os import environ as os_environ
+
+    name_components = [
+        os_environ[key]
+        for key in ("DYNAMO_DB_RESOURCE_STAGE_NAME", "DYNAMO_DB_RESOURCE_STACK_NAME")
+        if key in os_environ
+    ]
+    return "-".join(name_components + [name])
+
+
+class ErrorSink:
+    """buffers items per destination (e.g. table), subclasses write a batch and return the unprocessed items"""
+
+    config_key = None
+    max_batch_size = 25
+    max_buffered_items = 1000
+    max_backoff = 1.0
+    retryable_errors = (
+        "ProvisionedThroughputExceededException",
+        "ThrottlingException",
+        "RequestLimitExceeded",
+        "InternalServerError",
+        "ServiceUnavailable",
+    )
+
+    def __init__(self):
+        self._buffer = dict()
+        self._configs = dict()
+        self._lock = Lock()
+        self._flush_lock = Lock()
+        self._background = None
+
+    @property
+    def pending(self) -> int:
+        return sum(len(items) for items in self._buffer.values())
+
+    def sink_config(self, destination: str) -> dict:
+        """
+        the config of the sink (config_key) in the section the items of the destination originate from,
+        ERROR_LOG if they were put without; empty if it is not an object (it may be just the name of the destination)
+        """
+        sink_config = self._configs.get(destination)
+        if sink_config is None:
+            error_log_config = environ.snapshot.ERROR_LOG
+            sink_config = error_log_config.get(self.config_key) if isinstance(error_log_config, dict) else None
+        return sink_config if isinstance(sink_config, dict) else dict()
+
+    def flush_config(self, destination: str) -> dict:
+        flush_config = self.sink_config(destination).get("FLUSH")
+        return flush_config if isinstance(flush_config, dict) else dict()
+
+    def put(self, destination: str, item: dict, sink_config: (dict, str) = None):
+        """sink_config: the config of the sink in the section the item originates from (e.g. ERROR_LOG.DATABASE)"""
+        with self._lock:
+            if sink_config is not None:
+                self._configs[destination] = sink_config
+            items = self._buffer.setdefault(destination, list())
+            items.append(item)
+            if len(items) > self.max_buffered_items:
+                del items[: len(items) - self.max_buffered_items]
+                logger.warning(f"error sink buffer for {destination} full, dropped the oldest items")
+        _active_sinks.add(self)
+
+    def write_batch(self, destination: str, items: list) -> list:
+        raise NotImplementedError
+
+    def batch_length(self, items: list) -> int:
+        """number of the leading items written in the next batch"""
+        return self.max_batch_size
+
+    def flush(self, timeout: float = None, destinations: list = None):
+        """
+        writes the buffered items (of the destinations, all if None), retrying unprocessed ones
+        with exponential backoff until timeout (seconds, the TIMEOUT of the destination if None)
+        """
+        with self._flush_lock:
+            with self._lock:
+                if destinations is None:
+                    buffer, self._buffer = self._buffer, dict()
+                else:
+                    buffer = {d: self._buffer.pop(d) for d in destinations if d in self._buffer}
+
+            remaining = dict()
+            for destination, items in buffer.items():
+                destination_timeout = (
+                    self.flush_config(destination).get("TIMEOUT", default_timeout) if timeout is None else timeout
+                )
+                if unprocessed := self.__write(destination, items, monotonic() + destination_timeout):
+                    remaining[destination] = unprocessed
+
+            if remaining:
+                with self._lock:
+                    for destination, items in remaining.items():
+                        self._buffer[destination] = items + self._buffer.get(destination, list())
+
+    def __write(self, destination: str, items: list, deadline: float) -> list:
+        attempt = 0
+        while items:
+            length = self.batch_length(items)
+            batch, items = items[:length], items[length:]
+            try:
+                unprocessed = self.write_batch(destination, batch)
+            except Exception as e:
+                if self._error_code(e) not in self.retryable_errors:
+                    logger.exception(f"writing {len(batch)} error log items to {destination} failed")
+                    continue
+                unprocessed = batch
+
+            if unprocessed:
+                items = unprocessed + items
+                backoff = min(self.max_backoff, 0.05 * 2 ** attempt)
+                attempt += 1
+                if monotonic() + backoff >= deadline:
+                    return items
+                sleep(backoff)
+            else:
+                attempt = 0
+
+            if items and monotonic() >= deadline:
+                return items
+        return list()
+
+    @staticmethod
+    def _error_code(exception) -> (str, None):
+        response = getattr(exception, "response", None)
+        if isinstance(response, dict):
+            return response.get("Error", dict()).get("Code")
+        return None
+
+    def flush_in_background(self, destinations: list = None):
+        """flushes in a thread not blocking the response; an already running flush is not awaited"""
+        from threading import Thread
+
+        if self._background is not None and self._background.is_alive():
+            return
+        self._background = Thread(
+            target=self.flush,
+            kwargs={"destinations": destinations},
+            name=f"{type(self).__name__}_flush",
+            daemon=True,
+        )
+        self._background.start()
+
+    def flush_at_invocation_end(self):
+        destinations = dict()
+        with self._lock:
+            for destination in self._buffer:
+                mode = self.flush_config(destination).get("MODE", default_mode)
+                destinations.setdefault(mode, list()).append(destination)
+        if "invocation" in destinations:
+            self.flush(destinations=destinations["invocation"])
+        if "background" in destinations:
+            self.flush_in_background(destinations["background"])
+
+
+class DynamoDBErrorSink(ErrorSink):
+    """
+    writes the items with batch_write_item (25 items per request)
+    a batch rejected as invalid (e.g. items with the same key, as the records of an SQS batch share the aws_request_id)
+    is written item by item with put_item, overwriting items with the same key
+    """
+
+    config_key = "DATABASE"
+
+    def __init__(self):
+        super().__init__()
+        self.__client = None
+
+    @property
+    def client(self):
+        if self.__client is None:
+            import boto3
+
+            self.__client = boto3.client("dynamodb")
+        return self.__client
+
+    @client.setter
+    def client(self, client):
+        self.__client = client
+
+    @staticmethod
+    def _serialize(item: dict) -> dict:
+        from decimal import Decimal
+        from json import loads
+        from boto3.dynamodb.types import TypeSerializer
+        from ._json_codec import json_codec
+
+        serializer = TypeSerializer()
+        # DynamoDB requires Decimal instead of float, the round trip also makes any nested data JSON compatible
+        item = loads(json_codec.dumps(item), parse_float=Decimal)
+        return {key: serializer.serialize(value) for key, value in item.items() if value is not None}
+
+    def write_batch(self, destination: str, items: list) -> list:
+        requests = [{"PutRequest": {"Item": self._serialize(item)}} for item in items]
+        try:
+            response = self.client.batch_write_item(RequestItems={destination: requests})
+        except Exception as e:
+            if self._error_code(e) != "ValidationException":
+                raise
+            return self.__put_items(destination, items, requests)
+
+        unprocessed = response.get("UnprocessedItems", dict()).get(destination, list())
+        if not unprocessed:
+            return list()
+        from boto3.dynamodb.types import TypeDeserializer
+
+        deserializer = TypeDeserializer()
+        return [
+            {key: deserializer.deserialize(value) for key, value in request["PutRequest"]["Item"].items()}
+            for request in unprocessed
+        ]
+
+    def __put_items(self, destination: str, items: list, requests: list) -> list:
+        unprocessed = list()
+        for item, request in zip(items, requests):
+            try:
+                self.client.put_item(TableName=destination, Item=request["PutRequest"]["Item"])
+            except Exception as e:
+                if self._error_code(e) in self.retryable_errors:
+                    unprocessed.append(item)
+                else:
+                    logger.exception(f"writing error log item of {item.get('aws_request_id')} to {destination} failed")
+        return unprocessed
+
+
+class SQSErrorSink(ErrorSink):
+    """
+    sends the items as JSON messages with send_message_batch (10 messages and 256KB per request)
+    event_data of large items is sent gzip compressed and base64 encoded (event_data_encoding: "gzip/base64")
+    """
+
+    config_key = "QUEUE"
+    max_batch_size = 10
+    max_message_size = 262144
+    default_compression_threshold = 8192
+    retryable_errors = ErrorSink.retryable_errors + ("AWS.SimpleQueueService.ServiceUnavailable",)
+
+    def __init__(self):
+        super().__init__()
+        self.__client = None
+        self.queue_urls = dict()
+
+    @property
+    def client(self):
+        if self.__client is None:
+            import boto3
+
+            self.__client = boto3.client("sqs")
+        return self.__client
+
+    @client.setter
+    def client(self, client):
+        self.__client = client
+        self.queue_urls = dict()
+
+    def put(self, destination: str, item: dict, sink_config: (dict, str) = None):
+        if sink_config is None:
+            sink_config = self.sink_config(destination)
+        threshold = (sink_config if isinstance(sink_config, dict) else dict()).get(
+            "COMPRESSION_THRESHOLD", self.default_compression_threshold
+        )
+        if (message := self._message(item, threshold)) is not None:
+            super().put(destination, message, sink_config)
+
+    def _message(self, item: dict, threshold: int) -> (str, None):
+        from ._json_codec import json_codec
+
+        message = json_codec.dumps(item)
+        if len(message) > threshold and item.get("event_data"):
+            from base64 import b64encode
+            from gzip import compress
+
+            event_data = json_codec.dumps(item["event_data"]).encode()
+            message = json_codec.dumps(
+                {
+                    **item,
+                    "event_data": b64encode(compress(event_data, mtime=0)).decode(),
+                    "event_data_encoding": "gzip/base64",
+                }
+            )
+
+        if len(message.encode()) > self.max_message_size and "event_data" in item:
+            item = {key: value for key, value in item.items() if key != "event_data"}
+            item["event_data_dropped"] = True
+            message = json_codec.dumps(item)
+            logger.warning(f"error log item of {item.get('aws_request_id')} exceeds the message size, event_data dropped")
+
+        if len(message.encode()) > self.max_message_size:
+            logger.error(f"error log item of {item.get('aws_request_id')} exceeds the message size, not sent")
+            return None
+        return message
+
+    def batch_length(self, items: list) -> int:
+        length, size = 0, 0
+        for message in items[: self.max_batch_size]:
+            size += len(message.encode())
+            if length and size > self.max_message_size:
+                break
+            length += 1
+        return length
+
+    def queue_url(self, queue_name: str) -> str:
+        if queue_name not in self.queue_urls:
+            self.queue_urls[queue_name] = self.client.get_queue_url(QueueName=queue_name)["QueueUrl"]
+        return self.queue_urls[queue_name]
+
+    def write_batch(self, destination: str, items: list) -> list:
+        response = self.client.send_message_batch(
+            QueueUrl=self.queue_url(destination),
+            Entries=[{"Id": str(index), "MessageBody": message} for index, message in enumerate(items)],
+        )
+
+        unprocessed = list()
+        for failed in response.get("Failed", list()):
+            if failed.get("SenderFault", False):
+                logger.error(f"sending error log item to {destination} failed: {failed.get('Code')} {failed.get('Message')}")
+            else:
+                unprocessed.append(items[int(failed["Id"])])
+        return unprocessed
+
+
+dynamodb_error_sink = DynamoDBErrorSink()
+sqs_error_sink = SQSErrorSink()
+
+_active_sinks = set()
+
+
+def flush_error_sinks():
+    """called at the end of every invocation, flushes the sinks with buffered items according to their FLUSH.MODE"""
+    for sink in list(_active_sinks):
+        if sink.pending:
+            sink.flush_at_invocation_end()
@@ -0,0 +1,22 @@
+import asyncio
+from threading import local
+
+__all__ = ["run_coroutine", "get_event_loop"]
+
+_thread_local = local()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    one event loop per container (and thread, e.g. workers of the SQS batch mode),
+    created at first use and reused across warm invocations
+    """
+    event_loop = getattr(_thread_local, "event_loop", None)
+    if event_loop is None or event_loop.is_closed():
+        event_loop = _thread_local.event_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(event_loop)
+    return event_loop
+
+
+def run_coroutine(coroutine):
+    return get_event_loop().run_until_complete(coroutine)
@@ -0,0 +1,162 @@
+"""
+idempotency of requests: the response of a request with an idempotency key (header or hash of the payload)
+is stored in a DynamoDB table and returned again for retries of the request without running the wrapped function
+
+a record is IN_PROGRESS while the wrapped function runs (retries meanwhile get a 409)
+and COMPLETED with the response afterwards; responses with 5xx statusCode are not stored, the record gets deleted
+a retry with the same key but a different payload gets a 422
+"""
+import logging
+from time import time
+from ._environ_variables import environ
+
+__all__ = ["IdempotencyStore", "IdempotencyRecord", "idempotency_store", "idempotency_record_of"]
+
+logger = logging.getLogger(__name__)
+
+default_header = "idempotency-key"
+default_methods = ("POST", "PUT", "PATCH", "DELETE")
+default_expires_after = 3600
+default_in_progress_timeout = 60
+
+IN_PROGRESS = "IN_PROGRESS"
+COMPLETED = "COMPLETED"
+
+
+def _error(status_code: int, body: str) -> Exception:
+    return Exception({"statusCode": status_code, "body": body, "headers": {"Content-Type": "text/plain"}})
+
+
+class IdempotencyStore:
+    """records in a DynamoDB table with the (string) hash key "id" and the TTL attribute "expiration" """
+
+    def __init__(self):
+        self.__client = None
+
+    @property
+    def client(self):
+        if self.__client is None:
+            import boto3
+
+            self.__client = boto3.client("dynamodb")
+        return self.__client
+
+    @client.setter
+    def client(self, client):
+        self.__client = client
+
+    def put_in_progress(self, table: str, record_id: str, payload_hash: str, expiration: int) -> (dict, None):
+        """creates the IN_PROGRESS record, returns the existing record instead if it is still valid"""
+        now = int(time())
+        try:
+            self.client.put_item(
+                TableName=table,
+                Item={
+                    "id": {"S": record_id},
+                    "status": {"S": IN_PROGRESS},
+                    "payload_hash": {"S": payload_hash},
+                    "expiration": {"N": str(expiration)},
+                },
+                ConditionExpression="attribute_not_exists(id) OR expiration < :now",
+                ExpressionAttributeValues={":now": {"N": str(now)}},
+            )
+            return None
+        except self.client.exceptions.ConditionalCheckFailedException:
+            item = self.client.get_item(TableName=table, Key={"id": {"S": record_id}}, ConsistentRead=True)
+            return item.get("Item")
+
+    def complete(self, table: str, record_id: str, response: str, expiration: int):
+        self.client.update_item(
+            TableName=table,
+            Key={"id": {"S": record_id}},
+            UpdateExpression="SET #status = :completed, #response = :response, expiration = :expiration",
+            ExpressionAttributeNames={"#status": "status", "#response": "response"},
+            ExpressionAttributeValues={
+                ":completed": {"S": COMPLETED},
+                ":response": {"S": response},
+                ":expiration": {"N": str(expiration)},
+            },
+        )
+
+    def delete(self, table: str, record_id: str):
+        self.client.delete_item(TableName=table, Key={"id": {"S": record_id}})
+
+
+idempotency_store = IdempotencyStore()
+
+
+class IdempotencyRecord:
+    def __init__(self, table: str, record_id: str, payload_hash: str, config: dict, context=None):
+        self.table = table
+        self.record_id = record_id
+        self.payload_hash = payload_hash
+        self.config = config
+        self.context = context
+        self.acquired = False
+
+    def __in_progress_timeout(self) -> float:
+        if remaining_time := getattr(self.context, "get_remaining_time_in_millis", None):
+            # the record is blocked as long as the invocation may run
+            return remaining_time() / 1000
+        return self.config.get("IN_PROGRESS_TIMEOUT", default_in_progress_timeout)
+
+    def acquire(self) -> (dict, None):
+        """the stored response of a completed request, None if the request is to be processed"""
+        from ._json_codec import json_codec
+
+        expiration = int(time() + self.__in_progress_timeout()) + 1
+        existing = idempotency_store.put_in_progress(self.table, self.record_id, self.payload_hash, expiration)
+        if existing is None:
+            self.acquired = True
+            return None
+        if existing.get("payload_hash", dict()).get("S") != self.payload_hash:
+            raise _error(422, "idempotency key already used for a different payload")
+        if existing.get("status", dict()).get("S") == COMPLETED and "response" in existing:
+            return json_codec.loads(existing["response"]["S"])
+        raise _error(409, "request with the same idempotency key is in progress")
+
+    def finish(self, response):
+        """stores the response (or deletes the record for 5xx responses, allowing the request to be retried)"""
+        if not self.acquired:
+            return
+        self.acquired = False
+        try:
+            status_code = response.get("statusCode", 200) if isinstance(response, dict) else 200
+            if isinstance(status_code, int) and status_code >= 500:
+                idempotency_store.delete(self.table, self.record_id)
+                return
+            from ._json_codec import json_codec
+
+            expiration = int(time()) + self.config.get("EXPIRES_AFTER", default_expires_after)
+            idempotency_store.complete(self.table, self.record_id, json_codec.dumps(response), expiration)
+        except Exception:
+            logger.exception(f"storing the idempotency record {self.record_id} failed")
+            self.release()
+
+    def release(self):
+        """deletes the record, e.g. if the response can not be stored"""
+        self.acquired = False
+        try:
+            idempotency_store.delete(self.table, self.record_id)
+        except Exception:
+            logger.exception(f"deleting the idempotency record {self.record_id} failed")
+
+
+def idempotency_record_of(event: dict, context) -> (IdempotencyRecord, None):
+    """the record of an event with an idempotency key (header or payload hash), None if the event has none"""
+    from ._error_sinks import resource_name
+    from ._response_cache import dict_hash
+
+    config = environ.snapshot.IDEMPOTENCY
+    if event.get("httpMethod") not in config.get("METHODS", default_methods):
+        return None
+    payload_hash = dict_hash(
+        {field: event.get(field) for field in ("httpMethod", "resource", "pathParameters", "queryStringParameters", "body")}
+    )
+    # the headers are lowercase already
+    if not (key := (event.get("headers") or dict()).get(config.get("HEADER", default_header).lower())):
+        if not config.get("USE_PAYLOAD_HASH", False):
+            return None
+        key = payload_hash
+    record_id = f"{getattr(context, 'function_name', str())}#{event.get('resource')}#{key}"
+    return IdempotencyRecord(resource_name(config["TABLE"]), record_id, payload_hash, config, context)
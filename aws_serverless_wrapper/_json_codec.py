@@ -0,0 +1,125 @@
+"""
+JSON codec used for parsing/serializing bodies and for logging
+the standard library by default; a faster library (orjson, ujson, simdjson) is opt-in by the config key JSON_CODEC
+since orjson and ujson serialize compactly (without spaces after the separators), which changes the response bodies
+"""
+from ._environ_variables import environ
+
+__all__ = ["JSONCodec", "json_codec", "get_codec", "default"]
+
+auto_order = ("orjson", "ujson", "simdjson", "json")
+
+
+def default(obj):
+    """
+    serialization of types not supported by JSON itself, e.g. Decimal (returned by DynamoDB) and datetime
+    binary data (e.g. bodies) is represented base64 encoded
+    """
+    from decimal import Decimal
+    from datetime import date, time
+
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, (date, time)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        from binascii import b2a_base64
+
+        return b2a_base64(obj, newline=False).decode("ascii")
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+
+class JSONCodec:
+    """loads accepts str and bytes, dumps returns str; both raise ValueError/TypeError on invalid input"""
+
+    def __init__(self, name: str, loads, dumps):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.name})"
+
+
+def _orjson() -> JSONCodec:
+    import orjson
+
+    options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj) -> str:
+        return orjson.dumps(obj, default=default, option=options).decode()
+
+    return JSONCodec("orjson", orjson.loads, dumps)
+
+
+def _ujson() -> JSONCodec:
+    import ujson
+
+    # the default hook is only supported from ujson 5 on
+    if int(ujson.__version__.split(".")[0]) < 5:
+        raise ImportError(f"ujson>=5 is required, found {ujson.__version__}")
+
+    def dumps(obj) -> str:
+        return ujson.dumps(obj, default=default)
+
+    return JSONCodec("ujson", ujson.loads, dumps)
+
+
+def _simdjson() -> JSONCodec:
+    import simdjson
+    from json import dumps as json_dumps
+
+    def dumps(obj) -> str:
+        return json_dumps(obj, default=default)
+
+    return JSONCodec("simdjson", simdjson.loads, dumps)
+
+
+def _json() -> JSONCodec:
+    from json import loads, dumps as json_dumps
+
+    def dumps(obj) -> str:
+        return json_dumps(obj, default=default)
+
+    return JSONCodec("json", loads, dumps)
+
+
+_factories = {"orjson": _orjson, "ujson": _ujson, "simdjson": _simdjson, "json": _json}
+_codecs = dict()
+
+
+def get_codec(name: str = "json") -> JSONCodec:
+    """codec by library name or the first installed one of auto_order for 'auto', created once per container"""
+    if name not in _codecs:
+        for candidate in auto_order if name == "auto" else (name,):
+            try:
+                _codecs[name] = _factories[candidate]()
+                break
+            except ImportError:
+                if name != "auto":
+                    raise
+    return _codecs[name]
+
+
+class _ConfiguredCodec:
+    """the codec selected by the config key JSON_CODEC"""
+
+    @property
+    def codec(self) -> JSONCodec:
+        name = environ.snapshot.JSON_CODEC
+        return get_codec(name if isinstance(name, str) else "json")
+
+    @property
+    def name(self) -> str:
+        return self.codec.name
+
+    def loads(self, data):
+        return self.codec.loads(data)
+
+    def dumps(self, obj) -> str:
+        return self.codec.dumps(obj)
+
+
+json_codec = _ConfiguredCodec()
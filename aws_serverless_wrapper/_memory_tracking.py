@@ -0,0 +1,148 @@
+"""
+memory usage across the invocations of a (reused) container
+the RSS and peak RSS are logged per invocation; every CHECK_INTERVAL invocations the growth since the last check
+is compared to GROWTH_THRESHOLD (bytes per invocation) and a warning is logged if it is exceeded
+
+with TRACEMALLOC, a tracemalloc snapshot is taken at every check and the warning names the call sites
+with the largest growth since the previous snapshot (tracing slows down allocations, thus it is opt-in as well)
+"""
+import logging
+import sys
+from ._environ_variables import environ
+from ._structured_logging import structured_logger, DeferredJSON
+
+__all__ = ["MemoryTracker", "memory_tracker", "rss", "peak_rss"]
+
+logger = logging.getLogger(__name__)
+
+default_check_interval = 100
+default_growth_threshold = 10240
+default_top = 10
+default_traceback_depth = 1
+
+
+def rss() -> (int, None):
+    """resident set size of the process in bytes (None if not available, e.g. not on Linux)"""
+    try:
+        from os import sysconf
+
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def peak_rss() -> (int, None):
+    """maximum resident set size of the process in bytes (None if not available)"""
+    try:
+        # ru_maxrss is only synchronized lazily on Linux, VmHWM is up to date
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        from resource import getrusage, RUSAGE_SELF
+    except ImportError:
+        return None
+    max_rss = getrusage(RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _config() -> dict:
+    config = environ.snapshot.MEMORY_TRACKING
+    return config if isinstance(config, dict) else dict()
+
+
+def _snapshot():
+    import tracemalloc
+
+    return tracemalloc.take_snapshot().filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        )
+    )
+
+
+class MemoryTracker:
+    def __init__(self):
+        self.checked_at = None
+        self.checked_rss = None
+        self.snapshot = None
+
+    def start_invocation(self) -> (int, None):
+        """starts tracing allocations if configured, returns the RSS at the start of the invocation"""
+        if _config().get("TRACEMALLOC", False):
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(_config().get("TRACEBACK_DEPTH", default_traceback_depth))
+        return rss()
+
+    def finish_invocation(self, rss_at_start: (int, None), reusing_count: int):
+        current_rss = rss()
+        structured_logger.info(
+            "memory usage",
+            container_reusing_count=reusing_count,
+            rss=current_rss,
+            peak_rss=peak_rss(),
+            rss_growth=current_rss - rss_at_start if current_rss is not None and rss_at_start is not None else None,
+        )
+
+        config = _config()
+        if self.checked_at is None:
+            self.__checked(reusing_count, current_rss, config)
+        elif reusing_count - self.checked_at >= config.get("CHECK_INTERVAL", default_check_interval):
+            self.check(reusing_count, current_rss, config)
+
+    def __checked(self, reusing_count: int, current_rss: (int, None), config: dict):
+        self.checked_at = reusing_count
+        self.checked_rss = current_rss
+        if config.get("TRACEMALLOC", False):
+            self.snapshot = _snapshot()
+
+    def check(self, reusing_count: int, current_rss: (int, None), config: dict) -> (dict, None):
+        """logs a warning (and returns its report) if the growth per invocation since the last check is too high"""
+        invocations = max(reusing_count - self.checked_at, 1)
+        report = {
+            "message": "memory growth per invocation exceeds the threshold",
+            "container_reusing_count_from": self.checked_at,
+            "container_reusing_count_to": reusing_count,
+            "rss": current_rss,
+            "rss_growth_per_invocation": (current_rss - self.checked_rss) / invocations
+            if current_rss is not None and self.checked_rss is not None
+            else None,
+        }
+
+        previous_snapshot = self.snapshot
+        self.__checked(reusing_count, current_rss, config)
+        if previous_snapshot is not None and self.snapshot is not None:
+            statistics = self.snapshot.compare_to(previous_snapshot, "lineno")
+            report["traced_growth_per_invocation"] = sum(stat.size_diff for stat in statistics) / invocations
+            report["top_allocations"] = [
+                {
+                    "call_site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    "size_diff": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                    "size": stat.size,
+                }
+                for stat in statistics[: config.get("TOP", default_top)]
+                if stat.size_diff > 0
+            ]
+
+        threshold = config.get("GROWTH_THRESHOLD", default_growth_threshold)
+        growth = max(
+            report["rss_growth_per_invocation"] or 0,
+            report.get("traced_growth_per_invocation") or 0,
+        )
+        if growth > threshold:
+            logger.warning(DeferredJSON(report))
+            return report
+        return None
+
+
+memory_tracker = MemoryTracker()
@@ -0,0 +1,156 @@
+"""
+latency of the wrapper's phases (header normalization, body parsing, verification, business run, ...)
+aggregated per container into histograms and written as CloudWatch embedded metric format (EMF) lines to stdout
+
+one line per route and cold start dimension is written at the end of every invocation (FLUSH_INTERVAL 0, default)
+or of the first invocation and whenever FLUSH_INTERVAL has elapsed since the last flush
+(the durations aggregated since are lost if the container is shut down before);
+each phase's metric value is the histogram {Values, Counts, Min, Max, Sum, Count} of its durations (milliseconds)
+"""
+import sys
+from math import log
+from threading import Lock
+from time import monotonic, perf_counter, time
+from ._environ_variables import environ
+
+__all__ = ["PhaseTimer", "null_timer", "Histogram", "PhaseMetrics", "phase_metrics"]
+
+default_namespace = "aws_serverless_wrapper"
+default_flush_interval = 0
+
+# relative width of the histogram buckets, resulting in less than 100 buckets (EMF's limit) from 1µs to 100s
+bucket_factor = 1.25
+_log_bucket_factor = log(bucket_factor)
+
+
+class PhaseTimer:
+    """durations (seconds) of the phases of an invocation"""
+
+    __slots__ = ("route", "cold_start", "durations", "_started", "_mark")
+
+    def __init__(self, route: str, cold_start: bool):
+        self.route = route
+        self.cold_start = cold_start
+        self.durations = dict()
+        self._started = self._mark = perf_counter()
+
+    def mark(self):
+        self._mark = perf_counter()
+
+    def lap(self, phase: str):
+        """adds the time since the last mark to the phase"""
+        now = perf_counter()
+        self.durations[phase] = self.durations.get(phase, 0.0) + now - self._mark
+        self._mark = now
+
+    def stop(self):
+        self.durations["invocation"] = perf_counter() - self._started
+
+
+class _NullTimer:
+    """used if PHASE_METRICS is disabled"""
+
+    __slots__ = ()
+
+    def mark(self):
+        pass
+
+    def lap(self, phase: str):
+        pass
+
+    def stop(self):
+        pass
+
+
+null_timer = _NullTimer()
+
+
+class Histogram:
+    __slots__ = ("buckets", "count", "sum", "min", "max")
+
+    def __init__(self):
+        self.buckets = dict()
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def add(self, value: float):
+        bucket = round(bucket_factor ** round(log(value) / _log_bucket_factor), 6) if value > 0 else 0.0
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def as_emf(self) -> dict:
+        values = sorted(self.buckets)
+        return {
+            "Values": values,
+            "Counts": [self.buckets[value] for value in values],
+            "Min": self.min,
+            "Max": self.max,
+            "Sum": self.sum,
+            "Count": self.count,
+        }
+
+
+def _config() -> dict:
+    config = environ.snapshot.PHASE_METRICS
+    return config if isinstance(config, dict) else dict()
+
+
+class PhaseMetrics:
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.histograms = dict()
+        self.last_flush = None
+        self.__lock = Lock()
+
+    def record(self, timer: PhaseTimer):
+        """adds the durations of the invocation, writes the metrics at the first call and after FLUSH_INTERVAL"""
+        with self.__lock:
+            histograms = self.histograms.setdefault((timer.route, timer.cold_start), dict())
+            for phase, duration in timer.durations.items():
+                if phase not in histograms:
+                    histograms[phase] = Histogram()
+                histograms[phase].add(duration * 1000)
+        if (
+            self.last_flush is None
+            or monotonic() - self.last_flush >= _config().get("FLUSH_INTERVAL", default_flush_interval)
+        ):
+            self.flush()
+
+    def flush(self):
+        from ._json_codec import json_codec
+
+        with self.__lock:
+            histograms, self.histograms = self.histograms, dict()
+            self.last_flush = monotonic()
+
+        namespace = _config().get("NAMESPACE", default_namespace)
+        stream = self.stream or sys.stdout
+        for (route, cold_start), phases in histograms.items():
+            stream.write(
+                json_codec.dumps(
+                    {
+                        "_aws": {
+                            "Timestamp": int(time() * 1000),
+                            "CloudWatchMetrics": [
+                                {
+                                    "Namespace": namespace,
+                                    "Dimensions": [["route", "cold_start"]],
+                                    "Metrics": [{"Name": phase, "Unit": "Milliseconds"} for phase in phases],
+                                }
+                            ],
+                        },
+                        "route": route,
+                        "cold_start": "true" if cold_start else "false",
+                        **{phase: histogram.as_emf() for phase, histogram in phases.items()},
+                    }
+                )
+                + "\n"
+            )
+
+
+phase_metrics = PhaseMetrics()
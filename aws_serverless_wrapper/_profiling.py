@@ -0,0 +1,138 @@
+"""
+profiling of the wrapped function (LambdaHandlerOf*.run) for a share of the invocations (SAMPLE_RATE)
+or if the request contains the HEADER with the shared secret (from the environment variable SECRET_VARIABLE)
+
+MODE cprofile: deterministic profile written as pstats file
+MODE sampling: stacks of the invoking thread sampled every INTERVAL seconds, written as collapsed stacks
+(one line "frame;frame;frame count" per stack, e.g. for flamegraph.pl or speedscope)
+
+profiles are written to DIRECTORY (in /tmp) or uploaded to S3 (BUCKET, PREFIX)
+"""
+import logging
+from random import random
+from ._environ_variables import environ
+
+__all__ = ["SamplingProfiler", "should_profile", "profiled_run"]
+
+logger = logging.getLogger(__name__)
+
+default_header = "x-wrapper-profile"
+default_secret_variable = "WRAPPER_PROFILING_SECRET"
+default_mode = "cprofile"
+default_interval = 0.005
+default_directory = "/tmp/profiles"
+
+
+def _config() -> dict:
+    config = environ.snapshot.PROFILING
+    return config if isinstance(config, dict) else dict()
+
+
+def should_profile(event: dict) -> bool:
+    """if the invocation is sampled or the request contains the header with the shared secret"""
+    from hmac import compare_digest
+    from os import environ as os_environ
+
+    config = _config()
+    header_value = (event.get("headers") or dict()).get(config.get("HEADER", default_header).lower())
+    if header_value is not None:
+        secret = os_environ.get(config.get("SECRET_VARIABLE", default_secret_variable))
+        if secret and compare_digest(str(header_value).encode(), secret.encode()):
+            return True
+    return random() < config.get("SAMPLE_RATE", 0)
+
+
+class SamplingProfiler:
+    """samples the stack of the thread it was enabled in from a background thread (same interface as cProfile)"""
+
+    def __init__(self, interval: float = default_interval):
+        self.interval = interval
+        self.stacks = dict()
+        self.__thread_id = None
+        self.__stopped = None
+        self.__sampler = None
+
+    def enable(self):
+        from threading import Event, Thread, get_ident
+
+        self.__thread_id = get_ident()
+        self.__stopped = Event()
+        self.__sampler = Thread(target=self.__sample, name="wrapper_sampling_profiler", daemon=True)
+        self.__sampler.start()
+
+    def disable(self):
+        self.__stopped.set()
+        self.__sampler.join()
+
+    def __sample(self):
+        from sys import _current_frames
+
+        while not self.__stopped.wait(self.interval):
+            frame = _current_frames().get(self.__thread_id)
+            frames = list()
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                frame = frame.f_back
+            if frames:
+                stack = ";".join(reversed(frames))
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+
+def _profile_data(profiler) -> bytes:
+    if isinstance(profiler, SamplingProfiler):
+        return profiler.collapsed().encode()
+    from marshal import dumps
+
+    # the file format of pstats (as written by Profile.dump_stats)
+    profiler.create_stats()
+    return dumps(profiler.stats)
+
+
+def _store(name: str, data: bytes, config: dict) -> str:
+    if bucket := config.get("BUCKET"):
+        import boto3
+
+        key = f"{config.get('PREFIX', str())}{name}"
+        boto3.client("s3").put_object(Bucket=bucket, Key=key, Body=data)
+        return f"s3://{bucket}/{key}"
+
+    from os import makedirs, path
+
+    directory = config.get("DIRECTORY", default_directory)
+    makedirs(directory, exist_ok=True)
+    file_path = path.join(directory, name)
+    with open(file_path, "wb") as f:
+        f.write(data)
+    return file_path
+
+
+def profiled_run(run, context):
+    """calls run with the configured profiler and stores the profile (also if run raises)"""
+    from time import time
+
+    config = _config()
+    if config.get("MODE", default_mode) == "sampling":
+        profiler = SamplingProfiler(config.get("INTERVAL", default_interval))
+        extension = "collapsed"
+    else:
+        from cProfile import Profile
+
+        profiler = Profile()
+        extension = "pstats"
+
+    profiler.enable()
+    try:
+        return run()
+    finally:
+        profiler.disable()
+        function_name = getattr(context, "function_name", "function")
+        name = f"{function_name}-{getattr(context, 'aws_request_id', str())}-{int(time() * 1000)}.{extension}"
+        try:
+            location = _store(name, _profile_data(profiler), config)
+            logger.info(f"profile of the invocation written to {location}")
+        except Exception:
+            logger.exception("storing the profile failed")
@@ -0,0 +1,195 @@
+"""
+per-container cache of GET responses keyed by a hash of selected event fields (e.g. path and query parameters)
+and the credentials of the caller (Authorization header, authorizer and identity of the request context),
+thus a user specific response is never returned to another caller
+the cache is looked up after the input verification, a cached response skips the wrapped function
+and the output verification
+
+requests with Cache-Control no-cache are not answered from the cache, with no-store they are not cached either
+responses are cached only with statusCode 200 and not if their Cache-Control is no-store, no-cache or private,
+their max-age (s-maxage) limits the TTL
+"""
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from ._environ_variables import environ
+
+__all__ = ["ResponseCache", "response_cache", "dict_hash", "cache_key", "cached_response", "cache_response"]
+
+default_ttl = 5
+default_max_bytes = 8 * 1024 * 1024
+default_key_fields = ("resource", "path", "pathParameters", "queryStringParameters", "multiValueQueryStringParameters")
+default_key_headers = ("accept",)
+# always part of the key
+principal_identity_fields = ("cognitoIdentityId", "cognitoIdentityPoolId", "user", "userArn", "apiKey", "accountId")
+
+
+def _without_keys(data, ignore_keys):
+    if isinstance(data, dict):
+        return {key: _without_keys(value, ignore_keys) for key, value in data.items() if key not in ignore_keys}
+    if isinstance(data, (list, tuple)):
+        return [_without_keys(value, ignore_keys) for value in data]
+    return data
+
+
+def dict_hash(data: dict) -> str:
+    """canonical hash of a dict (dict_hash_digest_size bytes), keys of dict_hash_ignore_keys are not considered"""
+    from hashlib import blake2b
+    from json import dumps
+
+    config = environ.snapshot
+    canonical = dumps(
+        _without_keys(data, set(config.dict_hash_ignore_keys)), sort_keys=True, separators=(",", ":"), default=str
+    )
+    return blake2b(canonical.encode(), digest_size=config.dict_hash_digest_size).hexdigest()
+
+
+def _cache_control(headers: (dict, None)) -> dict:
+    """directives of the Cache-Control header (lowercase names, values without quotes)"""
+    directives = dict()
+    for key, value in (headers or dict()).items():
+        if key.lower() == "cache-control" and isinstance(value, str):
+            for directive in value.split(","):
+                name, _, argument = directive.strip().partition("=")
+                if name:
+                    directives[name.lower()] = argument.strip('"')
+    return directives
+
+
+def _route_config(event: dict) -> (dict, None):
+    """the cache config of the route of the event (top level keys overridden by ROUTES), None if not cached"""
+    config = environ.snapshot.RESPONSE_CACHE
+    config = config if isinstance(config, dict) else dict()
+    routes = config.get("ROUTES")
+    if not routes:
+        return config
+    route = routes.get(event.get("resource"), False)
+    if route is False:
+        return None
+    return {**config, **route} if isinstance(route, dict) else config
+
+
+def _copy(response: dict) -> dict:
+    # the following stages (e.g. compression) must not alter the cached response
+    if isinstance(response.get("headers"), dict):
+        return {**response, "headers": dict(response["headers"])}
+    return dict(response)
+
+
+class ResponseCache:
+    """LRU cache of responses bounded by the sum of their (serialized) sizes, entries expire after their TTL"""
+
+    def __init__(self, max_bytes: int = None):
+        self.__max_bytes = max_bytes
+        self.__entries = OrderedDict()
+        self.__lock = Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_bytes(self) -> int:
+        if self.__max_bytes is not None:
+            return self.__max_bytes
+        config = environ.snapshot.RESPONSE_CACHE
+        return config.get("MAX_BYTES", default_max_bytes) if isinstance(config, dict) else default_max_bytes
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def get(self, key: str) -> (dict, None):
+        with self.__lock:
+            if (entry := self.__entries.get(key)) is None:
+                self.misses += 1
+                return None
+            expires, size, response = entry
+            if monotonic() >= expires:
+                del self.__entries[key]
+                self.size -= size
+                self.misses += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.hits += 1
+        return _copy(response)
+
+    def put(self, key: str, response: dict, ttl: float):
+        from ._json_codec import json_codec
+
+        size = len(json_codec.dumps(response))
+        if size > self.max_bytes:
+            return
+        response = _copy(response)
+        with self.__lock:
+            if (previous := self.__entries.pop(key, None)) is not None:
+                self.size -= previous[1]
+            self.__entries[key] = (monotonic() + ttl, size, response)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted_size, _) = self.__entries.popitem(last=False)
+                self.size -= evicted_size
+
+
+response_cache = ResponseCache()
+
+
+def _principal(event: dict) -> dict:
+    request_context = event.get("requestContext") or dict()
+    identity = request_context.get("identity") or dict()
+    return {
+        "authorization": (event.get("headers") or dict()).get("authorization"),
+        "authorizer": request_context.get("authorizer"),
+        "identity": {field: identity.get(field) for field in principal_identity_fields},
+    }
+
+
+def cache_key(event: dict, config: dict) -> str:
+    """hash of the KEY_FIELDS, HEADERS (case insensitive) and the credentials of the caller of the event"""
+    headers = event.get("headers") or dict()
+    key_headers = (header.lower() for header in config.get("HEADERS", default_key_headers))
+    return dict_hash(
+        {
+            "fields": {field: event.get(field) for field in config.get("KEY_FIELDS", default_key_fields)},
+            "headers": {header: headers.get(header) for header in key_headers},
+            "principal": _principal(event),
+        }
+    )
+
+
+def cached_response(event: dict) -> tuple:
+    """(cache key, cached response); the key is None if the event is not cacheable, the response on a miss"""
+    config = _route_config(event)
+    if config is None or event.get("httpMethod") != "GET":
+        return None, None
+    directives = _cache_control(event.get("headers"))
+    if "no-store" in directives:
+        return None, None
+    key = cache_key(event, config)
+    if "no-cache" in directives:
+        return key, None
+    return key, response_cache.get(key)
+
+
+def cache_response(event: dict, key: str, response: dict):
+    """caches a successful response for the TTL of the route (limited by the response's max-age)"""
+    if not isinstance(response, dict) or response.get("statusCode") != 200:
+        return
+    directives = _cache_control(response.get("headers"))
+    if {"no-store", "no-cache", "private"} & directives.keys():
+        return
+    ttl = _route_config(event).get("TTL", default_ttl)
+    for directive in ("s-maxage", "max-age"):
+        if directive in directives:
+            try:
+                ttl = min(ttl, int(directives[directive]))
+            except ValueError:
+                return
+            break
+    if ttl > 0:
+        response_cache.put(key, response, ttl)
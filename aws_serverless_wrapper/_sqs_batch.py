@@ -0,0 +1,96 @@
+"""
+SQS batch mode: the wrapped function is called once per record, the records are processed concurrently on a
+thread pool (kept across warm invocations) and only failed records are reported back for being retried
+https://docs.aws.amazon.com/lambda/latest/dg/with-sqs.html#services-sqs-batchfailurereporting
+"""
+from ._environ_variables import environ
+
+__all__ = ["is_sqs_batch", "process_sqs_batch"]
+
+default_max_workers = 8
+
+_executor = None
+_executor_max_workers = None
+
+
+def is_sqs_batch(event: dict) -> bool:
+    return bool(
+        isinstance(event, dict)
+        and event.get("Records")
+        and isinstance(event["Records"][0], dict)
+        and event["Records"][0].get("eventSource") == "aws:sqs"
+    )
+
+
+def _batch_config() -> (int, bool):
+    config = environ.snapshot.SQS_BATCH
+    if not isinstance(config, dict):
+        config = dict()
+    return config.get("MAX_WORKERS", default_max_workers), config.get("ORDER_BY_MESSAGE_GROUP", True)
+
+
+def _get_executor(max_workers: int):
+    global _executor, _executor_max_workers
+    if _executor is None or _executor_max_workers != max_workers:
+        from concurrent.futures import ThreadPoolExecutor
+
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sqs_batch")
+        _executor_max_workers = max_workers
+    return _executor
+
+
+def _content_type(record: dict) -> str:
+    for key, attribute in record.get("messageAttributes", dict()).items():
+        if key.lower() == "content-type" and isinstance(attribute, dict) and "stringValue" in attribute:
+            return attribute["stringValue"]
+    return "application/json"
+
+
+def _group_records(records: list, order_by_message_group: bool) -> list:
+    """
+    [[record, ...], ...] every sub list gets processed sequentially (in order)
+    records without MessageGroupId (standard queues) are independent of each other
+    """
+    groups = dict()
+    independent = list()
+    for record in records:
+        message_group_id = record.get("attributes", dict()).get("MessageGroupId")
+        if order_by_message_group and message_group_id is not None:
+            groups.setdefault(message_group_id, list()).append(record)
+        else:
+            independent.append([record])
+    return list(groups.values()) + independent
+
+
+def process_sqs_batch(handler, event: dict, context, stages) -> dict:
+    """returns the batchItemFailures of all records whose processing raised an exception"""
+    max_workers, order_by_message_group = _batch_config()
+
+    def process_group(records):
+        failed = list()
+        for record in records:
+            if failed:
+                failed.append(record["messageId"])
+                continue
+            if "headers" not in record:
+                # the records of the event are not altered
+                record = {**record, "headers": {"content-type": _content_type(record)}}
+            if not type(handler)(handler.business_handler).wrap_record(record, context, stages):
+                failed.append(record["messageId"])
+        return failed
+
+    groups = _group_records(event["Records"], order_by_message_group)
+    if len(groups) == 1:
+        failed_ids = set(process_group(groups[0]))
+    else:
+        failed_ids = set()
+        for failed in _get_executor(max_workers).map(process_group, groups):
+            failed_ids.update(failed)
+
+    return {
+        "batchItemFailures": [
+            {"itemIdentifier": record["messageId"]} for record in event["Records"] if record["messageId"] in failed_ids
+        ]
+    }
@@ -0,0 +1,210 @@
+"""
+streaming response mode: a handler returns an iterator of records/chunks (or a response with such a body),
+which gets encoded incrementally and written to a sink in chunks, thus peak memory stays bounded
+
+sinks:
+    buffered (default): collects the stream into a regular response returned to the runtime,
+        an exception while streaming is handled as any other, as nothing is sent yet
+    lambda: Lambda response streaming via the runtime API, only for custom runtimes (provided.*) whose bootstrap
+        does not post the handler's return value itself; with a managed runtime (or awslambdaric) the buffered sink
+        is used instead, otherwise two responses were posted for the same invocation
+        https://docs.aws.amazon.com/lambda/latest/dg/runtimes-custom.html#runtimes-custom-response-streaming
+"""
+from collections.abc import Iterator
+from ._environ_variables import environ
+from ._json_codec import json_codec
+
+__all__ = [
+    "is_streamed_response", "prepare_stream", "streaming_sink", "stream_response", "encode_stream",
+    "BufferedSink", "LambdaResponseStreamSink", "sinks",
+]
+
+default_chunk_size = 65536
+default_sink = "buffered"
+
+_content_types = {
+    "ndjson": "application/x-ndjson",
+    "json_array": "application/json",
+    "raw": "application/octet-stream",
+}
+
+
+def is_streamed_response(response) -> bool:
+    if isinstance(response, dict):
+        response = response.get("body")
+    return isinstance(response, Iterator)
+
+
+def _streaming_config() -> dict:
+    config = environ.snapshot.STREAMING_RESPONSE
+    return config if isinstance(config, dict) else dict()
+
+
+def encode_stream(records, stream_format: str = "ndjson"):
+    """yields the encoded parts (bytes) of every record"""
+    dumps = json_codec.dumps
+    if stream_format == "ndjson":
+        for record in records:
+            yield f"{dumps(record)}\n".encode()
+    elif stream_format == "json_array":
+        separator = b"["
+        for record in records:
+            yield separator + dumps(record).encode()
+            separator = b","
+        yield b"[]" if separator == b"[" else b"]"
+    else:
+        for chunk in records:
+            yield chunk.encode() if isinstance(chunk, str) else bytes(chunk)
+
+
+def _chunked(parts, chunk_size: int):
+    buffer = bytearray()
+    for part in parts:
+        buffer += part
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def prepare_stream(response) -> dict:
+    """
+    response with encoded body chunks; the first chunk is already produced,
+    so exceptions raised by the handler before streaming can still be turned into an error response
+    """
+    if not isinstance(response, dict):
+        response = {"statusCode": 200, "body": response}
+    config = _streaming_config()
+    stream_format = config.get("FORMAT", "ndjson")
+
+    headers = dict(response.get("headers", dict()))
+    if not any(k.lower() == "content-type" for k in headers):
+        headers["Content-Type"] = _content_types[stream_format]
+
+    chunks = _chunked(encode_stream(response["body"], stream_format), config.get("CHUNK_SIZE", default_chunk_size))
+    first_chunk = next(chunks, None)
+
+    def body():
+        if first_chunk is not None:
+            yield first_chunk
+        yield from chunks
+
+    return {"statusCode": response.get("statusCode", 200), "headers": headers, "body": body()}
+
+
+class BufferedSink:
+    """
+    collects the stream into a regular response dict, nothing is sent before the stream is complete
+    binary bodies (by Content-Type or not UTF-8 decodable) are base64 encoded
+    """
+
+    incremental = False
+
+    def __init__(self, _=None):
+        self.response = None
+        self.body = bytearray()
+
+    def start(self, status_code: int, headers: dict):
+        self.response = {"statusCode": status_code, "headers": headers}
+
+    def write(self, chunk: bytes):
+        self.body += chunk
+
+    def close(self) -> dict:
+        body, self.body = self.body, None
+        if not _binary_content_type(self.response["headers"]):
+            try:
+                self.response["body"] = body.decode()
+                return self.response
+            except UnicodeDecodeError:
+                pass
+        from binascii import b2a_base64
+
+        self.response["body"] = b2a_base64(body, newline=False).decode("ascii")
+        self.response["isBase64Encoded"] = True
+        return self.response
+
+
+def _binary_content_type(headers: dict) -> bool:
+    from ._body_parsing import ContentTypeSwitch, application_octet_stream
+
+    content_type = next((v for k, v in headers.items() if k.lower() == "content-type"), None)
+    try:
+        return content_type is not None and ContentTypeSwitch.resolve(content_type) is application_octet_stream
+    except NotImplementedError:
+        return False
+
+
+class LambdaResponseStreamSink:
+    """writes the response with chunked transfer encoding to the Lambda runtime API"""
+
+    content_type = "application/vnd.awslambda.http-integration-response"
+    incremental = True
+
+    def __init__(self, context):
+        from http.client import HTTPConnection
+        from os import environ as os_environ
+
+        self.__connection = HTTPConnection(os_environ["AWS_LAMBDA_RUNTIME_API"])
+        self.__path = f"/2018-06-01/runtime/invocation/{context.aws_request_id}/response"
+
+    def start(self, status_code: int, headers: dict):
+        self.__connection.putrequest("POST", self.__path)
+        self.__connection.putheader("Lambda-Runtime-Function-Response-Mode", "streaming")
+        self.__connection.putheader("Transfer-Encoding", "chunked")
+        self.__connection.putheader("Content-Type", self.content_type)
+        self.__connection.endheaders()
+        prelude = json_codec.dumps({"statusCode": status_code, "headers": headers}).encode()
+        self.write(prelude + b"\x00" * 8)
+
+    def write(self, chunk: bytes):
+        self.__connection.send(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+
+    def close(self):
+        self.__connection.send(b"0\r\n\r\n")
+        self.__connection.getresponse().read()
+        self.__connection.close()
+
+
+sinks = {"lambda": LambdaResponseStreamSink, "buffered": BufferedSink}
+
+
+def _managed_runtime() -> bool:
+    """if the runtime's bootstrap posts the handler's return value (AWS_EXECUTION_ENV is not set for provided.*)"""
+    from os import environ as os_environ
+    from sys import modules
+
+    return "AWS_EXECUTION_ENV" in os_environ or "awslambdaric" in modules
+
+
+def streaming_sink(context):
+    """the configured sink, the buffered one if the runtime API can not be used for streaming"""
+    import logging
+
+    sink_name = _streaming_config().get("SINK", default_sink)
+    if sink_name == "lambda" and _managed_runtime():
+        logging.warning(
+            "streaming via the runtime API is only possible with a custom runtime, the response is buffered"
+        )
+        sink_name = "buffered"
+    return sinks[sink_name](context)
+
+
+def stream_response(response: dict, sink):
+    """
+    writes a prepared response to the sink and returns what the sink returns when closed
+    an exception while streaming only truncates the response of an incremental sink (as parts are already sent),
+    otherwise it is raised for being handled as any other exception
+    """
+    import logging
+
+    sink.start(response["statusCode"], response["headers"])
+    try:
+        for chunk in response["body"]:
+            sink.write(chunk)
+    except Exception:
+        if not sink.incremental:
+            raise
+        logging.exception("streaming response aborted, response is truncated")
+    return sink.close()
@@ -0,0 +1,154 @@
+"""
+structured logging of the payloads (LOG_* flags): one JSON line per record written directly to stdout
+records carry the raw objects and get serialized only when emitted
+records are only created and emitted if the level of the logger of this module is enabled (like the records of the
+logging module, e.g. INFO has to be enabled by the log level of the function)
+
+payload logging can be sampled: the decision is made once per invocation (head based),
+thus the event and response records of an invocation are logged together
+"""
+import logging
+import sys
+from random import random
+from time import time
+from ._json_codec import json_codec
+
+__all__ = ["StructuredLogger", "LogRecord", "DeferredJSON", "structured_logger"]
+
+logger = logging.getLogger(__name__)
+
+
+class DeferredJSON:
+    """message for the logging module serialized only if a handler formats it"""
+
+    __slots__ = ("item",)
+
+    def __init__(self, item):
+        self.item = item
+
+    def __str__(self):
+        return json_codec.dumps(self.item)
+
+
+def _truncated(value, max_size: int):
+    """the value or its serialization cut to max_size characters with a truncation marker"""
+    if isinstance(value, dict) and isinstance(value.get("body"), str) and len(value["body"]) > max_size:
+        # the body is cut before serializing for not serializing a large body at all
+        body = value["body"]
+        value = {**value, "body": f"{body[:max_size]}...[truncated {len(body) - max_size} characters]"}
+    serialized = json_codec.dumps(value)
+    if len(serialized) <= max_size:
+        return value
+    return f"{serialized[:max_size]}...[truncated {len(serialized) - max_size} characters]"
+
+
+class LogRecord:
+    __slots__ = ("level", "message", "fields", "metadata", "timestamp", "max_size")
+
+    def __init__(self, level: str, message: str, fields: dict, metadata: dict, max_size: int = None):
+        self.level = level
+        self.message = message
+        self.fields = fields
+        self.metadata = metadata
+        self.timestamp = time()
+        self.max_size = max_size
+
+    def as_dict(self) -> dict:
+        return {
+            "level": self.level,
+            "timestamp": self.timestamp,
+            "message": self.message,
+            **self.metadata,
+            **self.fields,
+        }
+
+    def serialize(self) -> str:
+        if self.max_size is not None:
+            self.fields = {key: _truncated(value, self.max_size) for key, value in self.fields.items()}
+        try:
+            return json_codec.dumps(self.as_dict())
+        except (TypeError, ValueError):
+            item = self.as_dict()
+            for key, value in self.fields.items():
+                try:
+                    json_codec.dumps(value)
+                except (TypeError, ValueError):
+                    item[key] = repr(value)
+            return json_codec.dumps(item)
+
+
+def _flag_config(flag) -> dict:
+    """a LOG_* flag is either a boolean or the object of SAMPLE_RATE, ALWAYS_ON_ERROR and MAX_SIZE"""
+    return flag if isinstance(flag, dict) else dict()
+
+
+class StructuredLogger:
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.metadata = dict()
+        self.sample_value = 0.0
+        self.status_code = None
+        self.deferred = list()
+
+    def bind(self, context):
+        """invocation metadata attached to every record"""
+        self.metadata = {
+            "aws_request_id": getattr(context, "aws_request_id", None),
+            "function_name": getattr(context, "function_name", None),
+            "function_version": getattr(context, "function_version", None),
+        }
+
+    def record(self, level: str, message: str, **fields) -> LogRecord:
+        return LogRecord(level, message, fields, self.metadata)
+
+    @staticmethod
+    def enabled_for(level: str) -> bool:
+        return logger.isEnabledFor(logging.getLevelName(level))
+
+    def emit(self, record: LogRecord):
+        if self.enabled_for(record.level):
+            (self.stream or sys.stdout).write(record.serialize() + "\n")
+
+    def info(self, message: str, **fields):
+        if self.enabled_for("INFO"):
+            self.emit(self.record("INFO", message, **fields))
+
+    def start_invocation(self, context):
+        self.bind(context)
+        self.sample_value = random()
+        self.status_code = None
+        self.deferred = list()
+
+    def payload(self, flag, message: str, **fields):
+        """
+        logs the payload if the invocation is sampled for the flag's SAMPLE_RATE
+        otherwise it is kept until the status code is known and logged only for 5xx (ALWAYS_ON_ERROR)
+        """
+        if not self.enabled_for("INFO"):
+            return
+        config = _flag_config(flag)
+        record = LogRecord("INFO", message, fields, self.metadata, config.get("MAX_SIZE"))
+        if self.sample_value < config.get("SAMPLE_RATE", 1):
+            self.emit(record)
+        elif config.get("ALWAYS_ON_ERROR", True):
+            if self.status_code is None:
+                # payloads get mutated by the following stages (e.g. body parsing)
+                record.fields = {key: _shallow_copy(value) for key, value in fields.items()}
+                self.deferred.append(record)
+            elif self.status_code >= 500:
+                self.emit(record)
+
+    def finish_invocation(self, status_code):
+        """emits the deferred payload records if the invocation failed (5xx)"""
+        self.status_code = status_code if isinstance(status_code, int) else 200
+        deferred, self.deferred = self.deferred, list()
+        if self.status_code >= 500:
+            for record in deferred:
+                self.emit(record)
+
+
+def _shallow_copy(value):
+    return dict.copy(value) if isinstance(value, dict) else value
+
+
+structured_logger = StructuredLogger()
@@ -0,0 +1,570 @@
+"""
+wrapper_config_schema.json embedded as python literal (no file access and json parsing on a cold start)
+generated by `python -m aws_serverless_wrapper --embed-wrapper-config-schema`, do not edit
+"""
+
+wrapper_config_schema = {'$schema': 'http://json-schema.org/draft-07/schema#',
+ '$id': 'wrapper_config_schema.json',
+ 'title': 'AWS serverless wrapper config schema',
+ 'description': 'this schema is for testing a configuration file used to configure the aws_serverless_wrapper',
+ 'type': 'object',
+ 'additionalProperties': False,
+ 'properties': {'AWS_REGION': {'description': 'specified region for AWS computing, normally provided by AWS_CONTEXT -> '
+                                              'relevant for testing',
+                               'type': 'string',
+                               'enum': ['us-east-1',
+                                        'us-east-2',
+                                        'us-west-1',
+                                        'us-west-2',
+                                        'af-south-1',
+                                        'ap-east-1',
+                                        'ap-south-1',
+                                        'ap-northeast-1',
+                                        'ap-northeast-2',
+                                        'ap-northeast-3',
+                                        'ap-southeast-1',
+                                        'ap-southeast-2',
+                                        'ca-central-1',
+                                        'cn-north-1',
+                                        'cn-northwest-1',
+                                        'eu-central-1',
+                                        'eu-north-1',
+                                        'eu-south-1',
+                                        'eu-west-1',
+                                        'eu-west-2',
+                                        'eu-west-3',
+                                        'me-south-1',
+                                        'sa-east-1']},
+                'UnitTest': {'description': 'only used for flagging a test and not running in actual productive code',
+                             'type': 'boolean'},
+                'LOG_RAW_EVENT': {'description': 'log the raw input as provided by AWS (true for logging every '
+                                                 'invocation completely)',
+                                  'oneOf': [{'type': 'boolean'}, {'$ref': '#/definitions/payload_log_config'}],
+                                  'default': False},
+                'LOG_PARSED_EVENT': {'description': 'log the parsed input as provided to the wrapped function (true '
+                                                    'for logging every invocation completely)',
+                                     'oneOf': [{'type': 'boolean'}, {'$ref': '#/definitions/payload_log_config'}],
+                                     'default': False},
+                'LOG_PRE_PARSED_RESPONSE': {'description': 'log the response as it was returned by the wrapped '
+                                                           'function (true for logging every invocation completely)',
+                                            'oneOf': [{'type': 'boolean'},
+                                                      {'$ref': '#/definitions/payload_log_config'}],
+                                            'default': False},
+                'LOG_RAW_RESPONSE': {'description': 'log the response as it gets returned from AWS to client (true for '
+                                                    'logging every invocation completely)',
+                                     'oneOf': [{'type': 'boolean'}, {'$ref': '#/definitions/payload_log_config'}],
+                                     'default': False},
+                'PARSE_BODY': {'description': 'if parsing the body for request and response shall be done (handles '
+                                              'both)',
+                               'type': 'boolean',
+                               'default': True},
+                'PARSE_EVENT_BODY': {'description': 'if parsing the body for request shall be done',
+                                     'type': 'boolean',
+                                     'default': True},
+                'PARSE_RESPONSE_BODY': {'description': 'if parsing the body for response shall be done',
+                                        'type': 'boolean',
+                                        'default': True},
+                'LAZY_BODY_PARSING': {'description': 'if parsing the request body shall be deferred until '
+                                                     'event["body"] is accessed (by the wrapped function or an input '
+                                                     'verification constraining the body)',
+                                      'type': 'boolean',
+                                      'default': False},
+                'with_context': {'description': 'if the aws context shall be passed on into the function',
+                                 'type': 'boolean',
+                                 'default': False},
+                'API_INPUT_VERIFICATION': {'description': 'if input verification from API call shall be considered '
+                                                          '(e.g. for ReST calls)',
+                                           'oneOf': [{'type': 'object',
+                                                      'additionalProperties': False,
+                                                      'properties': {'SCHEMA_ORIGIN': {'$ref': '#/definitions/schemas/properties/origin'},
+                                                                     'SCHEMA_DIRECTORY': {'$ref': '#/definitions/schemas/properties/directory'},
+                                                                     'LOG_ERRORS': {'description': 'if failed '
+                                                                                                   'validations shall '
+                                                                                                   'be logged',
+                                                                                    '$ref': '#/definitions/error_log_config'}}},
+                                                     {'type': 'boolean', 'enum': [False]}]},
+                'API_RESPONSE_VERIFICATION': {'description': 'if the response from API call shall be checked for '
+                                                             'fitting response schema (e.g. for ensuring returning '
+                                                             'correct data)',
+                                              'oneOf': [{'type': 'object',
+                                                         'additionalProperties': False,
+                                                         'properties': {'SCHEMA_ORIGIN': {'$ref': '#/definitions/schemas/properties/origin'},
+                                                                        'SCHEMA_DIRECTORY': {'$ref': '#/definitions/schemas/properties/directory'},
+                                                                        'RETURN_INTERNAL_SERVER_ERROR': {'description': 'if '
+                                                                                                                        'set '
+                                                                                                                        'to '
+                                                                                                                        'true, '
+                                                                                                                        'a '
+                                                                                                                        'missing  '
+                                                                                                                        '(4xx '
+                                                                                                                        'and '
+                                                                                                                        '5xx '
+                                                                                                                        'statusCodes '
+                                                                                                                        'are '
+                                                                                                                        'excluded '
+                                                                                                                        'and '
+                                                                                                                        'will '
+                                                                                                                        'always '
+                                                                                                                        'be '
+                                                                                                                        'returned)',
+                                                                                                         'type': 'boolean',
+                                                                                                         'default': False}}},
+                                                        {'type': 'boolean', 'enum': [False]}]},
+                'VALIDATOR_CACHE_SIZE': {'description': 'maximum number of compiled API input/response schema '
+                                                        'validators kept per container (least recently used ones are '
+                                                        'evicted); a validator is reloaded if its schema file changed, '
+                                                        'not if a file referenced by $ref changed',
+                                         'type': 'integer',
+                                         'minimum': 1,
+                                         'default': 64},
+                'JSON_CODEC': {'description': 'library for parsing/serializing JSON bodies and log items; json '
+                                              '(standard library) by default, auto: the fastest installed one of '
+                                              'orjson, ujson (>=5), simdjson and json; orjson and ujson serialize '
+                                              'compactly without spaces after the separators',
+                               'type': 'string',
+                               'enum': ['auto', 'orjson', 'ujson', 'simdjson', 'json'],
+                               'default': 'json'},
+                'SQS_BATCH': {'description': 'if SQS events shall be processed as batch: the wrapped function is '
+                                             'called once per record and a batchItemFailures response is returned '
+                                             '(true for the defaults)',
+                              'oneOf': [{'type': 'object',
+                                         'additionalProperties': False,
+                                         'properties': {'MAX_WORKERS': {'description': 'number of threads processing '
+                                                                                       'the records concurrently',
+                                                                        'type': 'integer',
+                                                                        'minimum': 1,
+                                                                        'default': 8},
+                                                        'ORDER_BY_MESSAGE_GROUP': {'description': 'process records '
+                                                                                                  'with the same '
+                                                                                                  'MessageGroupId '
+                                                                                                  '(FIFO queues) in '
+                                                                                                  'order; after a '
+                                                                                                  'failed record the '
+                                                                                                  'remaining ones of '
+                                                                                                  'its group are '
+                                                                                                  'reported as failed '
+                                                                                                  'as well',
+                                                                                   'type': 'boolean',
+                                                                                   'default': True}}},
+                                        {'type': 'boolean'}],
+                              'default': False},
+                'RESPONSE_CACHE': {'description': 'if responses of GET requests shall be cached per container (true '
+                                                  'for the defaults): the cache is looked up after the input '
+                                                  'verification, cached responses skip the wrapped function and the '
+                                                  'output verification; the credentials of the caller (Authorization '
+                                                  'header, authorizer and identity of the request context) are always '
+                                                  'part of the key; only responses with statusCode 200 are cached and '
+                                                  'the Cache-Control headers of request and response are considered',
+                                   'oneOf': [{'type': 'object',
+                                              'additionalProperties': False,
+                                              'properties': {'TTL': {'$ref': '#/definitions/response_cache_route/properties/TTL'},
+                                                             'KEY_FIELDS': {'$ref': '#/definitions/response_cache_route/properties/KEY_FIELDS'},
+                                                             'HEADERS': {'$ref': '#/definitions/response_cache_route/properties/HEADERS'},
+                                                             'MAX_BYTES': {'description': 'maximum size of all cached '
+                                                                                          'responses (serialized), '
+                                                                                          'least recently used ones '
+                                                                                          'are evicted',
+                                                                           'type': 'integer',
+                                                                           'minimum': 0,
+                                                                           'default': 8388608},
+                                                             'ROUTES': {'description': 'if specified only the '
+                                                                                       'responses of these resources '
+                                                                                       '(e.g. /items/{id}) are cached, '
+                                                                                       'the config of a route '
+                                                                                       'overrides the one above',
+                                                                        'type': 'object',
+                                                                        'additionalProperties': {'oneOf': [{'$ref': '#/definitions/response_cache_route'},
+                                                                                                           {'type': 'boolean'}]}}}},
+                                             {'type': 'boolean'}],
+                                   'default': False},
+                'IDEMPOTENCY': {'description': 'if responses of requests with an idempotency key shall be stored in a '
+                                               'DynamoDB table (hash key "id" of type string, TTL attribute '
+                                               '"expiration") and returned for retries of the request without running '
+                                               'the wrapped function; responses with 5xx statusCode are not stored',
+                                'type': 'object',
+                                'additionalProperties': False,
+                                'required': ['TABLE'],
+                                'properties': {'TABLE': {'description': 'name of the table (without stage name)',
+                                                         'type': 'string'},
+                                               'HEADER': {'description': 'request header (case insensitive) containing '
+                                                                         'the idempotency key',
+                                                          'type': 'string',
+                                                          'default': 'idempotency-key'},
+                                               'USE_PAYLOAD_HASH': {'description': 'if requests without idempotency '
+                                                                                   'key header shall use the hash of '
+                                                                                   'their payload (method, resource, '
+                                                                                   'path and query parameters, body) '
+                                                                                   'as key',
+                                                                    'type': 'boolean',
+                                                                    'default': False},
+                                               'METHODS': {'description': 'http methods of the requests handled '
+                                                                          'idempotent',
+                                                           'type': 'array',
+                                                           'items': {'type': 'string'},
+                                                           'default': ['POST', 'PUT', 'PATCH', 'DELETE']},
+                                               'EXPIRES_AFTER': {'description': 'seconds a stored response is returned '
+                                                                                'for retries',
+                                                                 'type': 'integer',
+                                                                 'minimum': 1,
+                                                                 'default': 3600},
+                                               'IN_PROGRESS_TIMEOUT': {'description': 'seconds a request is considered '
+                                                                                      'in progress if the context does '
+                                                                                      'not provide the remaining time '
+                                                                                      'of the invocation',
+                                                                       'type': 'integer',
+                                                                       'minimum': 1,
+                                                                       'default': 60}}},
+                'PHASE_METRICS': {'description': "if the latency of the wrapper's phases (header normalization, body "
+                                                 'parsing, input verification, business run, output verification, '
+                                                 'response parsing, error handling) shall be aggregated per container '
+                                                 'and written as CloudWatch embedded metric format with the dimensions '
+                                                 'route and cold_start (true for the defaults)',
+                                  'oneOf': [{'type': 'object',
+                                             'additionalProperties': False,
+                                             'properties': {'NAMESPACE': {'description': 'CloudWatch namespace of the '
+                                                                                         'metrics',
+                                                                          'type': 'string',
+                                                                          'default': 'aws_serverless_wrapper'},
+                                                            'FLUSH_INTERVAL': {'description': 'seconds the durations '
+                                                                                              'are aggregated before '
+                                                                                              'being written (at the '
+                                                                                              'end of an invocation, '
+                                                                                              'the first invocation '
+                                                                                              'always writes them), 0 '
+                                                                                              'for writing them every '
+                                                                                              'invocation; durations '
+                                                                                              'aggregated when the '
+                                                                                              'container is shut down '
+                                                                                              'are lost',
+                                                                               'type': 'number',
+                                                                               'minimum': 0,
+                                                                               'default': 0}}},
+                                            {'type': 'boolean'}],
+                                  'default': False},
+                'MEMORY_TRACKING': {'description': 'if the RSS and peak RSS shall be logged per invocation and a '
+                                                   'warning logged if the memory grows more than GROWTH_THRESHOLD per '
+                                                   'invocation across warm container reuses (true for the defaults)',
+                                    'oneOf': [{'type': 'object',
+                                               'additionalProperties': False,
+                                               'properties': {'CHECK_INTERVAL': {'description': 'invocations of the '
+                                                                                                'container between two '
+                                                                                                'checks of the memory '
+                                                                                                'growth',
+                                                                                 'type': 'integer',
+                                                                                 'minimum': 1,
+                                                                                 'default': 100},
+                                                              'GROWTH_THRESHOLD': {'description': 'bytes of memory '
+                                                                                                  'growth per '
+                                                                                                  'invocation (since '
+                                                                                                  'the last check) '
+                                                                                                  'above which a '
+                                                                                                  'warning is logged',
+                                                                                   'type': 'number',
+                                                                                   'minimum': 0,
+                                                                                   'default': 10240},
+                                                              'TRACEMALLOC': {'description': 'if allocations shall be '
+                                                                                             'traced with tracemalloc '
+                                                                                             'to name the call sites '
+                                                                                             'with the largest growth '
+                                                                                             'in the warning (slows '
+                                                                                             'down allocations)',
+                                                                              'type': 'boolean',
+                                                                              'default': False},
+                                                              'TRACEBACK_DEPTH': {'description': 'frames stored by '
+                                                                                                 'tracemalloc per '
+                                                                                                 'allocation',
+                                                                                  'type': 'integer',
+                                                                                  'minimum': 1,
+                                                                                  'default': 1},
+                                                              'TOP': {'description': 'number of call sites named in '
+                                                                                     'the warning',
+                                                                      'type': 'integer',
+                                                                      'minimum': 1,
+                                                                      'default': 10}}},
+                                              {'type': 'boolean'}],
+                                    'default': False},
+                'PROFILING': {'description': 'if the wrapped function shall be profiled for a share of the invocations '
+                                             'or for requests containing a header with a shared secret',
+                              'type': 'object',
+                              'additionalProperties': False,
+                              'properties': {'SAMPLE_RATE': {'description': 'share of the invocations being profiled '
+                                                                            '(e.g. 0.001 for 0.1%)',
+                                                             'type': 'number',
+                                                             'minimum': 0,
+                                                             'maximum': 1,
+                                                             'default': 0},
+                                             'HEADER': {'description': 'request header (case insensitive) enabling the '
+                                                                       'profiling if its value equals the shared '
+                                                                       'secret',
+                                                        'type': 'string',
+                                                        'default': 'x-wrapper-profile'},
+                                             'SECRET_VARIABLE': {'description': 'environment variable containing the '
+                                                                                'shared secret, without it the header '
+                                                                                'is ignored',
+                                                                 'type': 'string',
+                                                                 'default': 'WRAPPER_PROFILING_SECRET'},
+                                             'MODE': {'description': 'cprofile: deterministic profile written as '
+                                                                     'pstats file\n'
+                                                                     'sampling: stacks sampled every INTERVAL seconds '
+                                                                     'written as collapsed stacks (lower overhead)',
+                                                      'type': 'string',
+                                                      'enum': ['cprofile', 'sampling'],
+                                                      'default': 'cprofile'},
+                                             'INTERVAL': {'description': 'seconds between two samples of the sampling '
+                                                                         'profiler',
+                                                          'type': 'number',
+                                                          'exclusiveMinimum': 0,
+                                                          'default': 0.005},
+                                             'DIRECTORY': {'description': 'directory the profiles are written to (if '
+                                                                          'no BUCKET is specified)',
+                                                           'type': 'string',
+                                                           'default': '/tmp/profiles'},
+                                             'BUCKET': {'description': 'S3 bucket the profiles are uploaded to',
+                                                        'type': 'string'},
+                                             'PREFIX': {'description': 'prefix of the S3 keys of the profiles',
+                                                        'type': 'string'}}},
+                'STREAMING_RESPONSE': {'description': 'if the wrapped function may return an iterator (as response or '
+                                                      'response body), it gets encoded incrementally and written to a '
+                                                      'response stream (true for the defaults); the streamed body is '
+                                                      'neither verified nor logged',
+                                       'oneOf': [{'type': 'object',
+                                                  'additionalProperties': False,
+                                                  'properties': {'FORMAT': {'description': 'ndjson: one JSON document '
+                                                                                           'per record and line\n'
+                                                                                           'json_array: the records as '
+                                                                                           'JSON array\n'
+                                                                                           'raw: the chunks (str or '
+                                                                                           'bytes) as they are',
+                                                                            'type': 'string',
+                                                                            'enum': ['ndjson', 'json_array', 'raw'],
+                                                                            'default': 'ndjson'},
+                                                                 'CHUNK_SIZE': {'description': 'number of bytes '
+                                                                                               'buffered before being '
+                                                                                               'written to the stream',
+                                                                                'type': 'integer',
+                                                                                'minimum': 1,
+                                                                                'default': 65536},
+                                                                 'SINK': {'description': 'buffered: collect the stream '
+                                                                                         'into a regular response (an '
+                                                                                         'exception while streaming '
+                                                                                         'results in an error '
+                                                                                         'response, binary bodies are '
+                                                                                         'base64 encoded)\n'
+                                                                                         'lambda: Lambda response '
+                                                                                         'streaming via the runtime '
+                                                                                         'API, only with a custom '
+                                                                                         'runtime (provided.*) not '
+                                                                                         "posting the handler's return "
+                                                                                         'value itself; with a managed '
+                                                                                         'runtime the response is '
+                                                                                         'buffered',
+                                                                          'type': 'string',
+                                                                          'enum': ['buffered', 'lambda'],
+                                                                          'default': 'buffered'}}},
+                                                 {'type': 'boolean'}],
+                                       'default': False},
+                'RESPONSE_COMPRESSION': {'description': 'if response bodies shall be compressed according to the '
+                                                        'Accept-Encoding header of the request (true for the '
+                                                        'defaults); compressed bodies are returned base64 encoded',
+                                         'oneOf': [{'type': 'object',
+                                                    'additionalProperties': False,
+                                                    'properties': {'MIN_SIZE': {'description': 'minimum body length '
+                                                                                               '(characters) for being '
+                                                                                               'compressed',
+                                                                                'type': 'integer',
+                                                                                'minimum': 0,
+                                                                                'default': 1024},
+                                                                   'ENCODINGS': {'description': 'encodings in order of '
+                                                                                                'preference (br '
+                                                                                                'requires brotli to be '
+                                                                                                'installed)',
+                                                                                 'type': 'array',
+                                                                                 'items': {'type': 'string',
+                                                                                           'enum': ['br', 'gzip']},
+                                                                                 'uniqueItems': True,
+                                                                                 'default': ['br', 'gzip']},
+                                                                   'CACHE_ROUTES': {'description': 'resources (e.g. '
+                                                                                                   '/static/{file}) '
+                                                                                                   'whose compressed '
+                                                                                                   'bodies are cached '
+                                                                                                   'per container for '
+                                                                                                   'returning equal '
+                                                                                                   'responses without '
+                                                                                                   'compressing again',
+                                                                                    'type': 'array',
+                                                                                    'items': {'type': 'string'},
+                                                                                    'uniqueItems': True,
+                                                                                    'default': []},
+                                                                   'CACHE_MAX_BYTES': {'description': 'maximum size of '
+                                                                                                      'all cached '
+                                                                                                      'compressed '
+                                                                                                      'bodies, least '
+                                                                                                      'recently used '
+                                                                                                      'ones are '
+                                                                                                      'evicted',
+                                                                                       'type': 'integer',
+                                                                                       'minimum': 0,
+                                                                                       'default': 1048576}}},
+                                                   {'type': 'boolean'}],
+                                         'default': False},
+                'ERROR_LOG': {'description': 'how shall internal errors be logged?',
+                              '$ref': '#/definitions/error_log_config'}},
+ 'definitions': {'schemas': {'type': 'object',
+                             'properties': {'origin': {'description': 'if a schema validation over data shall be done, '
+                                                                      'where does the schema originate from?\n'
+                                                                      'file: load schema from a directory\n'
+                                                                      'url: load schema from a url\n'
+                                                                      'raw: provide the schema directly in this file '
+                                                                      '(or if you access the class handling the '
+                                                                      'validation directly, passing the schema '
+                                                                      'directly to the class',
+                                                       'type': 'string',
+                                                       'enum': ['file', 'url', 'raw']},
+                                            'directory': {'description': 'the file_path or url of the directory '
+                                                                         'containing the schemas',
+                                                          'type': 'string',
+                                                          'pattern': '[0-9a-zA-Z/.]*(/|.json)$'}}},
+                 'payload_log_config': {'description': 'sampled and size-bounded payload logging; the sampling '
+                                                       'decision is made once per invocation, thus flags with the same '
+                                                       'SAMPLE_RATE log the same invocations',
+                                        'type': 'object',
+                                        'additionalProperties': False,
+                                        'minProperties': 1,
+                                        'properties': {'SAMPLE_RATE': {'description': 'share of the invocations being '
+                                                                                      'logged (e.g. 0.01 for 1%)',
+                                                                       'type': 'number',
+                                                                       'minimum': 0,
+                                                                       'maximum': 1,
+                                                                       'default': 1},
+                                                       'ALWAYS_ON_ERROR': {'description': 'log invocations not sampled '
+                                                                                          'as well if the response has '
+                                                                                          'a 5xx statusCode',
+                                                                           'type': 'boolean',
+                                                                           'default': True},
+                                                       'MAX_SIZE': {'description': 'maximum number of characters '
+                                                                                   'logged of the payload, longer ones '
+                                                                                   'are truncated (with a marker)',
+                                                                    'type': 'integer',
+                                                                    'minimum': 1}}},
+                 'response_cache_route': {'type': 'object',
+                                          'additionalProperties': False,
+                                          'properties': {'TTL': {'description': 'seconds a response is cached (a lower '
+                                                                                "max-age of the response's "
+                                                                                'Cache-Control header takes '
+                                                                                'precedence)',
+                                                                 'type': 'number',
+                                                                 'minimum': 0,
+                                                                 'default': 5},
+                                                         'KEY_FIELDS': {'description': 'fields of the event the cache '
+                                                                                       'key is built of',
+                                                                        'type': 'array',
+                                                                        'items': {'type': 'string'},
+                                                                        'default': ['resource',
+                                                                                    'path',
+                                                                                    'pathParameters',
+                                                                                    'queryStringParameters',
+                                                                                    'multiValueQueryStringParameters']},
+                                                         'HEADERS': {'description': 'request headers (case '
+                                                                                    'insensitive) the cache key is '
+                                                                                    'built of additionally, e.g. if '
+                                                                                    'the response depends on them',
+                                                                     'type': 'array',
+                                                                     'items': {'type': 'string'},
+                                                                     'default': ['accept']}}},
+                 'error_sink_flush': {'description': 'error log items are buffered and written in batches',
+                                      'type': 'object',
+                                      'additionalProperties': False,
+                                      'properties': {'MODE': {'description': 'invocation: write at the end of the '
+                                                                             'invocation (before returning the '
+                                                                             'response)\n'
+                                                                             'background: write in a thread without '
+                                                                             'delaying the response (items may be lost '
+                                                                             'if the container is shut down)',
+                                                              'type': 'string',
+                                                              'enum': ['invocation', 'background'],
+                                                              'default': 'invocation'},
+                                                     'TIMEOUT': {'description': 'maximum seconds spent per flush '
+                                                                                '(incl. retries), items not written '
+                                                                                'within it are kept for the next flush',
+                                                                 'type': 'number',
+                                                                 'exclusiveMinimum': 0,
+                                                                 'default': 1}}},
+                 'error_log_config': {'description': 'basic configuration for logging errors',
+                                      'type': 'object',
+                                      'properties': {'QUEUE': {'description': 'if error log shall be put to a queue, '
+                                                                              'specify queue name here (without stage '
+                                                                              'name)',
+                                                               'oneOf': [{'type': 'string'},
+                                                                         {'type': 'object',
+                                                                          'properties': {'NAME': {'type': 'string'},
+                                                                                         'COMPRESSION_THRESHOLD': {'description': 'messages '
+                                                                                                                                  'larger '
+                                                                                                                                  'than '
+                                                                                                                                  'this '
+                                                                                                                                  '(in '
+                                                                                                                                  'characters) '
+                                                                                                                                  'are '
+                                                                                                                                  'sent '
+                                                                                                                                  'with '
+                                                                                                                                  'gzip '
+                                                                                                                                  'compressed '
+                                                                                                                                  'and '
+                                                                                                                                  'base64 '
+                                                                                                                                  'encoded '
+                                                                                                                                  'event_data',
+                                                                                                                   'type': 'integer',
+                                                                                                                   'minimum': 0,
+                                                                                                                   'default': 8192},
+                                                                                         'FLUSH': {'$ref': '#/definitions/error_sink_flush'}},
+                                                                          'required': ['NAME'],
+                                                                          'additionalProperties': False}]},
+                                                     'DATABASE': {'description': 'if error log shall be inserted into '
+                                                                                 'a database, specify database type '
+                                                                                 'and name here (without stage name)',
+                                                                  'type': 'object',
+                                                                  'properties': {'noSQL': {'type': 'string'},
+                                                                                 'SQL': {'type': 'string'},
+                                                                                 'FLUSH': {'$ref': '#/definitions/error_sink_flush'}},
+                                                                  'additionalProperties': False},
+                                                     'API_RESPONSE': {'description': 'if error log shall be returned '
+                                                                                     'in request response',
+                                                                      'type': 'boolean'},
+                                                     'LOG_EVENT_DATA': {'description': 'if the event data shall be '
+                                                                                       'contained in the error log',
+                                                                        'type': 'boolean'},
+                                                     'STACK_DEPTH': {'description': 'maximum number of (innermost) '
+                                                                                    'frames contained in the '
+                                                                                    'exception_stack of the error log',
+                                                                     'type': 'integer',
+                                                                     'minimum': 0},
+                                                     'DEDUPLICATION': {'description': 'errors of the same exception '
+                                                                                      'type, file, line and function '
+                                                                                      'are logged completely only once '
+                                                                                      'per WINDOW (seconds), repeats '
+                                                                                      'are logged as summary item with '
+                                                                                      'the number of occurrences after '
+                                                                                      'the window (at the end of the '
+                                                                                      'first invocation after it, thus '
+                                                                                      'the summary of a window still '
+                                                                                      'open when the container is shut '
+                                                                                      'down is lost) (true for the '
+                                                                                      'defaults)',
+                                                                       'oneOf': [{'type': 'object',
+                                                                                  'additionalProperties': False,
+                                                                                  'properties': {'WINDOW': {'type': 'number',
+                                                                                                            'exclusiveMinimum': 0,
+                                                                                                            'default': 60}}},
+                                                                                 {'type': 'boolean'}]},
+                                                     'CHAINED_EXCEPTIONS': {'description': 'if the exceptions an '
+                                                                                           'exception was raised from '
+                                                                                           '(or during handling of) '
+                                                                                           'shall be contained in the '
+                                                                                           'error log as '
+                                                                                           'exception_causes',
+                                                                            'type': 'boolean',
+                                                                            'default': True}},
+                                      'additionalProperties': False}},
+ 'dependencies': {'LOG_PARSED_EVENT': {'properties': {'PARSE_BODY': {'const': True},
+                                                      'PARSE_EVENT_BODY': {'const': True}}},
+                  'LOG_PRE_PARSED_RESPONSE': {'properties': {'PARSE_BODY': {'const': True},
+                                                             'PARSE_RESPONSE_BODY': {'const': True}}}}}
@@ -1,12 +1,71 @@
-from ._environ_variables import environ
+from ._environ_variables import environ, NoExceptDict
 import logging
-from requests.status_codes import _codes, codes
-from json import dumps
+from functools import lru_cache
+from ._status_codes import status_phrase, status_code_of
+from ._structured_logging import DeferredJSON
+from ._error_deduplication import error_deduplicator, fingerprint, default_window
 
 logger = logging.getLogger(__name__)
 
 
-__all__ = ["handle_exception", "log_exception", "log_api_validation_error"]
+__all__ = ["handle_exception", "log_exception", "log_api_validation_error", "report_error_summaries"]
+
+
+@lru_cache(maxsize=1024)
+def _frame_summary(code, line_no: int) -> tuple:
+    """file, line, function and formatted stack entry of a code object at a line (cached for repeatedly raised errors)"""
+    from linecache import getline
+
+    file, function = code.co_filename, code.co_name
+    entry = f'  File "{file}", line {line_no}, in {function}'
+    if source := getline(file, line_no).strip():
+        entry += f"    {source}"
+    return file, line_no, function, entry
+
+
+def _exception_type(exception: BaseException) -> str:
+    exception_type = type(exception)
+    if exception_type.__module__ in ("builtins", "__main__"):
+        return exception_type.__qualname__
+    return f"{exception_type.__module__}.{exception_type.__qualname__}"
+
+
+def _exception_details(exception: BaseException, max_depth: int = None) -> dict:
+    """type, text and the frames of the traceback (innermost max_depth ones) of the exception"""
+    frames = list()
+    tb = exception.__traceback__
+    while tb is not None:
+        frames.append(_frame_summary(tb.tb_frame.f_code, tb.tb_lineno))
+        tb = tb.tb_next
+    if max_depth is not None:
+        frames = frames[-max_depth:] if max_depth else list()
+
+    file, line_no, function, _ = frames[-1] if frames else (None, None, None, None)
+    return {
+        "exception_type": _exception_type(exception),
+        "exception_text": str(exception),
+        "exception_file": file,
+        "exception_line_no": line_no,
+        "exception_function": function,
+        "exception_stack": "".join(frame[3] for frame in frames),
+    }
+
+
+def _exception_causes(exception: BaseException, max_depth: int = None) -> list:
+    """details of the exceptions the exception was raised from (__cause__) or during handling of (__context__)"""
+    causes = list()
+    seen = {id(exception)}
+    while True:
+        if exception.__cause__ is not None:
+            exception = exception.__cause__
+        elif exception.__context__ is not None and not exception.__suppress_context__:
+            exception = exception.__context__
+        else:
+            return causes
+        if id(exception) in seen:
+            return causes
+        seen.add(id(exception))
+        causes.append(_exception_details(exception, max_depth))
 
 
 def _create_error_log_item(
@@ -14,6 +73,8 @@ def _create_error_log_item(
     exception: Exception = None,
     message: str = str(),
     event_data: dict = dict(),
+    max_depth: int = None,
+    chained: bool = True,
 ):
     from datetime import datetime
 
@@ -34,35 +95,9 @@ def _create_error_log_item(
         if isinstance(exception_data, dict) and "statusCode" in exception_data:
             item.update(exception_data)
         else:
-            from traceback import format_exc
-
-            tb = format_exc().splitlines()
-            calls = tb[1:-1]
-
-            raised_exception = tb[-1].split(":")
-            raised_exception_type = raised_exception[0]
-            if len(raised_exception) > 1:
-                raised_exception_text = raised_exception[1][1:]
-            else:
-                raised_exception_text = str()
-
-            raised_exception_call = calls[-2]
-            raised_exception_file = raised_exception_call.split('"')[1:2][0]
-            raised_exception_line_no = int(
-                raised_exception_call.split(",")[1].split(" ")[-1]
-            )
-            raised_exception_function = raised_exception_call.split(" ")[-1]
-
-            item.update(
-                {
-                    "exception_type": raised_exception_type,
-                    "exception_text": raised_exception_text,
-                    "exception_file": raised_exception_file,
-                    "exception_line_no": raised_exception_line_no,
-                    "exception_function": raised_exception_function,
-                    "exception_stack": "".join(calls),
-                }
-            )
+            item.update(_exception_details(exception, max_depth))
+            if chained and (causes := _exception_causes(exception, max_depth)):
+                item["exception_causes"] = causes
 
     if message:
         item.update({"message": message})
@@ -73,29 +108,55 @@ def _create_error_log_item(
     return item
 
 
+def _send_to_sinks(config, error_log_item: dict):
+    if queue_config := config.get("QUEUE", None):
+        from ._error_sinks import sqs_error_sink, resource_name
+
+        queue_name = queue_config["NAME"] if isinstance(queue_config, dict) else queue_config
+        sqs_error_sink.put(resource_name(queue_name), dict(error_log_item), queue_config)
+    if config.get("DATABASE", None):
+        if log_table_name := config["DATABASE"].get("noSQL", None):
+            from ._error_sinks import dynamodb_error_sink, resource_name
+
+            dynamodb_error_sink.put(resource_name(log_table_name), dict(error_log_item), config["DATABASE"])
+
+        if log_table_name := config["DATABASE"].get("SQL", None):
+            raise NotImplementedError
+
+
+def report_error_summaries():
+    """logs the summaries of the ended deduplication windows with repeated errors"""
+    for config, summary in error_deduplicator.expired():
+        logger.warning(DeferredJSON(summary))
+        _send_to_sinks(config, summary)
+
+
 def _log_error(exception, status_code, config, event_data, context, message=None):
+    deduplicated = False
     error_log_item = _create_error_log_item(
         context=context,
         exception=exception,
         event_data=event_data if config.get("LOG_EVENT_DATA", None) else None,
         message=message,
+        max_depth=config.get("STACK_DEPTH", None),
+        chained=config.get("CHAINED_EXCEPTIONS", True),
     )
 
-    if status_code is None or status_code >= 500:
-        logger.exception(dumps(error_log_item))
-    elif status_code >= 400:
-        logger.warning(dumps(error_log_item))
+    if deduplication := config.get("DEDUPLICATION", None):
+        report_error_summaries()
+        if error_fingerprint := fingerprint(error_log_item):
+            error_log_item["error_fingerprint"] = error_fingerprint
+            window = deduplication.get("WINDOW", default_window) if isinstance(deduplication, dict) else default_window
+            if not error_deduplicator.occurrence(error_fingerprint, error_log_item, window, config):
+                deduplicated = True
 
-    if config.get("QUEUE", None):
-        pass
-    if config.get("DATABASE", None):
-        if log_table_name := config["DATABASE"].get("noSQL", None):
-            from dynamo_db_resource import database_resource
+    if not deduplicated:
+        if status_code is None or status_code >= 500:
+            logger.exception(DeferredJSON(dict(error_log_item)))
+        elif status_code >= 400:
+            logger.warning(DeferredJSON(dict(error_log_item)))
 
-            database_resource[log_table_name].put(error_log_item)
-
-        if log_table_name := config["DATABASE"].get("SQL", None):
-            raise NotImplementedError
+        _send_to_sinks(config, error_log_item)
 
     if config.get("API_RESPONSE", None):
         error_log_item.pop("body", None)
@@ -103,13 +164,19 @@ def _log_error(exception, status_code, config, event_data, context, message=None
         return error_log_item
 
 
+def _validation_log_config():
+    """LOG_ERRORS of API_INPUT_VERIFICATION (which might be disabled, thus not a dict)"""
+    config = environ.snapshot.API_INPUT_VERIFICATION
+    return config["LOG_ERRORS"] if isinstance(config, dict) else NoExceptDict()
+
+
 def log_api_validation_error(validation_exception, event_data, context):
-    relevant_environ = environ["API_INPUT_VERIFICATION"]["LOG_ERRORS"]
+    relevant_environ = _validation_log_config()
     return _log_error(validation_exception, 501, relevant_environ, event_data, context)
 
 
 def log_exception(exception, event_data, context, status_code=None, message=None):
-    relevant_environ = environ["ERROR_LOG"]
+    relevant_environ = environ.snapshot.ERROR_LOG
     return _log_error(exception, status_code, relevant_environ, event_data, context, message)
 
 
@@ -127,17 +194,18 @@ def handle_exception(handler, exc):
 
     elif isinstance(exception_data, int):
         status_code = exception_data
-        body = " ".join(i.capitalize() for i in _codes[exception_data][0].split("_"))
+        body = status_phrase(exception_data)
 
     elif "abstract class" in exception_data:
         raise exc
 
     else:
-        if casted_code := codes["_".join(exception_data.split(" ")).lower()]:
+        if casted_code := status_code_of(exception_data):
             status_code = casted_code
-            body = " ".join(i.capitalize() for i in _codes[status_code][0].split("_"))
+            body = status_phrase(status_code)
 
-    if environ["API_INPUT_VERIFICATION"]["LOG_ERRORS"]["API_RESPONSE"] and status_code == 501 and "API" in body:
+    config = environ.snapshot
+    if _validation_log_config()["API_RESPONSE"] and status_code == 501 and "API" in body:
         if error_log_item := log_api_validation_error(exc, handler.request_data, handler.context):
             headers = {"Content-Type": "application/json"}
             body = {
@@ -153,7 +221,7 @@ def handle_exception(handler, exc):
             status_code,
             body if not (isinstance(exception_data, dict) and "body" in exception_data) else None
         )
-        if environ["ERROR_LOG"]["API_RESPONSE"]:
+        if config.ERROR_LOG["API_RESPONSE"]:
             headers = {"Content-Type": "application/json"}
             body = {
                 "error": body,
@@ -0,0 +1,98 @@
+"""
+media type parsing and the registry of body codecs
+
+a codec is a function (data, encoding) parsing a request body (str, or bytes if it was base64 encoded)
+and serializing a response body; it raises aws_serverless_wrapper._body_parsing.ParsingError on invalid data
+
+codecs are resolved by the exact media type (application/json), then by the structured syntax suffix (+json)
+and at last by the wildcard of the type (image/*)
+"""
+from functools import lru_cache
+from types import MappingProxyType
+from typing import NamedTuple
+
+__all__ = ["MediaType", "parse_media_type", "register_codec", "unregister_codec", "codec_for"]
+
+
+class MediaType(NamedTuple):
+    type: str
+    subtype: str
+    parameters: MappingProxyType
+
+    @property
+    def essence(self) -> str:
+        return f"{self.type}/{self.subtype}" if self.subtype else self.type
+
+    @property
+    def suffix(self) -> (str, None):
+        """structured syntax suffix, e.g. json of application/problem+json"""
+        if "+" in self.subtype:
+            return self.subtype.rsplit("+", 1)[1]
+        return None
+
+    @property
+    def charset(self) -> (str, None):
+        return self.parameters.get("charset")
+
+
+def _split_parameters(value: str):
+    """splits at ; outside of quoted strings"""
+    part, quoted, escaped = list(), False, False
+    for character in value:
+        if escaped:
+            escaped = False
+        elif character == "\\" and quoted:
+            escaped = True
+            continue
+        elif character == '"':
+            quoted = not quoted
+            continue
+        elif character == ";" and not quoted:
+            yield "".join(part)
+            part = list()
+            continue
+        part.append(character)
+    yield "".join(part)
+
+
+@lru_cache(maxsize=256)
+def parse_media_type(value: str) -> MediaType:
+    """
+    parses a Content-Type header value, e.g. 'application/json; charset=UTF-8' (memoized per distinct value)
+    type, subtype, parameter names and the charset are case-insensitive and thus lower case
+    """
+    essence, *parameters = _split_parameters(value)
+    media_type, _, subtype = essence.strip().lower().partition("/")
+
+    parsed_parameters = dict()
+    for parameter in parameters:
+        name, separator, parameter_value = parameter.partition("=")
+        if not (name := name.strip().lower()) or not separator:
+            continue
+        parameter_value = parameter_value.strip()
+        parsed_parameters[name] = parameter_value.lower() if name == "charset" else parameter_value
+
+    return MediaType(media_type.strip(), subtype.strip(), MappingProxyType(parsed_parameters))
+
+
+def register_codec(media_type: str, codec):
+    """
+    registers a codec for a media type (application/json), a suffix (+json) or a wildcard (image/*)
+    an already registered codec for it is replaced
+    """
+    from ._body_parsing import ContentTypeSwitch
+
+    ContentTypeSwitch[media_type.lower()] = codec
+
+
+def unregister_codec(media_type: str):
+    from ._body_parsing import ContentTypeSwitch
+
+    del ContentTypeSwitch[media_type.lower()]
+
+
+def codec_for(content_type: str):
+    """the codec for a Content-Type header value, raises NotImplementedError (501 response) if there is none"""
+    from ._body_parsing import ContentTypeSwitch
+
+    return ContentTypeSwitch.resolve(content_type)
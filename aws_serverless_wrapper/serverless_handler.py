@@ -3,15 +3,26 @@ from abc import ABC, abstractmethod
 from aws_serverless_wrapper.base_class import ServerlessBaseClass
 from aws_serverless_wrapper._environ_variables import environ
 from datetime import datetime
-from types import FunctionType
-from aws_serverless_wrapper._body_parsing import parse_body
-from json import load, dumps
-from os.path import dirname, realpath
+from types import FunctionType, MappingProxyType
+from collections.abc import Coroutine
+from typing import NamedTuple
+from copy import deepcopy
+from aws_serverless_wrapper._body_parsing import parse_body, parse_body_lazily, LazyBodyEvent
+from aws_serverless_wrapper.media_types import parse_media_type
+from aws_serverless_wrapper._wrapper_config_schema import wrapper_config_schema
+from aws_serverless_wrapper._structured_logging import structured_logger
+from aws_serverless_wrapper._error_sinks import flush_error_sinks
+from aws_serverless_wrapper.error_logging import report_error_summaries
+from aws_serverless_wrapper._phase_metrics import PhaseTimer, null_timer, phase_metrics
+from aws_serverless_wrapper._profiling import should_profile, profiled_run
+from aws_serverless_wrapper._memory_tracking import memory_tracker
+from aws_serverless_wrapper._streaming import is_streamed_response, prepare_stream, streaming_sink, stream_response
 
-with open(f"{dirname(realpath(__file__))}/wrapper_config_schema.json", "r") as wrapper_config_schema:
-    environ.set_schema(load(wrapper_config_schema))
+environ.set_schema(wrapper_config_schema)
 
-__all__ = ["LambdaHandlerOfClass", "LambdaHandlerOfFunction"]
+__all__ = ["LambdaHandlerOfClass", "LambdaHandlerOfFunction", "CompiledLambdaHandler", "PipelineStages"]
+
+logger = logging.getLogger(__name__)
 
 try:
     globals()["METRICS"]
@@ -22,6 +33,52 @@ except KeyError:
     }
 
 
+class PipelineStages(NamedTuple):
+    log_raw_event: bool
+    parse_event_body: bool
+    lazy_body_parsing: bool
+    log_parsed_event: bool
+    input_verification: bool
+    output_verification: bool
+    log_pre_parsed_response: bool
+    parse_response_body: bool
+    log_raw_response: bool
+    sqs_batch: bool
+    streaming_response: bool
+    compress_response: bool
+    response_cache: bool
+    idempotency: bool
+    phase_metrics: bool
+    profiling: bool
+    memory_tracking: bool
+
+    @classmethod
+    def from_environ(cls):
+        config = environ.snapshot
+        parse_body_enabled = bool(config.PARSE_BODY)
+        parse_event_body = parse_body_enabled and bool(config.PARSE_EVENT_BODY)
+        parse_response_body = parse_body_enabled and bool(config.PARSE_RESPONSE_BODY)
+        return cls(
+            log_raw_event=bool(config.LOG_RAW_EVENT),
+            parse_event_body=parse_event_body,
+            lazy_body_parsing=parse_event_body and bool(config.LAZY_BODY_PARSING),
+            log_parsed_event=parse_event_body and bool(config.LOG_PARSED_EVENT),
+            input_verification=bool(config.API_INPUT_VERIFICATION),
+            output_verification=bool(config.API_RESPONSE_VERIFICATION),
+            log_pre_parsed_response=parse_response_body and bool(config.LOG_PRE_PARSED_RESPONSE),
+            parse_response_body=parse_response_body,
+            log_raw_response=bool(config.LOG_RAW_RESPONSE),
+            sqs_batch=bool(config.SQS_BATCH),
+            streaming_response=bool(config.STREAMING_RESPONSE),
+            compress_response=bool(config.RESPONSE_COMPRESSION),
+            response_cache=bool(config.RESPONSE_CACHE),
+            idempotency=bool(config.IDEMPOTENCY),
+            phase_metrics=bool(config.PHASE_METRICS),
+            profiling=bool(config.PROFILING),
+            memory_tracking=bool(config.MEMORY_TRACKING),
+        )
+
+
 class __LambdaHandler(ABC):
     def __init__(
         self, business_handler: (ServerlessBaseClass.__subclasses__(), FunctionType),
@@ -30,6 +87,10 @@ class __LambdaHandler(ABC):
         self.business_handler = business_handler
         self.request_data = None
         self.context = None
+        self.timer = null_timer
+        self.memory_tracking = False
+        self.rss_at_start = None
+        self.idempotency_record = None
 
         if config:
             environ.set_keys(config)
@@ -38,84 +99,231 @@ class __LambdaHandler(ABC):
     def run(self):
         pass
 
+    @staticmethod
+    def _awaited(result):
+        if isinstance(result, Coroutine):
+            from ._event_loop import run_coroutine
+
+            return run_coroutine(result)
+        return result
+
     @property
     @abstractmethod
     def api_name(self) -> str:
         return str()
 
     def input_verification(self) -> (None, dict):
-        if environ["API_INPUT_VERIFICATION"]:
-            from aws_schema import APIDataValidator
+        from ._api_validation import verify_api_input
 
-            origin_type = environ["API_INPUT_VERIFICATION"]["SCHEMA_ORIGIN"]
-            origin_value = environ["API_INPUT_VERIFICATION"]["SCHEMA_DIRECTORY"]
-
-            self.request_data = APIDataValidator(
-                self.request_data, self.api_name, **{origin_type: origin_value},
-            ).data
-            # raise Not
+        verification_config = environ.snapshot.API_INPUT_VERIFICATION
+        self.request_data = verify_api_input(
+            self.request_data,
+            self.api_name,
+            verification_config["SCHEMA_ORIGIN"],
+            verification_config["SCHEMA_DIRECTORY"],
+        )
 
     def output_verification(self, response):
-        if environ["API_RESPONSE_VERIFICATION"]:
-            from aws_schema import ResponseDataValidator
-
-            origin_type = environ["API_RESPONSE_VERIFICATION"]["SCHEMA_ORIGIN"]
-            origin_value = environ["API_RESPONSE_VERIFICATION"]["SCHEMA_DIRECTORY"]
-
-            ResponseDataValidator(
-                response,
-                httpMethod=self.request_data["httpMethod"],
-                api_name=self.api_name,
-                return_error_in_response=environ["API_RESPONSE_VERIFICATION"]["RETURN_INTERNAL_SERVER_ERROR"],
-                **{origin_type: origin_value},
-            )
+        from ._api_validation import verify_api_response
+
+        verification_config = environ.snapshot.API_RESPONSE_VERIFICATION
+        verify_api_response(
+            response,
+            http_method=self.request_data["httpMethod"],
+            api_name=self.api_name,
+            origin_type=verification_config["SCHEMA_ORIGIN"],
+            origin_value=verification_config["SCHEMA_DIRECTORY"],
+            return_error_in_response=verification_config["RETURN_INTERNAL_SERVER_ERROR"],
+        )
 
-    def wrap_lambda(self, event, context) -> dict:
+    def wrap_lambda(self, event, context, stages: PipelineStages = None) -> dict:
+        try:
+            return self.__wrap_lambda(event, context, stages)
+        finally:
+            if self.timer is not null_timer:
+                self.timer.stop()
+                phase_metrics.record(self.timer)
+            if self.idempotency_record is not None and self.idempotency_record.acquired:
+                # an exception escaped after acquiring, the record must not block retries until it expires
+                self.idempotency_record.release()
+            if self.memory_tracking:
+                memory_tracker.finish_invocation(self.rss_at_start, METRICS["container_reusing_count"])
+            report_error_summaries()
+            flush_error_sinks()
+
+    def __wrap_lambda(self, event, context, stages: PipelineStages = None) -> dict:
         METRICS["container_reusing_count"] += 1
+        if stages is None:
+            environ.refresh()
+            stages = PipelineStages.from_environ()
         self.context = context
-        if environ["LOG_RAW_EVENT"]:
-            logging.info(f"raw event: {event}")
+        self.idempotency_record = None
+        self.memory_tracking = stages.memory_tracking
+        if stages.memory_tracking:
+            self.rss_at_start = memory_tracker.start_invocation()
+        if stages.phase_metrics:
+            self.timer = PhaseTimer(
+                event.get("resource") or self.business_handler.__name__, METRICS["container_reusing_count"] == 1
+            )
+        structured_logger.start_invocation(context)
+        if stages.log_raw_event:
+            structured_logger.payload(environ.snapshot.LOG_RAW_EVENT, "raw event", event=event)
 
+        if stages.sqs_batch:
+            from ._sqs_batch import is_sqs_batch, process_sqs_batch
+
+            if is_sqs_batch(event):
+                response = process_sqs_batch(self, event, context, stages)
+                structured_logger.finish_invocation(None)
+                if stages.log_raw_response:
+                    structured_logger.payload(environ.snapshot.LOG_RAW_RESPONSE, "raw response", response=response)
+                return response
+
+        self.timer.mark()
         if "headers" in event:
             event["headers"] = {k.lower(): v for k, v in event["headers"].items()}
 
         encoding = "utf-8"
         if "headers" in event and "content-type" in event["headers"]:
-            if ";" in event["headers"]["content-type"]:
-                event["headers"]["content-type"], encoding = event["headers"]["content-type"].split(";")
-                encoding = encoding.split("=")[-1]
-                # ToDo
+            media_type = parse_media_type(event["headers"]["content-type"])
+            if media_type.parameters:
+                event["headers"]["content-type"] = media_type.essence
+                encoding = media_type.charset or encoding
+        self.timer.lap("header_normalization")
+
+        idempotency_record = None
+        if stages.idempotency:
+            from ._idempotency import idempotency_record_of
 
+            # the payload is hashed before parsing the body
+            idempotency_record = self.idempotency_record = idempotency_record_of(event, context)
+
+        cache_key = None
+        streamed_response = sink = buffered_response = None
         try:
-            if environ["PARSE_BODY"] and environ["PARSE_EVENT_BODY"]:
-                event = parse_body(event, encoding)
-                if environ["LOG_PARSED_EVENT"]:
-                    logging.info(f"parsed event: {dumps(event)}")
+            if stages.parse_event_body:
+                self.timer.mark()
+                if stages.lazy_body_parsing:
+                    event = parse_body_lazily(event, encoding)
+                else:
+                    event = parse_body(event, encoding)
+                self.timer.lap("body_parsing")
+                if stages.log_parsed_event:
+                    if isinstance(event, LazyBodyEvent):
+                        event.parse_body()
+                    structured_logger.payload(environ.snapshot.LOG_PARSED_EVENT, "parsed event", event=event)
 
             self.request_data = event
-            self.input_verification()
-            if response := self.run():
-                self.output_verification(response)
+            if stages.input_verification:
+                self.timer.mark()
+                self.input_verification()
+                self.timer.lap("input_verification")
+            if stages.response_cache:
+                from ._response_cache import cached_response
+
+                # looked up after the input verification, a cached response must not answer an invalid request
+                cache_key, response = cached_response(event)
+                if response is not None:
+                    return self.__respond(response, event, stages)
+            if idempotency_record is not None and (stored_response := idempotency_record.acquire()) is not None:
+                return self.__respond(stored_response, event, stages)
+            self.timer.mark()
+            if stages.profiling and should_profile(event):
+                response = profiled_run(self.run, context)
+            else:
+                response = self.run()
+            self.timer.lap("business_run")
+            if response:
+                if stages.streaming_response and is_streamed_response(response):
+                    # the body is neither verified nor parsed for not loading it into memory
+                    streamed_response = prepare_stream(response)
+                    sink = streaming_sink(context)
+                    if not sink.incremental:
+                        # nothing is sent before the stream is complete, an exception results in an error response
+                        buffered_response = stream_response(streamed_response, sink)
+                elif stages.output_verification:
+                    self.timer.mark()
+                    self.output_verification(response)
+                    self.timer.lap("output_verification")
             else:
                 response = {"statusCode": 200}
         except Exception as e:
             from .error_logging import handle_exception
+            self.timer.mark()
             response = handle_exception(self, e)
+            self.timer.lap("error_handling")
+            streamed_response = None
 
-        if environ["PARSE_BODY"] and environ["PARSE_RESPONSE_BODY"]:
-            if environ["LOG_PRE_PARSED_RESPONSE"]:
-                logging.info(f"pre parsed response: {dumps(response)}")
+        if streamed_response is not None:
+            if idempotency_record is not None:
+                # a streamed response can not be stored
+                idempotency_record.release()
+            structured_logger.finish_invocation(streamed_response["statusCode"])
+            if stages.log_raw_response:
+                metadata = {k: v for k, v in streamed_response.items() if k != "body"}
+                structured_logger.payload(
+                    environ.snapshot.LOG_RAW_RESPONSE, "raw response", response=metadata, streamed=True
+                )
+            return buffered_response if buffered_response is not None else stream_response(streamed_response, sink)
+
+        if stages.parse_response_body:
+            if stages.log_pre_parsed_response:
+                structured_logger.payload(
+                    environ.snapshot.LOG_PRE_PARSED_RESPONSE, "pre parsed response", response=response
+                )
             try:
-                response = parse_body(response)
+                self.timer.mark()
+                response = parse_body(response, response=True)
+                self.timer.lap("response_parsing")
             except NotImplementedError as e:
                 from .error_logging import log_api_validation_error
                 log_api_validation_error(e, self.request_data, self.context)
                 response = e.args[0]
 
-        if environ["LOG_RAW_RESPONSE"]:
-            logging.info(f"raw response: {dumps(response)}")
+        if idempotency_record is not None:
+            idempotency_record.finish(response)
+
+        if cache_key is not None:
+            from ._response_cache import cache_response
+
+            cache_response(event, cache_key, response)
+
+        return self.__respond(response, event, stages)
+
+    def __respond(self, response, event, stages: PipelineStages) -> dict:
+        if stages.compress_response:
+            from ._compression import compress_response
+            self.timer.mark()
+            response = compress_response(response, event.get("headers"), event.get("resource"))
+            self.timer.lap("response_compression")
+
+        structured_logger.finish_invocation(response.get("statusCode") if isinstance(response, dict) else None)
+        if stages.log_raw_response:
+            structured_logger.payload(environ.snapshot.LOG_RAW_RESPONSE, "raw response", response=response)
         return response
 
+    def wrap_record(self, record, context, stages: PipelineStages) -> bool:
+        """processes a single record of a batch, returns False if it failed (the exception is handled and logged)"""
+        self.context = context
+        try:
+            if stages.parse_event_body:
+                record = parse_body(record)
+                if stages.log_parsed_event:
+                    structured_logger.payload(environ.snapshot.LOG_PARSED_EVENT, "parsed record", record=record)
+            self.request_data = record
+            self.run()
+            return True
+        except Exception as e:
+            from .error_logging import handle_exception
+            try:
+                handle_exception(self, e)
+            except Exception as reraised:
+                if reraised is not e:
+                    raise
+                # the exception re-raised by handle_exception (e.g. abstract class) fails this record only
+                logger.exception(f"processing record {record.get('messageId')} failed")
+            return False
+
 
 class LambdaHandlerOfClass(__LambdaHandler):
     @property
@@ -130,7 +338,7 @@ class LambdaHandlerOfClass(__LambdaHandler):
             return self.business_handler.__name__
 
     def run(self):
-        return self.business_handler(self.request_data, self.context).main()
+        return self._awaited(self.business_handler(self.request_data, self.context).main())
 
 
 class LambdaHandlerOfFunction(__LambdaHandler):
@@ -142,7 +350,52 @@ class LambdaHandlerOfFunction(__LambdaHandler):
             return self.business_handler.__name__
 
     def run(self):
-        if not environ["with_context"]:
-            return self.business_handler(self.request_data)
+        if not environ.snapshot.with_context:
+            return self._awaited(self.business_handler(self.request_data))
         else:
-            return self.business_handler(self.request_data, self.context)
+            return self._awaited(self.business_handler(self.request_data, self.context))
+
+
+def handler_class_for(business_handler) -> type:
+    if isinstance(business_handler, FunctionType):
+        return LambdaHandlerOfFunction
+    elif isinstance(business_handler, type) and issubclass(business_handler, ServerlessBaseClass):
+        return LambdaHandlerOfClass
+    else:
+        raise TypeError(
+            f"if given a class it must derive from aws_serverless_wrapper.{ServerlessBaseClass.__name__}"
+        )
+
+
+class CompiledLambdaHandler:
+    """
+    Resolves the handler kind, validates the config and selects the pipeline stages once,
+    so that warm invocations only run the stages that are enabled.
+    The stages are selected again only if the environ was changed in the meantime.
+    """
+
+    def __init__(
+        self, business_handler: (ServerlessBaseClass.__subclasses__(), FunctionType),
+        **config
+    ):
+        self.handler_class = handler_class_for(business_handler)
+        self.business_handler = business_handler
+
+        if config:
+            environ.validate_keys(config)
+        self.config = MappingProxyType(deepcopy(config))
+
+        self.stages = None
+        self.__environ_version = None
+
+    def __compile(self):
+        if self.config:
+            environ.set_keys(deepcopy(dict(self.config)), validate=False)
+        self.stages = PipelineStages.from_environ()
+        self.__environ_version = environ.version
+
+    def __call__(self, event, context) -> dict:
+        environ.refresh()
+        if self.__environ_version != environ.version:
+            self.__compile()
+        return self.handler_class(self.business_handler).wrap_lambda(event, context, self.stages)
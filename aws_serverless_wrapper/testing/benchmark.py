@@ -0,0 +1,291 @@
+"""
+benchmark of the overhead added by the wrapper to a lambda
+
+every sample runs in a fresh interpreter and measures
+    - importing the package
+    - decorating a handler
+    - the first invocation (cold start)
+    - steady-state warm invocations
+for each combination of the wrapper features (body parsing, input/response verification, logging, error path)
+
+usage: python -m aws_serverless_wrapper.testing.benchmark --output benchmark.json [--compare previous.json]
+"""
+from itertools import product
+from json import dumps, loads, dump, load
+from statistics import mean, median
+
+__all__ = ["scenarios", "run_sample", "run_scenario", "run_benchmark", "compare"]
+
+features = ("parse_body", "input_verification", "response_verification", "logging", "error")
+
+request_schema = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "type": "object",
+    "properties": {
+        "httpMethod": {"type": "string", "const": "POST"},
+        "headers": {"type": "object"},
+        "body": {
+            "type": "object",
+            "additionalProperties": False,
+            "properties": {
+                "name": {"type": "string", "maxLength": 64},
+                "count": {"type": "integer", "minimum": 0},
+                "tags": {"type": "array", "items": {"type": "string"}, "uniqueItems": True},
+            },
+            "required": ["name"],
+        },
+    },
+    "required": ["headers", "body"],
+}
+
+# without body parsing the input verification gets the body as (JSON) string
+raw_request_schema = {
+    **request_schema,
+    "properties": {
+        **request_schema["properties"],
+        "body": {"type": "string", "contentMediaType": "application/json", "maxLength": 1024},
+    },
+}
+
+response_schema = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "type": "object",
+    "additionalProperties": False,
+    "properties": {
+        "statusCode": {"type": "integer"},
+        "body": {"type": "object", "properties": {"name": {"type": "string"}, "count": {"type": "integer"}}},
+        "headers": {"type": "object", "properties": {"Content-Type": {"const": "application/json"}}},
+    },
+    "required": ["statusCode", "body", "headers"],
+}
+
+_sample_code = """
+from time import perf_counter_ns
+from json import loads, dumps
+from sys import argv
+import logging
+from os import devnull
+
+logging.basicConfig(level=logging.INFO, handlers=[logging.StreamHandler(open(devnull, "w"))], force=True)
+arguments = loads(argv[1])
+
+start = perf_counter_ns()
+from aws_serverless_wrapper import aws_serverless_wrapper
+imported = perf_counter_ns()
+
+from aws_serverless_wrapper._structured_logging import structured_logger
+structured_logger.stream = open(devnull, "w")
+
+
+def handler(event):
+    if arguments["raise_error"]:
+        raise Exception("some unexpected exception")
+    return {
+        "statusCode": 200,
+        "body": {"name": "benchmark", "count": 1},
+        "headers": {"Content-Type": "application/json"},
+    }
+
+
+handler.__name__ = "benchmark"
+wrapped = aws_serverless_wrapper(handler, **arguments["config"])
+decorated = perf_counter_ns()
+
+
+class Context:
+    aws_request_id = "uuid"
+    log_group_name = "benchmark/log/group"
+    function_name = "benchmark"
+    function_version = "$LATEST"
+
+
+response = wrapped(loads(arguments["event"]), Context)
+first_invocation = perf_counter_ns()
+
+warm_invocations = list()
+for _ in range(arguments["warm_invocations"]):
+    event = loads(arguments["event"])
+    before = perf_counter_ns()
+    wrapped(event, Context)
+    warm_invocations.append(perf_counter_ns() - before)
+
+print(dumps({
+    "import_ns": imported - start,
+    "decorate_ns": decorated - imported,
+    "first_invocation_ns": first_invocation - decorated,
+    "warm_invocation_ns": warm_invocations,
+    "status_code": response["statusCode"],
+}))
+"""
+
+
+def scenarios() -> dict:
+    """every combination of the benchmarked features, e.g. {"parse_body+logging": {"parse_body": True, ...}}"""
+    return {
+        "+".join(f for f, enabled in zip(features, combination) if enabled) or "minimal": dict(
+            zip(features, combination)
+        )
+        for combination in product((False, True), repeat=len(features))
+    }
+
+
+def _wrapper_config(scenario: dict, schema_directory: str) -> dict:
+    config = {
+        "PARSE_BODY": scenario["parse_body"],
+        "API_INPUT_VERIFICATION": False,
+        "API_RESPONSE_VERIFICATION": False,
+        "LOG_RAW_EVENT": scenario["logging"],
+        "LOG_RAW_RESPONSE": scenario["logging"],
+    }
+    if scenario["logging"] and scenario["parse_body"]:
+        config.update({"LOG_PARSED_EVENT": True, "LOG_PRE_PARSED_RESPONSE": True})
+    if scenario["input_verification"]:
+        config["API_INPUT_VERIFICATION"] = {
+            "SCHEMA_ORIGIN": "file",
+            "SCHEMA_DIRECTORY": f"{schema_directory}/{'api' if scenario['parse_body'] else 'api_raw'}/",
+            "LOG_ERRORS": {"API_RESPONSE": False},
+        }
+    if scenario["response_verification"]:
+        config["API_RESPONSE_VERIFICATION"] = {
+            "SCHEMA_ORIGIN": "file",
+            "SCHEMA_DIRECTORY": f"{schema_directory}/response/",
+            "RETURN_INTERNAL_SERVER_ERROR": False,
+        }
+    return config
+
+
+def _write_schemas(schema_directory):
+    from pathlib import Path
+
+    for sub_directory, file_name, schema in (
+        ("api", "benchmark-POST.json", request_schema),
+        ("api_raw", "benchmark-POST.json", raw_request_schema),
+        ("response", "benchmark-POST-200.json", response_schema),
+    ):
+        Path(schema_directory, sub_directory).mkdir(parents=True, exist_ok=True)
+        with open(Path(schema_directory, sub_directory, file_name), "w") as f:
+            dump(schema, f)
+
+
+def _event() -> str:
+    from .event import compose_ReST_event
+
+    return dumps(compose_ReST_event(
+        httpMethod="POST",
+        resource="/benchmark",
+        body={"name": "benchmark", "count": 1, "tags": ["a", "b"]},
+    ))
+
+
+def run_sample(scenario: dict, schema_directory: str, event: str, warm_invocations: int = 100) -> dict:
+    """one fresh interpreter measuring import, decoration, first and warm invocations"""
+    from subprocess import run
+    from sys import executable
+
+    arguments = {
+        "config": _wrapper_config(scenario, schema_directory),
+        "raise_error": scenario["error"],
+        "event": event,
+        "warm_invocations": warm_invocations,
+    }
+    process = run([executable, "-c", _sample_code, dumps(arguments)], capture_output=True, text=True)
+    if process.returncode:
+        raise RuntimeError(process.stderr.strip().splitlines()[-1])
+    return loads(process.stdout.splitlines()[-1])
+
+
+def _statistics(values: list, unit: float) -> dict:
+    values = [i / unit for i in values]
+    return {
+        "min": min(values),
+        "median": median(values),
+        "mean": mean(values),
+        "p95": sorted(values)[int(0.95 * (len(values) - 1))],
+        "max": max(values),
+    }
+
+
+def run_scenario(scenario: dict, schema_directory: str, event: str, samples: int = 5, warm_invocations: int = 100) -> dict:
+    """statistics over all samples of the scenario, failing scenarios are recorded with the raised exception"""
+    try:
+        results = [run_sample(scenario, schema_directory, event, warm_invocations) for _ in range(samples)]
+    except RuntimeError as exc:
+        return {"features": scenario, "failed": exc.args[0]}
+    return {
+        "features": scenario,
+        "status_code": results[0]["status_code"],
+        "import_ms": _statistics([r["import_ns"] for r in results], 1e6),
+        "decorate_ms": _statistics([r["decorate_ns"] for r in results], 1e6),
+        "first_invocation_ms": _statistics([r["first_invocation_ns"] for r in results], 1e6),
+        "warm_invocation_us": _statistics([i for r in results for i in r["warm_invocation_ns"]], 1e3),
+    }
+
+
+def run_benchmark(samples: int = 5, warm_invocations: int = 100, selected_scenarios: list = None) -> dict:
+    from tempfile import TemporaryDirectory
+    from platform import python_version
+    from aws_serverless_wrapper import __versions__
+
+    all_scenarios = scenarios()
+    event = _event()
+    with TemporaryDirectory() as schema_directory:
+        _write_schemas(schema_directory)
+        return {
+            "python": python_version(),
+            "aws_serverless_wrapper": __versions__,
+            "samples": samples,
+            "warm_invocations": warm_invocations,
+            "scenarios": {
+                name: run_scenario(all_scenarios[name], schema_directory, event, samples, warm_invocations)
+                for name in (selected_scenarios or all_scenarios)
+            },
+        }
+
+
+def compare(previous: dict, current: dict, metric: str = "median") -> dict:
+    """relative change (current / previous) of every measurement of the scenarios in both results"""
+    return {
+        name: {
+            measurement: current["scenarios"][name][measurement][metric] / previous["scenarios"][name][measurement][metric]
+            for measurement in ("import_ms", "decorate_ms", "first_invocation_ms", "warm_invocation_us")
+        }
+        for name in current["scenarios"]
+        if "failed" not in current["scenarios"][name]
+        and "failed" not in previous["scenarios"].get(name, {"failed": None})
+    }
+
+
+if __name__ == "__main__":
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser()
+    parser.add_argument("--output", type=str, default="benchmark.json", help="file for the JSON results")
+    parser.add_argument("--samples", type=int, default=5, help="fresh interpreters per scenario")
+    parser.add_argument("--warm-invocations", type=int, default=100, help="warm invocations per sample")
+    parser.add_argument("--scenario", nargs="+", type=str, help=f"subset of: {', '.join(scenarios())}")
+    parser.add_argument("--compare", type=str, help="previous JSON results for spotting regressions")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.samples, args.warm_invocations, args.scenario)
+    with open(args.output, "w") as f:
+        dump(results, f, indent=2)
+
+    print(f"{'scenario':<70}{'import [ms]':>14}{'first [ms]':>14}{'warm [us]':>14}")
+    for name, result in results["scenarios"].items():
+        if "failed" in result:
+            print(f"{name:<70}failed: {result['failed']}")
+            continue
+        print(
+            f"{name:<70}{result['import_ms']['median']:>14.2f}"
+            f"{result['first_invocation_ms']['median']:>14.2f}{result['warm_invocation_us']['median']:>14.1f}"
+        )
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            changes = compare(load(f), results)
+        print(f"\n{'scenario (current / previous)':<70}{'import':>14}{'first':>14}{'warm':>14}")
+        for name, change in changes.items():
+            print(
+                f"{name:<70}{change['import_ms']:>14.2f}"
+                f"{change['first_invocation_ms']:>14.2f}{change['warm_invocation_us']:>14.2f}"
+            )
@@ -1,5 +1,3 @@
-from .base_class import ServerlessBaseClass
-from types import FunctionType
 from functools import wraps, partial
 
 __all__ = ["aws_serverless_wrapper"]
@@ -9,21 +7,11 @@ def aws_serverless_wrapper(main=None, **config):
     if main is None:
         return partial(aws_serverless_wrapper, **config)
 
-    @wraps(main)
-    def wrapper(event, context):
-        if isinstance(main, FunctionType):
-            from .serverless_handler import LambdaHandlerOfFunction
-
-            return LambdaHandlerOfFunction(main, **config).wrap_lambda(event, context)
+    from .serverless_handler import CompiledLambdaHandler
 
-        else:
-            if issubclass(main, ServerlessBaseClass):
-                from .serverless_handler import LambdaHandlerOfClass
+    handler = CompiledLambdaHandler(main, **config)
 
-                return LambdaHandlerOfClass(main, **config).wrap_lambda(event, context)
-
-            else:
-                raise TypeError(
-                    f"if given a class it must derive from aws_serverless_wrapper.{ServerlessBaseClass.__name__}"
-                )
+    @wraps(main)
+    def wrapper(event, context):
+        return handler(event, context)
     return wrapper
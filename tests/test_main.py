@@ -8,3 +8,22 @@ def test_all_config_files_in_test_directory():
 
     for config_file in config_files:
         check_wrapper_config(config_file)
+
+
+def test_embedded_wrapper_config_schema_up_to_date():
+    from aws_serverless_wrapper.__main__ import render_embedded_wrapper_config_schema
+    from aws_serverless_wrapper import _wrapper_config_schema
+
+    with open(_wrapper_config_schema.__file__, "r") as f:
+        assert f.read() == render_embedded_wrapper_config_schema(), \
+            "run `python -m aws_serverless_wrapper --embed-wrapper-config-schema`"
+
+
+def test_no_heavy_dependencies_imported_at_cold_start():
+    from aws_serverless_wrapper.__main__ import import_time_report
+
+    imported_modules = {i[0] for i in import_time_report()}
+
+    assert "aws_serverless_wrapper.serverless_handler" in imported_modules
+    for heavy_dependency in ["requests", "jsonschema", "aws_schema", "boto3", "dynamo_db_resource"]:
+        assert heavy_dependency not in imported_modules
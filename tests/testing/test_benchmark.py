@@ -0,0 +1,39 @@
+from aws_serverless_wrapper.testing.benchmark import scenarios, run_benchmark, compare
+
+
+def test_all_feature_combinations_covered():
+    all_scenarios = scenarios()
+
+    assert len(all_scenarios) == 32
+    assert all_scenarios["minimal"] == {
+        "parse_body": False,
+        "input_verification": False,
+        "response_verification": False,
+        "logging": False,
+        "error": False,
+    }
+    assert all(all_scenarios["parse_body+input_verification+response_verification+logging+error"].values())
+
+
+def test_benchmark_results():
+    results = run_benchmark(samples=1, warm_invocations=3, selected_scenarios=["minimal", "parse_body+error"])
+
+    assert results["samples"] == 1
+    assert set(results["scenarios"]) == {"minimal", "parse_body+error"}
+    for result in results["scenarios"].values():
+        for measurement in ("import_ms", "decorate_ms", "first_invocation_ms", "warm_invocation_us"):
+            assert set(result[measurement]) == {"min", "median", "mean", "p95", "max"}
+            assert 0 < result[measurement]["min"] <= result[measurement]["max"]
+
+    assert compare(results, results)["minimal"] == {
+        "import_ms": 1.0, "decorate_ms": 1.0, "first_invocation_ms": 1.0, "warm_invocation_us": 1.0
+    }
+
+
+def test_every_scenario_measures_its_path():
+    results = run_benchmark(samples=1, warm_invocations=1)
+
+    assert set(results["scenarios"]) == set(scenarios())
+    for name, result in results["scenarios"].items():
+        assert "failed" not in result, name
+        assert result["status_code"] == (500 if result["features"]["error"] else 200), name
@@ -263,16 +263,16 @@ test_body = {"body_key1": "some_string", "body_key2": {"sub_key1": "abc", "sub_k
 
 
 @mark.parametrize(
-    ("log_config", "expected_part_in_logging", "stated_log_level"),
+    ("log_config", "expected_message", "expected_fields"),
     (
-            ({"LOG_RAW_EVENT": True, "API_RESPONSE_VERIFICATION": False}, f": '{dumps(test_body)}'", "INFO"),
-            ({"LOG_PARSED_EVENT": True, "API_RESPONSE_VERIFICATION": False}, f": {dumps(test_body)}", "INFO"),
-            ({"LOG_PRE_PARSED_RESPONSE": True, "API_RESPONSE_VERIFICATION": False}, f": {dumps(test_body)}", "INFO"),
-            ({"LOG_RAW_RESPONSE": True, "API_RESPONSE_VERIFICATION": False}, '"body": "{\\"', "INFO"),
+            ({"LOG_RAW_EVENT": True, "API_RESPONSE_VERIFICATION": False}, "raw event", {"event": {"body": dumps(test_body)}}),
+            ({"LOG_PARSED_EVENT": True, "API_RESPONSE_VERIFICATION": False}, "parsed event", {"event": {"body": test_body}}),
+            ({"LOG_PRE_PARSED_RESPONSE": True, "API_RESPONSE_VERIFICATION": False}, "pre parsed response", {"response": {"body": test_body}}),
+            ({"LOG_RAW_RESPONSE": True, "API_RESPONSE_VERIFICATION": False}, "raw response", {"response": {"body": dumps(test_body)}}),
     )
 )
-def test_logging_of_event_and_response(run_from_file_directory, caplog, log_config, expected_part_in_logging,
-                                       stated_log_level):
+def test_logging_of_event_and_response(run_from_file_directory, caplog, capsys, log_config, expected_message,
+                                       expected_fields):
     environ._load_config_from_file("api_response_wrapper_config.json")
     caplog.set_level(logging.INFO)
     from aws_serverless_wrapper.serverless_handler import (
@@ -295,9 +295,15 @@ def test_logging_of_event_and_response(run_from_file_directory, caplog, log_conf
 
     response = LambdaHandlerOfFunction(returning_api, **log_config).wrap_lambda(event.copy(), context)
 
-    assert len(caplog.messages) == 1
-    assert expected_part_in_logging in caplog.text
-    assert caplog.text.startswith(stated_log_level)
+    assert len(caplog.messages) == 0
+    log_lines = capsys.readouterr().out.splitlines()
+    assert len(log_lines) == 1
+    log_record = loads(log_lines[0])
+    assert log_record["level"] == "INFO"
+    assert log_record["message"] == expected_message
+    assert log_record["aws_request_id"] == context.aws_request_id
+    for key, expected_value in expected_fields.items():
+        assert expected_value.items() <= log_record[key].items()
     assert response["statusCode"] == 200
 
 
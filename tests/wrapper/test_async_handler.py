@@ -0,0 +1,115 @@
+import asyncio
+from aws_serverless_wrapper._environ_variables import environ
+from aws_serverless_wrapper.testing import fake_context as context
+from fil_io.json import load_single
+from .test_wrapper import run_from_file_directory
+
+
+def load_event():
+    return load_single(f"../schema_validation/test_data/api/request_basic.json")
+
+
+def test_async_function_run_through(run_from_file_directory):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    environ._load_config_from_file("api_response_wrapper_config.json")
+
+    event = load_event()
+
+    async def downstream_call(value):
+        await asyncio.sleep(0)
+        return value
+
+    @aws_serverless_wrapper
+    async def api_basic(event_data):
+        assert event_data == event
+        results = await asyncio.gather(*(downstream_call(i) for i in range(3)))
+        assert results == [0, 1, 2]
+
+    response = api_basic(event, context)
+    assert response["statusCode"] == 200
+
+
+def test_async_function_with_context(run_from_file_directory):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    environ._load_config_from_file("api_response_wrapper_config.json")
+
+    @aws_serverless_wrapper(with_context=True)
+    async def api_basic(event_data, context_data):
+        assert context_data == context
+        return {
+            "statusCode": 400,
+            "body": "some response text",
+            "headers": {"Content-Type": "text/plain"},
+        }
+
+    response = api_basic(load_event(), context)
+    assert response == {
+        "statusCode": 400,
+        "body": "some response text",
+        "headers": {"Content-Type": "text/plain"},
+    }
+
+
+def test_async_class_run_through_with_response(run_from_file_directory):
+    from aws_serverless_wrapper import aws_serverless_wrapper, ServerlessBaseClass
+
+    environ._load_config_from_file("api_response_wrapper_config.json")
+
+    @aws_serverless_wrapper
+    class api_basic(ServerlessBaseClass):
+        async def main(self):
+            await asyncio.sleep(0)
+            return {
+                "statusCode": 400,
+                "body": "some response text",
+                "headers": {"Content-Type": "text/plain"},
+            }
+
+    response = api_basic(load_event(), context)
+    assert response["statusCode"] == 400
+    assert response["body"] == "some response text"
+
+
+def test_async_exception_handled_by_pipeline(run_from_file_directory):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    environ._load_config_from_file("api_response_wrapper_config.json")
+
+    @aws_serverless_wrapper
+    async def api_basic(_):
+        await asyncio.sleep(0)
+        raise FileNotFoundError(
+            {
+                "statusCode": 404,
+                "body": "item in db not found",
+                "headers": {"Content-Type": "text/plain"},
+            }
+        )
+
+    response = api_basic(load_event(), context)
+    assert response == {
+        "statusCode": 404,
+        "body": "item in db not found",
+        "headers": {"Content-Type": "text/plain"},
+    }
+
+
+def test_event_loop_reused_across_warm_invocations(run_from_file_directory):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    environ._load_config_from_file("api_response_wrapper_config.json")
+
+    used_loops = list()
+
+    @aws_serverless_wrapper
+    async def api_basic(_):
+        used_loops.append(asyncio.get_running_loop())
+
+    for _ in range(3):
+        assert api_basic(load_event(), context)["statusCode"] == 200
+
+    assert len(used_loops) == 3
+    assert used_loops[0] is used_loops[1] is used_loops[2]
+    assert not used_loops[0].is_closed()
@@ -224,3 +224,136 @@ def test_parsing_config(caplog, run_from_file_directory, parse_config, response_
     else:
         with raises(raised_exception):
             LambdaHandlerOfFunction(test_func, **parse_config).wrap_lambda(event, fake_context)
+
+
+def test_base64_encoded_binary_request_body():
+    from aws_serverless_wrapper._body_parsing import parse_body
+    test_data = {
+        "body": "AAECAw==",
+        "isBase64Encoded": True,
+        "headers": {"content-type": "application/octet-stream"},
+    }
+
+    assert parse_body(test_data)["body"] == b"\x00\x01\x02\x03"
+
+
+def test_base64_encoded_image_request_body():
+    from aws_serverless_wrapper._body_parsing import parse_body
+    test_data = {
+        "body": "iVBORw0K",
+        "isBase64Encoded": True,
+        "headers": {"content-type": "image/png"},
+    }
+
+    assert parse_body(test_data)["body"] == b"\x89PNG\r\n"
+
+
+def test_base64_encoded_text_request_bodies():
+    from aws_serverless_wrapper._body_parsing import parse_body
+    from base64 import b64encode
+
+    def event(body, content_type):
+        return {
+            "body": b64encode(body.encode()).decode(),
+            "isBase64Encoded": True,
+            "headers": {"content-type": content_type},
+        }
+
+    assert parse_body(event('{"key": "value"}', "application/json"))["body"] == {"key": "value"}
+    assert parse_body(event("some text", "text/plain"))["body"] == "some text"
+    assert parse_body(event("key=value", "application/x-www-form-urlencoded"))["body"] == {"key": ["value"]}
+
+
+def test_invalid_base64_request_body():
+    from aws_serverless_wrapper._body_parsing import parse_body
+    test_data = {
+        "body": "not base64!",
+        "isBase64Encoded": True,
+        "headers": {"content-type": "application/octet-stream"},
+    }
+
+    with raises(ParsingError) as e:
+        parse_body(test_data)
+
+    assert e.value.args[0] == {
+        "statusCode": 400,
+        "body": "Body has to be base64 encoded",
+        "headers": {"Content-Type": "text/plain"},
+    }
+
+
+@mark.parametrize("body", [b"\x00\x01\x02\x03", bytearray(b"\x00\x01\x02\x03"), memoryview(b"\x00\x01\x02\x03")])
+def test_binary_response_body_base64_encoded(body):
+    from aws_serverless_wrapper._body_parsing import parse_body
+    test_data = {
+        "statusCode": 200,
+        "body": body,
+        "headers": {"Content-Type": "image/png"},
+    }
+
+    assert parse_body(test_data, response=True) == {
+        "statusCode": 200,
+        "body": "AAECAw==",
+        "isBase64Encoded": True,
+        "headers": {"Content-Type": "image/png"},
+    }
+
+
+def test_binary_json_response_body_not_parsed():
+    from aws_serverless_wrapper._body_parsing import parse_body
+    test_data = {
+        "statusCode": 200,
+        "body": b'{"a": 1}',
+        "headers": {"Content-Type": "application/json"},
+    }
+
+    assert parse_body(test_data, response=True) == {
+        "statusCode": 200,
+        "body": "eyJhIjogMX0=",
+        "isBase64Encoded": True,
+        "headers": {"Content-Type": "application/json"},
+    }
+
+
+def test_base64_encoded_response_body_kept():
+    from aws_serverless_wrapper._body_parsing import parse_body
+    test_data = {
+        "statusCode": 200,
+        "body": "AAECAw==",
+        "isBase64Encoded": True,
+        "headers": {"Content-Type": "application/octet-stream"},
+    }
+
+    assert parse_body(deepcopy(test_data), response=True) == test_data
+
+
+def test_binary_round_trip_through_wrapper(run_from_file_directory):
+    from os import environ as os_environ
+    from aws_serverless_wrapper import aws_serverless_wrapper
+    from aws_serverless_wrapper._environ_variables import environ
+
+    wrapper_config_file = os_environ.pop("WRAPPER_CONFIG_FILE", None)
+    environ._load_config_from_file("api_response_wrapper_config.json")
+
+    @aws_serverless_wrapper(API_RESPONSE_VERIFICATION=False)
+    def api_basic(event_data):
+        assert isinstance(event_data["body"], bytes)
+        return {
+            "statusCode": 200,
+            "body": event_data["body"][::-1],
+            "headers": {"Content-Type": "application/octet-stream"},
+        }
+
+    event = compose_ReST_event(httpMethod="POST", resource="/test_request_no_verification")
+    event.update(body="AAECAw==", isBase64Encoded=True, headers={"Content-Type": "application/octet-stream"})
+
+    try:
+        assert api_basic(event, fake_context) == {
+            "statusCode": 200,
+            "body": "AwIBAA==",
+            "isBase64Encoded": True,
+            "headers": {"Content-Type": "application/octet-stream"},
+        }
+    finally:
+        if wrapper_config_file:
+            os_environ["WRAPPER_CONFIG_FILE"] = wrapper_config_file
@@ -0,0 +1,202 @@
+from pytest import mark, raises
+from itertools import product
+from json import load
+from os.path import dirname, realpath
+from pathlib import Path
+from jsonschema import Draft7Validator, RefResolver
+from jsonschema.exceptions import ValidationError
+from aws_serverless_wrapper._compiled_schema import CompiledValidator, compile_schema
+
+test_data = Path(dirname(realpath(__file__))).parent / "schema_validation" / "test_data"
+
+instances = [
+    None, True, False, 0, 1, -1, 2, 1.0, 1.5, 3.0, 10, 1e308, "", "a", "abc", "2021-01-01", "A1",
+    [], [1], [1, 2], [1, 1], [1, "a"], [True, 1], [[1], [1]], [{"a": 1}, {"a": 1.0}],
+    {}, {"a": 1}, {"a": "b"}, {"b": 2}, {"a": 1, "b": 2}, {"a": 1, "c": None}, {"x1": 1}, {"x1": "y"},
+    {"a": {"a": 1}}, {"a": {"a": {"a": True}}},
+]
+
+schemas = [
+    True,
+    False,
+    {},
+    {"type": "string"},
+    {"type": "integer"},
+    {"type": "number"},
+    {"type": "boolean"},
+    {"type": "null"},
+    {"type": ["array", "object"]},
+    {"enum": ["a", "abc"]},
+    {"enum": [1, True, None, [1, 2], {"a": 1}]},
+    {"const": 1},
+    {"const": False},
+    {"const": {"a": 1.0}},
+    {"minimum": 1, "maximum": 3},
+    {"exclusiveMinimum": 1, "exclusiveMaximum": 10},
+    {"multipleOf": 2},
+    {"multipleOf": 0.5},
+    {"minLength": 1, "maxLength": 2},
+    {"pattern": "^[A-Z]"},
+    {"pattern": "b"},
+    {"minItems": 1, "maxItems": 1},
+    {"uniqueItems": True},
+    {"items": {"type": "integer"}},
+    {"items": [{"type": "integer"}], "additionalItems": False},
+    {"items": [{"const": 1}], "additionalItems": {"type": "string"}},
+    {"additionalItems": False},
+    {"items": False},
+    {"contains": {"type": "string"}},
+    {"required": ["a"]},
+    {"properties": {"a": {"type": "integer"}}, "additionalProperties": False},
+    {"properties": {"a": {}}, "additionalProperties": {"type": "integer"}},
+    {"patternProperties": {"^x": {"type": "integer"}}},
+    {"patternProperties": {"^x": True}, "additionalProperties": False},
+    {"dependencies": {"a": ["b"]}},
+    {"dependencies": {"a": {"required": ["c"]}}},
+    {"propertyNames": {"maxLength": 1}},
+    {"minProperties": 1, "maxProperties": 1},
+    {"allOf": [{"type": "object"}, {"required": ["a"]}]},
+    {"anyOf": [{"type": "string"}, {"type": "integer"}]},
+    {"oneOf": [{"type": "integer"}, {"minimum": 1}]},
+    {"not": {"type": "object"}},
+    {"if": {"type": "integer"}, "then": {"minimum": 2}, "else": {"type": "string"}},
+    {"then": {"type": "integer"}},
+    {
+        "definitions": {"node": {"properties": {"a": {"$ref": "#/definitions/node"}}, "type": ["object", "integer"]}},
+        "$ref": "#/definitions/node",
+    },
+    {"definitions": {"int": {"type": "integer"}}, "properties": {"a": {"$ref": "#/definitions/int", "type": "string"}}},
+    {"type": "object", "properties": {"a": {"$ref": "external.json#/definitions/x"}}},
+]
+
+
+@mark.parametrize("schema", schemas)
+def test_same_result_as_jsonschema(schema):
+    reference = Draft7Validator(schema)
+    compiled = CompiledValidator(schema)
+
+    for instance in instances:
+        try:
+            expected = reference.is_valid(instance)
+        except Exception as reference_exception:
+            with raises(type(reference_exception)):
+                compiled.is_valid(instance)
+            continue
+        assert compiled.is_valid(instance) is expected, instance
+
+
+@mark.parametrize("schema", schemas[:-1])
+def test_same_error_as_jsonschema(schema):
+    for instance in instances:
+        errors = [str(e) for e in Draft7Validator(schema).iter_errors(instance)]
+        assert [str(e) for e in CompiledValidator(schema).iter_errors(instance)] == errors
+
+        if errors:
+            with raises(ValidationError) as reference:
+                Draft7Validator(schema).validate(instance)
+            with raises(ValidationError) as compiled:
+                CompiledValidator(schema).validate(instance)
+            assert str(compiled.value) == str(reference.value)
+            assert compiled.value.path == reference.value.path
+
+
+def test_combined_keywords_with_generated_instances():
+    schema = {
+        "type": "object",
+        "properties": {"a": {"type": "integer", "minimum": 0}, "b": {"enum": ["x", "y"]}},
+        "required": ["a"],
+        "additionalProperties": {"type": "array", "items": {"type": "number"}, "uniqueItems": True},
+    }
+    reference = Draft7Validator(schema)
+    compiled = CompiledValidator(schema)
+
+    values = [None, -1, 0, 1.0, "x", "z", [], [1, 1], [1, 2.5], {}]
+    for a, b, c in product(values, repeat=3):
+        for instance in ({"a": a, "b": b, "c": c}, {"a": a, "c": c}, {"b": b}):
+            assert compiled.is_valid(instance) is reference.is_valid(instance), instance
+
+
+@mark.parametrize("schema_file", sorted((test_data / "api").glob("*.json")) + sorted((test_data / "response").glob("*.json")))
+def test_same_result_for_api_schemas(schema_file):
+    with open(schema_file, "r") as f:
+        schema = load(f)
+    resolver = RefResolver(f"file://{schema_file.parent}/", None)
+    reference = Draft7Validator(schema, resolver=resolver)
+    compiled = CompiledValidator(schema, resolver=resolver)
+
+    samples = [
+        {},
+        {"body": {}},
+        {"httpMethod": "POST", "body": {"body_key1": "some_string"}, "pathParameters": {}},
+        {"statusCode": 200, "body": "single_allowed_answer", "headers": {"Content-Type": "text/plain"}},
+        {"statusCode": 200, "body": {"a": 1}, "headers": {"Content-Type": "application/json"}},
+        {"body": {"response_statusCode": 200, "response_body": "single_allowed_answer"}},
+    ]
+    for instance in samples:
+        assert compiled.is_valid(instance) is reference.is_valid(instance), instance
+
+
+def test_compiled_function_cached_per_schema():
+    assert compile_schema({"type": "string"}) is compile_schema({"type": "string"})
+    assert compile_schema({"type": "string"}) is not compile_schema({"type": "integer"})
+
+
+def test_compiled_functions_bounded(monkeypatch):
+    from aws_serverless_wrapper import _compiled_schema
+
+    monkeypatch.setattr(_compiled_schema, "_compiled_schemas", _compiled_schema.OrderedDict())
+    monkeypatch.setattr(_compiled_schema, "compiled_schemas_maxsize", 2)
+
+    first = compile_schema({"maxLength": 0})
+    compile_schema({"maxLength": 1})
+    assert compile_schema({"maxLength": 0}) is first
+    compile_schema({"maxLength": 2})
+
+    assert len(_compiled_schema._compiled_schemas) == 2
+    assert compile_schema({"maxLength": 0}) is first
+    assert compile_schema({"maxLength": 1})("a")
+
+
+def test_environ_set_keys_raises_jsonschema_error():
+    from aws_serverless_wrapper._environ_variables import Environ
+
+    environ = Environ()
+    environ.set_schema({"type": "object", "properties": {"KEY": {"type": "integer"}}})
+    environ.set_keys({"KEY": 1})
+
+    with raises(ValidationError) as VE:
+        environ.set_keys({"KEY": "string"})
+    assert VE.value.message == "'string' is not of type 'integer'"
+
+
+@mark.parametrize(
+    "error_log",
+    (
+        {"QUEUE": 5},
+        {"QUEUE": {"NAME": "queue", "FLUSH": {"MODE": "never"}}},
+        {"DEDUPLICATION": "yes"},
+        {"STACK_DEPTH": -3},
+        {"CHAINED_EXCEPTIONS": "no"},
+        {"UNKNOWN_KEY": True},
+    ),
+)
+def test_error_log_config_validated(error_log):
+    from aws_serverless_wrapper._environ_variables import Environ
+    from aws_serverless_wrapper._wrapper_config_schema import wrapper_config_schema
+
+    environ = Environ()
+    environ.set_schema(wrapper_config_schema)
+    environ.set_keys(
+        {
+            "ERROR_LOG": {
+                "QUEUE": {"NAME": "queue", "COMPRESSION_THRESHOLD": 0, "FLUSH": {"TIMEOUT": 2}},
+                "DATABASE": {"noSQL": "table"},
+                "DEDUPLICATION": {"WINDOW": 10},
+                "STACK_DEPTH": 3,
+                "CHAINED_EXCEPTIONS": False,
+            }
+        }
+    )
+
+    with raises(ValidationError):
+        environ.set_keys({"ERROR_LOG": error_log})
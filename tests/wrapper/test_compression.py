@@ -0,0 +1,144 @@
+from base64 import b64decode
+from gzip import decompress
+from json import loads
+from os import environ as os_environ
+from pytest import fixture, mark
+from aws_serverless_wrapper._environ_variables import environ
+from aws_serverless_wrapper._compression import (
+    compress_response, negotiate_encoding, compression_cache, CompressionCache, compressors
+)
+from aws_serverless_wrapper.testing import fake_context as context, compose_ReST_event
+from .test_wrapper import run_from_file_directory
+
+large_body = '{"items": [' + ", ".join(['{"key": "value"}'] * 200) + "]}"
+
+
+@fixture
+def compression_environ(run_from_file_directory):
+    wrapper_config_file = os_environ.pop("WRAPPER_CONFIG_FILE", None)
+    environ._load_config_from_file("api_response_wrapper_config.json")
+    compression_cache.clear()
+    yield
+    if wrapper_config_file:
+        os_environ["WRAPPER_CONFIG_FILE"] = wrapper_config_file
+
+
+@mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        ("gzip", "gzip"),
+        ("gzip, deflate", "gzip"),
+        ("deflate", None),
+        ("gzip;q=0", None),
+        ("*", "br" if "br" in compressors else "gzip"),
+        ("*, gzip;q=0", "br" if "br" in compressors else None),
+        ("br;q=0.5, gzip;q=0.8", "gzip"),
+        ("GZIP ; Q=1", "gzip"),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_negotiate_encoding(accept_encoding, expected):
+    assert negotiate_encoding(accept_encoding) == expected
+
+
+def test_negotiate_encoding_preference():
+    if "br" in compressors:
+        assert negotiate_encoding("gzip, br", ["gzip", "br"]) == "gzip"
+        assert negotiate_encoding("gzip, br", ["br", "gzip"]) == "br"
+    assert negotiate_encoding("gzip, br", ["gzip"]) == "gzip"
+
+
+def test_compressed_response(compression_environ):
+    response = compress_response(
+        {"statusCode": 200, "body": large_body, "headers": {"Content-Type": "application/json"}},
+        {"accept-encoding": "gzip"},
+    )
+
+    assert response["isBase64Encoded"] is True
+    assert response["headers"] == {
+        "Content-Type": "application/json",
+        "Content-Encoding": "gzip",
+        "Vary": "Accept-Encoding",
+    }
+    compressed = b64decode(response["body"])
+    assert len(compressed) * 5 < len(large_body)
+    assert decompress(compressed).decode() == large_body
+
+
+@mark.parametrize(
+    ("response", "request_headers"),
+    [
+        ({"statusCode": 200, "body": "small"}, {"accept-encoding": "gzip"}),
+        ({"statusCode": 200, "body": large_body}, {}),
+        ({"statusCode": 200, "body": large_body}, {"accept-encoding": "identity"}),
+        ({"statusCode": 200, "body": large_body, "isBase64Encoded": True}, {"accept-encoding": "gzip"}),
+        ({"statusCode": 200, "body": large_body, "headers": {"content-encoding": "br"}}, {"accept-encoding": "gzip"}),
+        ({"statusCode": 204}, {"accept-encoding": "gzip"}),
+    ],
+)
+def test_response_not_compressed(compression_environ, response, request_headers):
+    assert compress_response(dict(response), request_headers) == response
+
+
+def test_vary_header_extended(compression_environ):
+    response = compress_response(
+        {"statusCode": 200, "body": large_body, "headers": {"vary": "Origin"}},
+        {"accept-encoding": "gzip"},
+    )
+    assert response["headers"] == {"Content-Encoding": "gzip", "Vary": "Origin, Accept-Encoding"}
+
+
+def test_min_size_configurable(compression_environ):
+    environ["RESPONSE_COMPRESSION"] = {"MIN_SIZE": 3}
+    response = compress_response({"statusCode": 200, "body": "small"}, {"accept-encoding": "gzip"})
+    assert decompress(b64decode(response["body"])) == b"small"
+
+
+def test_cache_of_compressed_bodies():
+    cache = CompressionCache(max_bytes=1000)
+
+    first = cache.compressed("gzip", large_body)
+    assert cache.compressed("gzip", large_body) == first
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.size == len(first)
+
+    for i in range(100):
+        cache.compressed("gzip", f"other body {i}")
+    assert cache.size <= 1000
+    cache.compressed("gzip", large_body)
+    assert (cache.hits, cache.misses) == (1, 102)
+
+
+def test_too_large_body_not_cached():
+    cache = CompressionCache(max_bytes=10)
+    cache.compressed("gzip", large_body)
+    assert len(cache) == 0
+    assert cache.size == 0
+
+
+def test_only_cache_routes_cached(compression_environ):
+    environ["RESPONSE_COMPRESSION"] = {"CACHE_ROUTES": ["/static"]}
+    response = {"statusCode": 200, "body": large_body}
+    request_headers = {"accept-encoding": "gzip"}
+
+    dynamic = compress_response(response, request_headers, "/items")
+    assert len(compression_cache) == 0
+    assert compress_response(response, request_headers, "/static") == dynamic
+    assert compress_response(response, request_headers, "/static") == dynamic
+    assert (len(compression_cache), compression_cache.hits) == (1, 1)
+
+
+def test_compression_through_wrapper(compression_environ):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    @aws_serverless_wrapper(RESPONSE_COMPRESSION=True, API_RESPONSE_VERIFICATION=False)
+    def api_basic(event_data):
+        return {"statusCode": 200, "body": loads(large_body), "headers": {"Content-Type": "application/json"}}
+
+    event = compose_ReST_event(httpMethod="POST", resource="/test_request_no_verification")
+    event["headers"] = {"Accept-Encoding": "gzip, deflate"}
+
+    response = api_basic(event, context)
+    assert response["headers"]["Content-Encoding"] == "gzip"
+    assert loads(decompress(b64decode(response["body"]))) == loads(large_body)
@@ -247,3 +247,70 @@ class TestConfiguredEnvironFromSchema(TestConfiguredEnviron):
         environ.set_schema(self.schema)
 
         self.assertEqual(self.schema["properties"]["int_key"]["default"], environ["int_key"])
+
+
+class TestEnvironSnapshot(TestEnvironVariables):
+    schema = TestConfiguredEnvironFromSchema.schema
+
+    def setUp(self) -> None:
+        from aws_serverless_wrapper._environ_variables import Environ
+
+        os_environ[
+            "WRAPPER_CONFIG_FILE"
+        ] = f"{dirname(realpath(__file__))}/_helper_wrapper_config.json"
+        self.environ = Environ()
+        self.environ.set_schema(self.schema)
+
+    def tearDown(self) -> None:
+        os_environ[
+            "WRAPPER_CONFIG_FILE"
+        ] = f"{dirname(realpath(__file__))}/_helper_wrapper_config.json"
+
+    def test_snapshot_resolves_config_and_defaults(self):
+        snapshot = self.environ.snapshot
+
+        self.assertEqual("value1", snapshot.key1)
+        self.assertEqual(3, snapshot.int_key)
+        self.assertEqual(os_environ["STAGE"], snapshot.STAGE)
+        self.assertEqual(20, snapshot.dict_hash_digest_size)
+        self.assertEqual(dict(), snapshot.bool_key)
+
+    def test_snapshot_is_immutable(self):
+        snapshot = self.environ.snapshot
+
+        with self.assertRaises(AttributeError):
+            snapshot.key1 = "other_value"
+
+    def test_snapshot_reused_until_changed(self):
+        snapshot = self.environ.snapshot
+        self.assertIs(snapshot, self.environ.snapshot)
+
+        self.environ["key1"] = "new_value"
+        self.assertIsNot(snapshot, self.environ.snapshot)
+        self.assertEqual("new_value", self.environ.snapshot.key1)
+
+        self.environ.set_keys({"bool_key": True})
+        self.assertTrue(self.environ.snapshot.bool_key)
+
+    def test_snapshot_rebuilt_on_changed_config_file(self):
+        from tempfile import TemporaryDirectory
+        from os import utime
+        from json import dump
+
+        with TemporaryDirectory() as directory:
+            config_file = f"{directory}/wrapper_config.json"
+            with open(config_file, "w") as f:
+                dump({"key1": "value1"}, f)
+            os_environ["WRAPPER_CONFIG_FILE"] = config_file
+            self.environ.refresh()
+
+            snapshot = self.environ.snapshot
+            self.environ.refresh()
+            self.assertIs(snapshot, self.environ.snapshot)
+
+            with open(config_file, "w") as f:
+                dump({"key1": "changed_value"}, f)
+            utime(config_file, ns=(0, 0))
+            self.environ.refresh()
+
+            self.assertEqual("changed_value", self.environ.snapshot.key1)
@@ -1,10 +1,11 @@
 from freezegun import freeze_time
+from pytest import fixture
 from testfixtures import LogCapture
 from os import path
-from json import dumps
+from json import dumps, loads
 from aws_serverless_wrapper.testing.context import fake_context as context
 
-exception_line_no = 17
+exception_line_no = 18
 
 
 def raise_exception_with_http_status(code, body, content_type):
@@ -411,3 +412,143 @@ def test_log_api_validation_to_SQL():
 @mark.skip("not implemented")
 def test_log_api_validation_to_queue():
     pass
+
+
+class ChainedError(Exception):
+    pass
+
+
+def raise_chained_exception():
+    try:
+        raise_exception("first line\nsecond line: with colon")
+    except Exception as e:
+        raise ChainedError("chained") from e
+
+
+def test_error_log_item_multi_line_exception_text():
+    from aws_serverless_wrapper.error_logging import _create_error_log_item
+
+    try:
+        raise_exception("first line\nsecond line: with colon")
+    except Exception as e:
+        item = _create_error_log_item(context=context, exception=e)
+
+    assert item["exception_type"] == "Exception"
+    assert item["exception_text"] == "first line\nsecond line: with colon"
+    assert item["exception_line_no"] == exception_line_no
+    assert item["exception_function"] == "raise_exception"
+    assert "exception_causes" not in item
+
+
+def test_error_log_item_chained_exception():
+    from aws_serverless_wrapper.error_logging import _create_error_log_item
+
+    try:
+        raise_chained_exception()
+    except Exception as e:
+        item = _create_error_log_item(context=context, exception=e)
+        unchained_item = _create_error_log_item(context=context, exception=e, chained=False)
+
+    assert item["exception_type"] == f"{__name__}.ChainedError"
+    assert item["exception_text"] == "chained"
+    assert item["exception_function"] == "raise_chained_exception"
+
+    (cause,) = item["exception_causes"]
+    assert cause["exception_type"] == "Exception"
+    assert cause["exception_text"] == "first line\nsecond line: with colon"
+    assert cause["exception_line_no"] == exception_line_no
+    assert cause["exception_function"] == "raise_exception"
+    assert cause["exception_stack"].endswith("raise Exception(exception_text)")
+    assert "exception_causes" not in unchained_item
+
+
+def test_error_log_item_stack_depth():
+    from aws_serverless_wrapper.error_logging import _create_error_log_item
+
+    try:
+        raise_exception_within("exception text")
+    except Exception as e:
+        item = _create_error_log_item(context=context, exception=e, max_depth=1)
+        no_stack_item = _create_error_log_item(context=context, exception=e, max_depth=0)
+
+    assert item["exception_stack"] == (
+        f'  File "{path.realpath(__file__)}", line {exception_line_no}, in raise_exception'
+        "    raise Exception(exception_text)"
+    )
+    assert item["exception_function"] == "raise_exception"
+    assert no_stack_item["exception_stack"] == ""
+
+
+def test_error_log_item_of_not_raised_exception():
+    from aws_serverless_wrapper.error_logging import _create_error_log_item
+
+    item = _create_error_log_item(context=context, exception=ValueError("not raised"))
+
+    assert item["exception_type"] == "ValueError"
+    assert item["exception_text"] == "not raised"
+    assert item["exception_file"] is None
+    assert item["exception_line_no"] is None
+    assert item["exception_stack"] == ""
+
+
+@fixture
+def deduplication_environ(monkeypatch):
+    from aws_serverless_wrapper import _error_deduplication, error_logging
+    from aws_serverless_wrapper._environ_variables import environ
+
+    now = [1000.0]
+    monkeypatch.setattr(_error_deduplication, "monotonic", lambda: now[0])
+    monkeypatch.setattr(error_logging, "error_deduplicator", _error_deduplication.ErrorDeduplicator())
+    error_log = environ["ERROR_LOG"]
+    environ["ERROR_LOG"] = {"API_RESPONSE": True, "DEDUPLICATION": {"WINDOW": 10}}
+    yield now
+    environ["ERROR_LOG"] = error_log
+
+
+def test_repeated_errors_deduplicated_within_window(deduplication_environ):
+    from aws_serverless_wrapper.error_logging import log_exception, report_error_summaries
+
+    now = deduplication_environ
+
+    with LogCapture() as log_capture:
+        items = list()
+        for timestamp in range(5):
+            now[0] += 1
+            try:
+                raise_exception(f"exception text {timestamp}")
+            except Exception as e:
+                items.append(log_exception(exception=e, event_data=dict(), context=context))
+        try:
+            raise_empty_exception()
+        except Exception as e:
+            log_exception(exception=e, event_data=dict(), context=context)
+
+        # repeats are still returned in the API response
+        assert len({item["error_fingerprint"] for item in items}) == 1
+        assert len(log_capture.records) == 2
+
+        report_error_summaries()
+        assert len(log_capture.records) == 2
+
+        now[0] += 10
+        report_error_summaries()
+
+    (first, other, summary) = [loads(str(record.msg)) for record in log_capture.records]
+    assert other["exception_type"] == "SystemError"
+    assert first["exception_text"] == "exception text 0"
+    assert summary["error_fingerprint"] == items[0]["error_fingerprint"]
+    assert summary["occurrences"] == 5
+    assert summary["exception_function"] == "raise_exception"
+    assert summary["exception_line_no"] == exception_line_no
+    assert summary["first_timestamp"] == items[0]["timestamp"]
+    assert summary["last_timestamp"] == items[-1]["timestamp"]
+    assert "exception_text" not in summary
+
+
+def test_error_fingerprint():
+    from aws_serverless_wrapper._error_deduplication import fingerprint
+
+    item = {"exception_type": "Exception", "exception_file": "file.py", "exception_line_no": 1, "exception_function": "f"}
+    assert fingerprint(item) == fingerprint({**item, "exception_text": "other text"})
+    assert fingerprint(item) != fingerprint({**item, "exception_line_no": 2})
+    assert fingerprint({"statusCode": 404}) is None
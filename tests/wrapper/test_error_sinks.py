@@ -0,0 +1,328 @@
+from pytest import fixture
+from aws_serverless_wrapper._error_sinks import DynamoDBErrorSink, SQSErrorSink, resource_name
+from aws_serverless_wrapper._environ_variables import environ
+
+error_table = "error_log"
+
+
+@fixture
+def aws_credentials(monkeypatch):
+    for key, value in {
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+        "AWS_SECURITY_TOKEN": "testing",
+        "AWS_SESSION_TOKEN": "testing",
+        "AWS_DEFAULT_REGION": "eu-central-1",
+    }.items():
+        monkeypatch.setenv(key, value)
+
+
+@fixture
+def dynamodb(aws_credentials):
+    from moto import mock_aws
+    import boto3
+
+    with mock_aws():
+        client = boto3.client("dynamodb")
+        client.create_table(
+            TableName=error_table,
+            KeySchema=[{"AttributeName": "aws_request_id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "aws_request_id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        yield client
+
+
+def error_item(index):
+    return {
+        "aws_request_id": f"request-{index}",
+        "timestamp": 1612345678.123,
+        "statusCode": 500,
+        "event_data": {"body": {"nested": [1, 2.5, None]}},
+    }
+
+
+def stored_items(client):
+    from boto3.dynamodb.types import TypeDeserializer
+
+    deserializer = TypeDeserializer()
+    return {
+        item["aws_request_id"]["S"]: {key: deserializer.deserialize(value) for key, value in item.items()}
+        for item in client.scan(TableName=error_table)["Items"]
+    }
+
+
+def test_buffered_until_flushed(dynamodb):
+    sink = DynamoDBErrorSink()
+    for index in range(60):
+        sink.put(error_table, error_item(index))
+
+    assert sink.pending == 60
+    assert stored_items(dynamodb) == {}
+
+    sink.flush()
+
+    assert sink.pending == 0
+    items = stored_items(dynamodb)
+    assert len(items) == 60
+    assert items["request-0"]["event_data"] == {"body": {"nested": [1, 2.5, None]}}
+    assert float(items["request-0"]["timestamp"]) == 1612345678.123
+
+
+class FlakyClient:
+    """leaves the last item of every batch unprocessed for the first calls"""
+
+    def __init__(self, client, unprocessed_calls):
+        self.client = client
+        self.unprocessed_calls = unprocessed_calls
+        self.calls = 0
+
+    def batch_write_item(self, RequestItems):
+        self.calls += 1
+        ((table, requests),) = RequestItems.items()
+        if self.calls <= self.unprocessed_calls:
+            if requests[:-1]:
+                self.client.batch_write_item(RequestItems={table: requests[:-1]})
+            return {"UnprocessedItems": {table: requests[-1:]}}
+        return self.client.batch_write_item(RequestItems=RequestItems)
+
+
+def test_unprocessed_items_retried(dynamodb):
+    sink = DynamoDBErrorSink()
+    sink.client = FlakyClient(dynamodb, unprocessed_calls=2)
+    for index in range(3):
+        sink.put(error_table, error_item(index))
+
+    sink.flush(timeout=5)
+
+    assert sink.pending == 0
+    assert sink.client.calls == 3
+    assert len(stored_items(dynamodb)) == 3
+
+
+def test_unprocessed_items_kept_after_timeout(dynamodb):
+    sink = DynamoDBErrorSink()
+    sink.client = FlakyClient(dynamodb, unprocessed_calls=100)
+    for index in range(3):
+        sink.put(error_table, error_item(index))
+
+    sink.flush(timeout=0.01)
+
+    assert sink.pending == 1
+    sink.client.unprocessed_calls = 0
+    sink.flush()
+    assert sink.pending == 0
+    assert len(stored_items(dynamodb)) == 3
+
+
+def test_not_retryable_error_drops_batch(dynamodb, caplog):
+    sink = DynamoDBErrorSink()
+    sink.put("not_existing_table", error_item(0))
+
+    sink.flush()
+
+    assert sink.pending == 0
+    assert "writing 1 error log items to not_existing_table failed" in caplog.text
+
+
+def test_background_flush(dynamodb):
+    sink = DynamoDBErrorSink()
+    sink.put(error_table, error_item(0))
+
+    sink.flush_in_background()
+    sink._background.join(5)
+
+    assert len(stored_items(dynamodb)) == 1
+
+
+def test_duplicate_keys_written_item_by_item(dynamodb):
+    sink = DynamoDBErrorSink()
+    # the records of an SQS batch share the aws_request_id
+    for index in range(3):
+        sink.put(error_table, {**error_item(0), "message": f"record {index}"})
+    sink.put(error_table, error_item(1))
+
+    sink.flush()
+
+    assert sink.pending == 0
+    items = stored_items(dynamodb)
+    assert set(items) == {"request-0", "request-1"}
+    assert items["request-0"]["message"] == "record 2"
+
+
+def test_flush_config_of_originating_section(dynamodb):
+    sink = DynamoDBErrorSink()
+    sink.put(error_table, error_item(0), {"noSQL": error_table, "FLUSH": {"MODE": "background", "TIMEOUT": 3}})
+
+    assert sink.flush_config(error_table) == {"MODE": "background", "TIMEOUT": 3}
+    sink.flush_at_invocation_end()
+    sink._background.join(5)
+
+    assert sink.pending == 0
+    assert len(stored_items(dynamodb)) == 1
+
+
+def test_resource_name_with_stage_and_stack(monkeypatch):
+    monkeypatch.delenv("DYNAMO_DB_RESOURCE_STAGE_NAME", raising=False)
+    monkeypatch.delenv("DYNAMO_DB_RESOURCE_STACK_NAME", raising=False)
+    assert resource_name("error_log") == "error_log"
+
+    monkeypatch.setenv("DYNAMO_DB_RESOURCE_STAGE_NAME", "TEST")
+    monkeypatch.setenv("DYNAMO_DB_RESOURCE_STACK_NAME", "stack")
+    assert resource_name("error_log") == "TEST-stack-error_log"
+
+
+def test_error_logged_to_table_at_invocation_end(dynamodb, monkeypatch):
+    from aws_serverless_wrapper._error_sinks import dynamodb_error_sink
+    from aws_serverless_wrapper.serverless_handler import LambdaHandlerOfFunction
+    from aws_serverless_wrapper.testing import fake_context as context
+
+    monkeypatch.delenv("DYNAMO_DB_RESOURCE_STAGE_NAME", raising=False)
+    monkeypatch.delenv("DYNAMO_DB_RESOURCE_STACK_NAME", raising=False)
+    monkeypatch.setattr(dynamodb_error_sink, "client", dynamodb)
+    environ["API_INPUT_VERIFICATION"] = {}
+
+    def failing(_):
+        raise Exception({"statusCode": 500, "body": "failed", "headers": {"Content-Type": "text/plain"}})
+
+    response = LambdaHandlerOfFunction(
+        failing,
+        PARSE_BODY=False,
+        API_RESPONSE_VERIFICATION=False,
+        ERROR_LOG={"DATABASE": {"noSQL": error_table}, "API_RESPONSE": False},
+    ).wrap_lambda({"httpMethod": "GET"}, context)
+
+    assert response["statusCode"] == 500
+    assert dynamodb_error_sink.pending == 0
+    assert stored_items(dynamodb)[context.aws_request_id]["body"] == "failed"
+
+
+error_queue = "error_queue"
+
+
+@fixture
+def sqs(aws_credentials):
+    from moto import mock_aws
+    import boto3
+
+    with mock_aws():
+        client = boto3.client("sqs")
+        client.create_queue(QueueName=error_queue)
+        yield client
+
+
+def received_items(client):
+    from json import loads
+
+    queue_url = client.get_queue_url(QueueName=error_queue)["QueueUrl"]
+    items = dict()
+    while messages := client.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=10).get("Messages"):
+        for message in messages:
+            item = loads(message["Body"])
+            items[item["aws_request_id"]] = item
+            client.delete_message(QueueUrl=queue_url, ReceiptHandle=message["ReceiptHandle"])
+    return items
+
+
+class RecordingClient:
+    def __init__(self, client):
+        self.client = client
+        self.batches = list()
+
+    def get_queue_url(self, **kwargs):
+        return self.client.get_queue_url(**kwargs)
+
+    def send_message_batch(self, QueueUrl, Entries):
+        self.batches.append(Entries)
+        return self.client.send_message_batch(QueueUrl=QueueUrl, Entries=Entries)
+
+
+def test_queue_messages_sent_in_batches_of_10(sqs):
+    sink = SQSErrorSink()
+    sink.client = RecordingClient(sqs)
+    for index in range(25):
+        sink.put(error_queue, error_item(index))
+
+    assert received_items(sqs) == {}
+    sink.flush()
+
+    assert sink.pending == 0
+    assert [len(batch) for batch in sink.client.batches] == [10, 10, 5]
+    items = received_items(sqs)
+    assert len(items) == 25
+    assert items["request-0"]["event_data"] == {"body": {"nested": [1, 2.5, None]}}
+
+
+def test_large_event_data_compressed(sqs):
+    from base64 import b64decode
+    from gzip import decompress
+    from json import loads
+
+    sink = SQSErrorSink()
+    sink.client = sqs
+    item = {**error_item(0), "event_data": {"body": "x" * 20000}}
+    sink.put(error_queue, item)
+    sink.flush()
+
+    received = received_items(sqs)["request-0"]
+    assert received["event_data_encoding"] == "gzip/base64"
+    assert loads(decompress(b64decode(received["event_data"]))) == {"body": "x" * 20000}
+
+
+def test_message_size_guard(sqs):
+    from os import urandom
+
+    sink = SQSErrorSink()
+    sink.client = RecordingClient(sqs)
+    # random data does not compress below the message size limit
+    large = {**error_item(0), "event_data": {"body": urandom(200000).hex()}}
+    sink.put(error_queue, large)
+    sink.put(error_queue, {**error_item(1), "message": "y" * 200000})
+    sink.put(error_queue, {**error_item(2), "message": "z" * 300000})
+    sink.put(error_queue, {**error_item(3), "message": "y" * 200000})
+
+    assert sink.pending == 3
+    sink.flush()
+
+    # two messages of 200KB exceed the request size limit and are sent in separate batches
+    assert [len(batch) for batch in sink.client.batches] == [2, 1]
+    items = received_items(sqs)
+    assert set(items) == {"request-0", "request-1", "request-3"}
+    assert items["request-0"]["event_data_dropped"] is True
+    assert "event_data" not in items["request-0"]
+
+
+def test_not_existing_queue_drops_batch(sqs, caplog):
+    sink = SQSErrorSink()
+    sink.client = sqs
+    sink.put("not_existing_queue", error_item(0))
+
+    sink.flush()
+
+    assert sink.pending == 0
+    assert "writing 1 error log items to not_existing_queue failed" in caplog.text
+
+
+def test_error_logged_to_queue(sqs, monkeypatch):
+    from aws_serverless_wrapper._error_sinks import sqs_error_sink
+    from aws_serverless_wrapper.serverless_handler import LambdaHandlerOfFunction
+    from aws_serverless_wrapper.testing import fake_context as context
+
+    monkeypatch.delenv("DYNAMO_DB_RESOURCE_STAGE_NAME", raising=False)
+    monkeypatch.delenv("DYNAMO_DB_RESOURCE_STACK_NAME", raising=False)
+    monkeypatch.setattr(sqs_error_sink, "client", sqs)
+    environ["API_INPUT_VERIFICATION"] = {}
+
+    def failing(_):
+        raise Exception({"statusCode": 500, "body": "failed", "headers": {"Content-Type": "text/plain"}})
+
+    response = LambdaHandlerOfFunction(
+        failing,
+        PARSE_BODY=False,
+        API_RESPONSE_VERIFICATION=False,
+        ERROR_LOG={"QUEUE": {"NAME": error_queue, "FLUSH": {"TIMEOUT": 2}}, "API_RESPONSE": False},
+    ).wrap_lambda({"httpMethod": "GET"}, context)
+
+    assert response["statusCode"] == 500
+    assert sqs_error_sink.pending == 0
+    assert received_items(sqs)[context.aws_request_id]["body"] == "failed"
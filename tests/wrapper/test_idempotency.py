@@ -0,0 +1,187 @@
+from json import loads
+from os import environ as os_environ
+from pytest import fixture
+from aws_serverless_wrapper._environ_variables import environ
+from aws_serverless_wrapper.testing import fake_context as context, compose_ReST_event
+from .test_wrapper import run_from_file_directory
+
+idempotency_table = "idempotency"
+
+
+@fixture
+def dynamodb(monkeypatch, run_from_file_directory):
+    from moto import mock_aws
+    import boto3
+    from aws_serverless_wrapper._idempotency import idempotency_store
+
+    for key, value in {
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+        "AWS_SECURITY_TOKEN": "testing",
+        "AWS_SESSION_TOKEN": "testing",
+        "AWS_DEFAULT_REGION": "eu-central-1",
+    }.items():
+        monkeypatch.setenv(key, value)
+    monkeypatch.delenv("DYNAMO_DB_RESOURCE_STAGE_NAME", raising=False)
+    monkeypatch.delenv("DYNAMO_DB_RESOURCE_STACK_NAME", raising=False)
+
+    wrapper_config_file = os_environ.pop("WRAPPER_CONFIG_FILE", None)
+    environ._load_config_from_file("api_response_wrapper_config.json")
+    environ["API_INPUT_VERIFICATION"] = {}
+    with mock_aws():
+        client = boto3.client("dynamodb")
+        client.create_table(
+            TableName=idempotency_table,
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        monkeypatch.setattr(idempotency_store, "client", client)
+        yield client
+    if wrapper_config_file:
+        os_environ["WRAPPER_CONFIG_FILE"] = wrapper_config_file
+        environ._load_config_from_file()
+
+
+def counting_api(status_code=201, **config):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    calls = list()
+
+    @aws_serverless_wrapper(API_RESPONSE_VERIFICATION=False, IDEMPOTENCY={"TABLE": idempotency_table, **config})
+    def api(event_data):
+        calls.append(event_data)
+        return {"statusCode": status_code, "body": {"call": len(calls)}, "headers": {"Content-Type": "application/json"}}
+
+    return api, calls
+
+
+def post_event(body, key="key-1"):
+    event = compose_ReST_event(httpMethod="POST", resource="/orders")
+    event["body"] = body
+    event["headers"] = {"content-type": "application/json", **({"idempotency-key": key} if key else dict())}
+    return event
+
+
+def records(client):
+    return {item["id"]["S"]: item for item in client.scan(TableName=idempotency_table)["Items"]}
+
+
+def test_stored_response_returned_for_retry(dynamodb):
+    api, calls = counting_api()
+
+    first = api(post_event('{"amount": 1}'), context)
+    retry = api(post_event('{"amount": 1}'), context)
+    other_key = api(post_event('{"amount": 1}', key="key-2"), context)
+
+    assert len(calls) == 2
+    assert first == retry
+    assert first["statusCode"] == 201
+    assert loads(other_key["body"]) == {"call": 2}
+    (record, _) = records(dynamodb).values()
+    assert record["status"]["S"] == "COMPLETED"
+
+
+def test_payload_mismatch(dynamodb):
+    api, calls = counting_api()
+
+    api(post_event('{"amount": 1}'), context)
+    response = api(post_event('{"amount": 2}'), context)
+
+    assert len(calls) == 1
+    assert response["statusCode"] == 422
+
+
+def test_request_in_progress(dynamodb):
+    from aws_serverless_wrapper._idempotency import idempotency_record_of
+
+    api, calls = counting_api()
+    environ["IDEMPOTENCY"] = {"TABLE": idempotency_table}
+    in_progress = idempotency_record_of(post_event('{"amount": 1}'), context)
+    assert in_progress.acquire() is None
+
+    response = api(post_event('{"amount": 1}'), context)
+    assert response["statusCode"] == 409
+    assert calls == []
+
+    in_progress.release()
+    assert api(post_event('{"amount": 1}'), context)["statusCode"] == 201
+
+
+def test_server_error_not_stored(dynamodb):
+    api, calls = counting_api(status_code=503)
+
+    api(post_event('{"amount": 1}'), context)
+    api(post_event('{"amount": 1}'), context)
+
+    assert len(calls) == 2
+    assert records(dynamodb) == {}
+
+
+def test_expired_record_replaced(dynamodb, monkeypatch):
+    from aws_serverless_wrapper import _idempotency
+
+    api, calls = counting_api(EXPIRES_AFTER=10)
+    api(post_event('{"amount": 1}'), context)
+
+    now = _idempotency.time() + 11
+    monkeypatch.setattr(_idempotency, "time", lambda: now)
+    api(post_event('{"amount": 1}'), context)
+
+    assert len(calls) == 2
+
+
+def test_payload_hash_as_key(dynamodb):
+    api, calls = counting_api(USE_PAYLOAD_HASH=True)
+
+    api(post_event('{"amount": 1}', key=None), context)
+    api(post_event('{"amount": 1}', key=None), context)
+    api(post_event('{"amount": 2}', key=None), context)
+    assert len(calls) == 2
+
+    api_without_hash, calls = counting_api()
+    api_without_hash(post_event('{"amount": 1}', key=None), context)
+    api_without_hash(post_event('{"amount": 1}', key=None), context)
+    assert len(calls) == 2
+
+
+def test_get_requests_not_handled(dynamodb):
+    api, calls = counting_api()
+    event = compose_ReST_event(httpMethod="GET", resource="/orders")
+    event["headers"] = {"idempotency-key": "key-1"}
+
+    api(dict(event), context)
+    api(dict(event), context)
+
+    assert len(calls) == 2
+    assert records(dynamodb) == {}
+
+
+def test_configured_header_case_insensitive(dynamodb):
+    api, calls = counting_api(HEADER="Idempotency-Key")
+
+    api(post_event('{"amount": 1}'), context)
+    api(post_event('{"amount": 1}'), context)
+
+    assert len(calls) == 1
+
+
+def test_record_released_if_exception_escapes(dynamodb, monkeypatch):
+    from pytest import raises
+    from aws_serverless_wrapper import serverless_handler
+
+    parse_body = serverless_handler.parse_body
+
+    def failing_response_parsing(data, *args, response=False, **kwargs):
+        if response:
+            raise RuntimeError("parsing the response failed")
+        return parse_body(data, *args, **kwargs)
+
+    monkeypatch.setattr(serverless_handler, "parse_body", failing_response_parsing)
+    api, calls = counting_api()
+
+    with raises(RuntimeError):
+        api(post_event('{"amount": 1}'), context)
+
+    assert len(calls) == 1
+    assert records(dynamodb) == {}
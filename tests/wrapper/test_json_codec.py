@@ -0,0 +1,83 @@
+from datetime import datetime, date
+from decimal import Decimal
+from importlib.util import find_spec
+from pytest import mark, raises
+from aws_serverless_wrapper._json_codec import get_codec, auto_order, json_codec
+from aws_serverless_wrapper._environ_variables import environ
+
+installed_codecs = [name for name in auto_order if find_spec(name)]
+
+
+@mark.parametrize("name", installed_codecs)
+def test_loads_str_and_bytes(name):
+    codec = get_codec(name)
+    data = {"key": ["value", 1, 2.5, None, True]}
+
+    assert codec.loads('{"key": ["value", 1, 2.5, null, true]}') == data
+    assert codec.loads(b'{"key": ["value", 1, 2.5, null, true]}') == data
+    assert codec.loads(codec.dumps(data)) == data
+
+
+@mark.parametrize("name", installed_codecs)
+def test_invalid_json_raises_value_error(name):
+    with raises(ValueError):
+        get_codec(name).loads('{"key1": "value1"')
+
+
+@mark.parametrize("name", installed_codecs)
+def test_default_hook_for_dynamodb_types(name):
+    codec = get_codec(name)
+
+    assert codec.loads(codec.dumps({
+        "integer": Decimal("3"),
+        "float": Decimal("2.5"),
+        "datetime": datetime(2021, 2, 3, 4, 5, 6),
+        "date": date(2021, 2, 3),
+        "set": {"a"},
+        "binary": b"\x00\x01\x02\x03",
+    })) == {
+        "integer": 3,
+        "float": 2.5,
+        "datetime": "2021-02-03T04:05:06",
+        "date": "2021-02-03",
+        "set": ["a"],
+        "binary": "AAECAw==",
+    }
+
+    with raises(TypeError):
+        codec.dumps({"object": object()})
+
+
+def test_auto_selects_fastest_installed_codec():
+    assert get_codec("auto").name == installed_codecs[0]
+    assert get_codec("auto") is get_codec("auto")
+
+
+def test_standard_library_always_available():
+    assert get_codec("json").name == "json"
+    assert get_codec("json").dumps({"key": "value"}) == '{"key": "value"}'
+
+
+@mark.skipif("ujson" in installed_codecs, reason="ujson installed")
+def test_explicitly_configured_codec_must_be_installed():
+    with raises(ImportError):
+        get_codec("ujson")
+
+
+def test_codec_selected_by_config():
+    assert json_codec.name == "json"
+    assert json_codec.dumps({"key": "value"}) == '{"key": "value"}'
+
+    environ["JSON_CODEC"] = "auto"
+    try:
+        assert json_codec.name == installed_codecs[0]
+    finally:
+        environ["JSON_CODEC"] = "json"
+
+
+def test_parse_bytes_body():
+    from aws_serverless_wrapper._body_parsing import parse_body
+
+    event = {"body": b'{"key": "value"}', "headers": {"content-type": "application/json"}}
+
+    assert parse_body(event)["body"] == {"key": "value"}
@@ -0,0 +1,213 @@
+from os import environ as os_environ
+from pytest import fixture, raises
+from aws_serverless_wrapper._environ_variables import environ
+from aws_serverless_wrapper._body_parsing import parse_body_lazily, LazyBodyEvent, ParsingError
+from aws_serverless_wrapper.testing import fake_context as context, compose_ReST_event
+from .test_wrapper import run_from_file_directory
+
+
+@fixture
+def lazy_environ(run_from_file_directory):
+    wrapper_config_file = os_environ.pop("WRAPPER_CONFIG_FILE", None)
+    environ._load_config_from_file("api_response_wrapper_config.json")
+    yield
+    if wrapper_config_file:
+        os_environ["WRAPPER_CONFIG_FILE"] = wrapper_config_file
+
+
+def compose_event(resource="/test_request_resource/{path_level1}/{path_level2}", body=None):
+    event = compose_ReST_event(
+        httpMethod="POST",
+        resource=resource,
+        pathParameters={"path_level1": "path_value1", "path_level2": "path_value2"} if "{" in resource else None,
+        body={"body_key1": "some_string"} if body is None else body,
+    )
+    event["headers"] = {"content-type": "application/json"}
+    return event
+
+
+def test_body_parsed_on_first_access_only():
+    calls = list()
+
+    def parser(data, encoding):
+        calls.append(data)
+        return {"parsed": data}
+
+    event = LazyBodyEvent({"body": "raw", "headers": {}}, parser, "utf-8")
+
+    assert not event.body_parsed
+    assert event["headers"] == {}
+    assert "body" in event
+    assert event.raw_body == "raw"
+    assert calls == []
+
+    assert event["body"] == {"parsed": "raw"}
+    assert event["body"] == {"parsed": "raw"}
+    assert event.get("body") == {"parsed": "raw"}
+    assert event == {"body": {"parsed": "raw"}, "headers": {}}
+    assert calls == ["raw"]
+    assert event.body_parsed
+
+
+def test_copies_of_event_get_parsed_body():
+    event = parse_body_lazily(compose_event())
+    assert dict(event)["body"] == {"body_key1": "some_string"}
+
+    event = parse_body_lazily(compose_event())
+    assert {**event}["body"] == {"body_key1": "some_string"}
+
+    event = parse_body_lazily(compose_event())
+    assert list(event) == list(event.keys()) == list(compose_event())
+    assert event.raw_copy()["body"] == '{"body_key1": "some_string"}'
+    assert not event.body_parsed
+
+
+def test_parsing_error_raised_on_access():
+    event = parse_body_lazily(compose_event(body='{"body_key1": "some_string"'))
+
+    with raises(ParsingError) as PE:
+        event["body"]
+
+    assert PE.value.args[0]["statusCode"] == 400
+
+
+def test_unknown_content_type_raised_upfront():
+    event = compose_event(body="<html></html>")
+    event["headers"]["content-type"] = "text/html"
+
+    with raises(NotImplementedError) as NE:
+        parse_body_lazily(event)
+
+    assert NE.value.args[0]["statusCode"] == 501
+
+
+def test_body_not_parsed_if_not_accessed(lazy_environ):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    @aws_serverless_wrapper(LAZY_BODY_PARSING=True, API_INPUT_VERIFICATION=False, API_RESPONSE_VERIFICATION=False)
+    def api_basic(event_data):
+        assert isinstance(event_data, LazyBodyEvent)
+        assert not event_data.body_parsed
+        return {
+            "statusCode": 403,
+            "body": f"{event_data['pathParameters']['path_level1']} forbidden",
+            "headers": {"Content-Type": "text/plain"},
+        }
+
+    response = api_basic(compose_event(body='{"invalid json'), context)
+    assert response["statusCode"] == 403
+    assert response["body"] == "path_value1 forbidden"
+
+
+def test_parsing_error_on_access_results_in_400(lazy_environ):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    @aws_serverless_wrapper(LAZY_BODY_PARSING=True, API_RESPONSE_VERIFICATION=False)
+    def api_basic(event_data):
+        return event_data["body"]
+
+    response = api_basic(compose_event(resource="/test_request_no_verification", body='{"invalid json'), context)
+    assert response == {
+        "statusCode": 400,
+        "body": "Body has to be json formatted",
+        "headers": {"Content-Type": "text/plain"},
+    }
+
+
+def test_input_verification_constraining_body_forces_parsing(lazy_environ):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    @aws_serverless_wrapper(LAZY_BODY_PARSING=True, API_RESPONSE_VERIFICATION=False)
+    def api_basic(event_data):
+        assert event_data.body_parsed
+        assert event_data["body"] == {"body_key1": "some_string"}
+
+    assert api_basic(compose_event(), context) == {"statusCode": 200}
+
+    response = api_basic(compose_event(body={"body_key1": 1}), context)
+    assert response["statusCode"] == 400
+
+    response = api_basic(compose_event(body='{"invalid json'), context)
+    assert response["statusCode"] == 400
+    assert response["body"] == "Body has to be json formatted"
+
+
+def test_input_verification_not_constraining_body_keeps_body_unparsed(lazy_environ):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    @aws_serverless_wrapper(LAZY_BODY_PARSING=True, API_RESPONSE_VERIFICATION=False)
+    def api_basic(event_data):
+        assert not event_data.body_parsed
+
+    event = compose_event(resource="/test_request_no_verification", body='{"invalid json')
+    assert api_basic(event, context) == {"statusCode": 200}
+
+
+def test_constrains_body():
+    from aws_serverless_wrapper._api_validation import _constrains_body
+
+    assert not _constrains_body({"properties": {"headers": {"type": "object"}}, "required": ["body"]})
+    assert not _constrains_body({"properties": {"body": {"description": "anything"}}})
+    assert _constrains_body({"properties": {"body": {"type": "object"}}})
+    assert _constrains_body({"additionalProperties": False})
+    assert not _constrains_body({"patternProperties": {"^bo": {}}, "additionalProperties": False})
+    assert _constrains_body({"patternProperties": {"^bo": {"type": "string"}}})
+    assert _constrains_body({"anyOf": [{}]})
+
+
+def test_base64_body_decoded_on_access():
+    event = parse_body_lazily({"body": "AAECAw==", "isBase64Encoded": True, "headers": {"content-type": "image/png"}})
+
+    assert event.raw_body == "AAECAw=="
+    assert event["body"] == b"\x00\x01\x02\x03"
+
+
+def test_form_urlencoded_body_cast_with_parameters(monkeypatch):
+    from jsonschema import Draft7Validator
+    from aws_serverless_wrapper import _api_validation
+
+    schema = {
+        "type": "object",
+        "properties": {
+            "pathParameters": {"type": "object", "properties": {"id": {"type": "integer"}}},
+            "body": {"type": "object", "properties": {"count": {"type": "array", "items": {"type": "integer"}}}},
+        },
+    }
+    schema_without_body = {"type": "object", "properties": {"pathParameters": schema["properties"]["pathParameters"]}}
+    for validated_schema in (schema, schema_without_body):
+        monkeypatch.setattr(_api_validation, "_cached_validator", lambda *_: Draft7Validator(validated_schema))
+        event = parse_body_lazily(
+            {
+                "httpMethod": "POST",
+                "pathParameters": {"id": "3"},
+                "body": "count=2",
+                "headers": {"content-type": "application/x-www-form-urlencoded"},
+            }
+        )
+
+        verified = _api_validation.verify_api_input(event, "api", "file", "schemas")
+
+        assert verified["pathParameters"] == {"id": 3}
+        assert verified.body_parsed
+        assert verified["body"] == {"count": [2] if validated_schema is schema else ["2"]}
+
+
+def test_parameters_cast_with_unparsed_body(monkeypatch):
+    from jsonschema import Draft7Validator
+    from aws_serverless_wrapper import _api_validation
+
+    schema = {"type": "object", "properties": {"pathParameters": {"properties": {"id": {"type": "integer"}}}}}
+    monkeypatch.setattr(_api_validation, "_cached_validator", lambda *_: Draft7Validator(schema))
+    event = parse_body_lazily(
+        {
+            "httpMethod": "POST",
+            "pathParameters": {"id": "3"},
+            "body": '{"invalid json',
+            "headers": {"content-type": "application/json"},
+        }
+    )
+
+    verified = _api_validation.verify_api_input(event, "api", "file", "schemas")
+
+    assert verified["pathParameters"] == {"id": 3}
+    assert not verified.body_parsed
@@ -0,0 +1,119 @@
+from pytest import fixture, mark, raises
+from aws_serverless_wrapper.media_types import (
+    parse_media_type, register_codec, unregister_codec, codec_for
+)
+from aws_serverless_wrapper._body_parsing import (
+    parse_body, application_json, application_octet_stream, text_plain, ContentTypeSwitch
+)
+
+
+@mark.parametrize(
+    ("value", "essence", "parameters"),
+    [
+        ("application/json", "application/json", {}),
+        ("application/json; charset=utf-8", "application/json", {"charset": "utf-8"}),
+        ("Application/JSON;Charset=UTF-8", "application/json", {"charset": "utf-8"}),
+        ("text/plain ; charset = latin-1 ; format=flowed", "text/plain", {"charset": "latin-1", "format": "flowed"}),
+        ('multipart/form-data; boundary="a;b=c"', "multipart/form-data", {"boundary": "a;b=c"}),
+        ('text/plain; title="say \\"hi\\""', "text/plain", {"title": 'say "hi"'}),
+        ("text/plain; invalid; =value", "text/plain", {}),
+        ("plain", "plain", {}),
+    ],
+)
+def test_parse_media_type(value, essence, parameters):
+    media_type = parse_media_type(value)
+    assert media_type.essence == essence
+    assert dict(media_type.parameters) == parameters
+
+
+def test_media_type_properties():
+    media_type = parse_media_type("application/problem+json; charset=UTF-8")
+    assert media_type.type == "application"
+    assert media_type.subtype == "problem+json"
+    assert media_type.suffix == "json"
+    assert media_type.charset == "utf-8"
+
+    assert parse_media_type("application/json").suffix is None
+    assert parse_media_type("application/json").charset is None
+
+
+def test_parse_media_type_memoized():
+    assert parse_media_type("application/vnd.memoized+json") is parse_media_type("application/vnd.memoized+json")
+
+
+@mark.parametrize(
+    ("content_type", "codec"),
+    [
+        ("application/json", application_json),
+        ("application/json; charset=utf-8", application_json),
+        ("APPLICATION/JSON", application_json),
+        ("application/problem+json", application_json),
+        ("application/vnd.api+json; charset=utf-8", application_json),
+        ("image/webp", application_octet_stream),
+        ("text/plain;charset=latin-1", text_plain),
+    ],
+)
+def test_codec_resolution(content_type, codec):
+    assert codec_for(content_type) is codec
+
+
+def test_unknown_media_type():
+    with raises(NotImplementedError) as e:
+        codec_for("application/xml")
+    assert e.value.args[0]["statusCode"] == 501
+
+
+@fixture
+def custom_codec():
+    def application_csv(data, _=None):
+        if isinstance(data, str):
+            return [line.split(",") for line in data.splitlines()]
+        return "\n".join(",".join(row) for row in data)
+
+    register_codec("text/csv", application_csv)
+    yield application_csv
+    unregister_codec("text/csv")
+
+
+def test_registered_codec(custom_codec):
+    assert codec_for("text/csv; header=present") is custom_codec
+    assert parse_body({"body": "a,b\nc,d", "headers": {"content-type": "text/csv"}})["body"] == [
+        ["a", "b"], ["c", "d"]
+    ]
+
+
+def test_unregistered_codec_not_resolved_from_cache(custom_codec):
+    assert codec_for("text/csv") is custom_codec
+    unregister_codec("text/csv")
+    with raises(NotImplementedError):
+        codec_for("text/csv")
+    register_codec("text/csv", custom_codec)
+
+
+def test_exact_type_precedes_suffix_and_wildcard():
+    def exact(data, _=None):
+        return "exact"
+
+    register_codec("application/special+json", exact)
+    register_codec("+xml", exact)
+    try:
+        assert codec_for("application/special+json") is exact
+        assert codec_for("application/other+json") is application_json
+        assert codec_for("image/svg+xml") is exact
+        assert codec_for("image/png") is application_octet_stream
+    finally:
+        unregister_codec("application/special+json")
+        unregister_codec("+xml")
+    assert "+xml" not in ContentTypeSwitch
+
+
+def test_charset_of_content_type_used_for_parsing():
+    from base64 import b64encode
+
+    event = {
+        "body": b64encode("schlüssel=wert".encode("latin-1")).decode(),
+        "isBase64Encoded": True,
+        "headers": {"content-type": "application/x-www-form-urlencoded; charset=latin-1"},
+    }
+
+    assert parse_body(event)["body"] == {"schlüssel": ["wert"]}
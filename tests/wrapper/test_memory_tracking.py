@@ -0,0 +1,113 @@
+import logging
+import tracemalloc
+from json import loads
+from os import environ as os_environ
+from pytest import fixture
+from aws_serverless_wrapper._environ_variables import environ
+from aws_serverless_wrapper._memory_tracking import MemoryTracker, memory_tracker, rss, peak_rss
+from aws_serverless_wrapper.testing import fake_context as context, compose_ReST_event
+from .test_wrapper import run_from_file_directory
+
+
+@fixture
+def tracking_environ(run_from_file_directory, monkeypatch):
+    wrapper_config_file = os_environ.pop("WRAPPER_CONFIG_FILE", None)
+    environ._load_config_from_file("api_response_wrapper_config.json")
+    environ["API_INPUT_VERIFICATION"] = {}
+    monkeypatch.setattr(memory_tracker, "checked_at", None)
+    yield
+    environ["MEMORY_TRACKING"] = {}
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    if wrapper_config_file:
+        os_environ["WRAPPER_CONFIG_FILE"] = wrapper_config_file
+        environ._load_config_from_file()
+
+
+def test_rss_and_peak():
+    current = rss()
+    assert current > 0
+    assert peak_rss() >= current
+
+
+def test_warning_for_growth(tracking_environ, caplog):
+    environ["MEMORY_TRACKING"] = {"CHECK_INTERVAL": 2, "GROWTH_THRESHOLD": 1024}
+    tracker = MemoryTracker()
+    tracker.finish_invocation(None, 1)
+
+    tracker.checked_rss -= 10 * 1024 * 1024
+    with caplog.at_level(logging.WARNING):
+        tracker.finish_invocation(None, 2)
+        assert caplog.records == []
+        tracker.finish_invocation(None, 3)
+
+    (record,) = caplog.records
+    report = loads(record.getMessage())
+    assert report["container_reusing_count_from"] == 1
+    assert report["container_reusing_count_to"] == 3
+    assert report["rss_growth_per_invocation"] >= 5 * 1024 * 1024
+    assert "top_allocations" not in report
+    assert tracker.checked_at == 3
+
+
+def test_no_warning_below_threshold(tracking_environ):
+    environ["MEMORY_TRACKING"] = {"CHECK_INTERVAL": 1, "GROWTH_THRESHOLD": 1024 ** 3}
+    tracker = MemoryTracker()
+    tracker.finish_invocation(None, 1)
+
+    assert tracker.check(2, rss(), environ.snapshot.MEMORY_TRACKING) is None
+
+
+def test_top_allocations_named(tracking_environ):
+    config = {"CHECK_INTERVAL": 1, "GROWTH_THRESHOLD": 1024, "TRACEMALLOC": True, "TOP": 3}
+    environ["MEMORY_TRACKING"] = config
+    tracker = MemoryTracker()
+    tracker.start_invocation()
+    assert tracemalloc.is_tracing()
+    tracker.finish_invocation(None, 1)
+
+    leaked = [bytearray(100 * 1024) for _ in range(10)]
+    report = tracker.check(2, None, config)
+
+    assert report["traced_growth_per_invocation"] >= 1000 * 1024
+    assert len(report["top_allocations"]) <= 3
+    top = report["top_allocations"][0]
+    assert top["call_site"].split(":")[0].endswith("test_memory_tracking.py")
+    assert top["size_diff"] >= 1000 * 1024
+    assert top["count_diff"] >= 10
+    del leaked
+
+
+def test_logged_per_invocation(tracking_environ, capsys, caplog):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    caplog.set_level(logging.INFO)
+
+    @aws_serverless_wrapper(API_RESPONSE_VERIFICATION=False, MEMORY_TRACKING=True)
+    def api(event_data):
+        return {"statusCode": 200}
+
+    capsys.readouterr()
+    api(compose_ReST_event(httpMethod="POST", resource="/test_request_no_verification"), context)
+
+    (usage,) = [
+        record for record in map(loads, capsys.readouterr().out.splitlines())
+        if record.get("message") == "memory usage"
+    ]
+    assert usage["rss"] > 0
+    assert usage["peak_rss"] >= usage["rss"]
+    assert isinstance(usage["rss_growth"], int)
+    assert usage["container_reusing_count"] == memory_tracker.checked_at
+
+
+def test_not_tracked_if_disabled(tracking_environ, capsys):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    @aws_serverless_wrapper(API_RESPONSE_VERIFICATION=False)
+    def api(event_data):
+        return {"statusCode": 200}
+
+    api(compose_ReST_event(httpMethod="POST", resource="/test_request_no_verification"), context)
+
+    assert "memory usage" not in capsys.readouterr().out
+    assert memory_tracker.checked_at is None
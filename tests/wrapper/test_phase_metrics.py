@@ -0,0 +1,110 @@
+from io import StringIO
+from json import loads
+from os import environ as os_environ
+from pytest import fixture
+from aws_serverless_wrapper._environ_variables import environ
+from aws_serverless_wrapper._phase_metrics import Histogram, PhaseMetrics, PhaseTimer, phase_metrics
+from aws_serverless_wrapper.testing import fake_context as context, compose_ReST_event
+from .test_wrapper import run_from_file_directory
+
+
+@fixture
+def metrics_environ(run_from_file_directory, monkeypatch):
+    wrapper_config_file = os_environ.pop("WRAPPER_CONFIG_FILE", None)
+    environ._load_config_from_file("api_response_wrapper_config.json")
+    monkeypatch.setattr(phase_metrics, "stream", StringIO())
+    monkeypatch.setattr(phase_metrics, "histograms", dict())
+    monkeypatch.setattr(phase_metrics, "last_flush", None)
+    yield phase_metrics.stream
+    environ["PHASE_METRICS"] = {}
+    if wrapper_config_file:
+        os_environ["WRAPPER_CONFIG_FILE"] = wrapper_config_file
+        environ._load_config_from_file()
+
+
+def test_histogram():
+    histogram = Histogram()
+    for value in (1.0, 1.01, 2.0, 0.0, 100.0):
+        histogram.add(value)
+
+    emf = histogram.as_emf()
+    assert emf["Values"] == sorted(emf["Values"])
+    assert len(emf["Values"]) == 4
+    assert sum(emf["Counts"]) == emf["Count"] == 5
+    assert emf["Min"] == 0.0 and emf["Max"] == 100.0
+    assert emf["Sum"] == 104.01
+    for value, bucket in ((1.0, 1.0), (100.0, emf["Values"][-1])):
+        assert abs(bucket - value) / value < 0.125
+
+
+def test_buckets_within_emf_limit():
+    histogram = Histogram()
+    value = 0.001
+    while value < 100000:
+        histogram.add(value)
+        value *= 1.01
+    assert len(histogram.as_emf()["Values"]) <= 100
+
+
+def test_embedded_metric_format(metrics_environ):
+    environ["PHASE_METRICS"] = {"FLUSH_INTERVAL": 60}
+    metrics = PhaseMetrics(StringIO())
+    for cold_start in (True, False, False):
+        timer = PhaseTimer("/items", cold_start)
+        timer.durations = {"body_parsing": 0.002, "business_run": 0.010}
+        metrics.record(timer)
+        # written at the first invocation, aggregated afterwards
+        assert len(metrics.stream.getvalue().splitlines()) == 1
+
+    metrics.flush()
+
+    cold, warm = [loads(line) for line in metrics.stream.getvalue().splitlines()]
+    (directive,) = warm["_aws"]["CloudWatchMetrics"]
+    assert directive["Namespace"] == "aws_serverless_wrapper"
+    assert directive["Dimensions"] == [["route", "cold_start"]]
+    assert {"Name": "business_run", "Unit": "Milliseconds"} in directive["Metrics"]
+    assert isinstance(warm["_aws"]["Timestamp"], int)
+    assert (cold["route"], cold["cold_start"], warm["cold_start"]) == ("/items", "true", "false")
+    assert warm["business_run"]["Count"] == 2
+    assert warm["business_run"]["Sum"] == 20.0
+    assert cold["body_parsing"]["Values"] == [1.953125]
+
+    metrics.flush()
+    assert len(metrics.stream.getvalue().splitlines()) == 2
+
+
+def test_phases_measured_through_wrapper(metrics_environ):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    @aws_serverless_wrapper(API_RESPONSE_VERIFICATION=False, PHASE_METRICS=True)
+    def api(event_data):
+        if event_data["body"]["fail"]:
+            raise Exception("failed")
+        return {"statusCode": 200, "body": {"ok": True}, "headers": {"Content-Type": "application/json"}}
+
+    for fail in (False, True):
+        event = compose_ReST_event(httpMethod="POST", resource="/test_request_no_verification", body={"fail": fail})
+        event["headers"] = {"Content-Type": "application/json"}
+        api(event, context)
+
+    succeeded, failed = [loads(line) for line in metrics_environ.getvalue().splitlines()]
+    assert succeeded["route"] == "/test_request_no_verification"
+    for phase in (
+        "header_normalization", "body_parsing", "input_verification", "business_run", "response_parsing", "invocation"
+    ):
+        assert succeeded[phase]["Count"] == 1
+    assert "error_handling" not in succeeded
+    assert failed["error_handling"]["Count"] == 1
+
+
+def test_not_measured_if_disabled(metrics_environ):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    @aws_serverless_wrapper(API_RESPONSE_VERIFICATION=False)
+    def api(event_data):
+        return {"statusCode": 200}
+
+    api(compose_ReST_event(httpMethod="POST", resource="/test_request_no_verification"), context)
+
+    assert phase_metrics.histograms == dict()
+    assert metrics_environ.getvalue() == ""
@@ -0,0 +1,132 @@
+from os import environ as os_environ, listdir, path
+from pstats import Stats
+from pytest import fixture
+from aws_serverless_wrapper._environ_variables import environ
+from aws_serverless_wrapper._profiling import SamplingProfiler, should_profile
+from aws_serverless_wrapper.testing import fake_context as context, compose_ReST_event
+from .test_wrapper import run_from_file_directory
+
+
+@fixture
+def profiling_config():
+    yield
+    # later invocations must not be profiled
+    environ["PROFILING"] = {}
+
+
+@fixture
+def profiling_environ(run_from_file_directory, profiling_config, tmp_path):
+    wrapper_config_file = os_environ.pop("WRAPPER_CONFIG_FILE", None)
+    environ._load_config_from_file("api_response_wrapper_config.json")
+    yield str(tmp_path)
+    if wrapper_config_file:
+        os_environ["WRAPPER_CONFIG_FILE"] = wrapper_config_file
+        environ._load_config_from_file()
+
+
+def busy_function():
+    return sum(index * index for index in range(200000))
+
+
+def profiled_api(**config):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    calls = list()
+
+    @aws_serverless_wrapper(API_RESPONSE_VERIFICATION=False, PROFILING=config)
+    def api(event_data):
+        calls.append(busy_function())
+        return {"statusCode": 200}
+
+    return api, calls
+
+
+def event(headers=None):
+    event = compose_ReST_event(httpMethod="POST", resource="/test_request_no_verification")
+    event["headers"] = headers or dict()
+    return event
+
+
+def test_profile_requested_by_header_with_secret(profiling_config, monkeypatch):
+    environ["PROFILING"] = {"SAMPLE_RATE": 0}
+    monkeypatch.setenv("WRAPPER_PROFILING_SECRET", "secret")
+
+    assert should_profile({"headers": {"x-wrapper-profile": "secret"}})
+    assert not should_profile({"headers": {"x-wrapper-profile": "wrong"}})
+    assert not should_profile({"headers": {}})
+
+    monkeypatch.delenv("WRAPPER_PROFILING_SECRET")
+    assert not should_profile({"headers": {"x-wrapper-profile": ""}})
+
+
+def test_configured_header_case_insensitive(profiling_config, monkeypatch):
+    environ["PROFILING"] = {"SAMPLE_RATE": 0, "HEADER": "X-Wrapper-Profile"}
+    monkeypatch.setenv("WRAPPER_PROFILING_SECRET", "secret")
+
+    assert should_profile({"headers": {"x-wrapper-profile": "secret"}})
+
+
+def test_sampled_invocations(profiling_config, monkeypatch):
+    from aws_serverless_wrapper import _profiling
+
+    environ["PROFILING"] = {"SAMPLE_RATE": 0.1}
+    monkeypatch.setattr(_profiling, "random", lambda: 0.05)
+    assert should_profile({})
+    monkeypatch.setattr(_profiling, "random", lambda: 0.5)
+    assert not should_profile({})
+
+
+def test_cprofile_written_as_pstats(profiling_environ):
+    api, calls = profiled_api(SAMPLE_RATE=1, DIRECTORY=profiling_environ)
+
+    assert api(event(), context)["statusCode"] == 200
+
+    assert len(calls) == 1
+    (profile,) = listdir(profiling_environ)
+    assert profile.startswith(f"{context.function_name}-{context.aws_request_id}-")
+    assert profile.endswith(".pstats")
+    functions = {function for _, _, function in Stats(path.join(profiling_environ, profile)).stats}
+    assert "busy_function" in functions
+
+
+def test_sampling_profiler_collapsed_stacks(profiling_environ):
+    api, calls = profiled_api(SAMPLE_RATE=1, DIRECTORY=profiling_environ, MODE="sampling", INTERVAL=0.001)
+
+    api(event(), context)
+
+    (profile,) = listdir(profiling_environ)
+    assert profile.endswith(".collapsed")
+    with open(path.join(profiling_environ, profile)) as f:
+        lines = f.read().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert any("busy_function" in line for line in lines)
+
+
+def test_not_profiled(profiling_environ):
+    api, calls = profiled_api(SAMPLE_RATE=0, DIRECTORY=profiling_environ)
+
+    api(event(), context)
+
+    assert len(calls) == 1
+    assert listdir(profiling_environ) == []
+
+
+def test_profile_stored_if_function_raises(profiling_environ):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    @aws_serverless_wrapper(API_RESPONSE_VERIFICATION=False, PROFILING={"SAMPLE_RATE": 1, "DIRECTORY": profiling_environ})
+    def api(event_data):
+        raise Exception({"statusCode": 409, "body": "conflict", "headers": {"Content-Type": "text/plain"}})
+
+    assert api(event(), context)["statusCode"] == 409
+    assert len(listdir(profiling_environ)) == 1
+
+
+def test_sampling_profiler_directly():
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.enable()
+    busy_function()
+    profiler.disable()
+    assert any("busy_function" in stack for stack in profiler.stacks)
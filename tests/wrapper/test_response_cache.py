@@ -0,0 +1,199 @@
+from json import loads
+from os import environ as os_environ
+from pytest import fixture
+from aws_serverless_wrapper._environ_variables import environ
+from aws_serverless_wrapper._response_cache import ResponseCache, response_cache, dict_hash
+from aws_serverless_wrapper.testing import fake_context as context, compose_ReST_event
+from .test_wrapper import run_from_file_directory
+
+
+@fixture
+def cache_environ(run_from_file_directory):
+    wrapper_config_file = os_environ.pop("WRAPPER_CONFIG_FILE", None)
+    environ._load_config_from_file("api_response_wrapper_config.json")
+    response_cache.clear()
+    yield
+    response_cache.clear()
+    if wrapper_config_file:
+        os_environ["WRAPPER_CONFIG_FILE"] = wrapper_config_file
+
+
+def test_dict_hash_canonical():
+    assert dict_hash({"a": 1, "b": {"c": 2}}) == dict_hash({"b": {"c": 2}, "a": 1})
+    assert dict_hash({"a": 1, "timestamp": 1}) == dict_hash({"a": 1, "timestamp": 2})
+    assert dict_hash({"a": 1}) != dict_hash({"a": 2})
+    assert len(dict_hash({"a": 1})) == 2 * environ.snapshot.dict_hash_digest_size
+
+
+def test_least_recently_used_evicted_by_size():
+    cache = ResponseCache(max_bytes=160)
+    response = {"statusCode": 200, "body": "x" * 20}
+    for key in ("a", "b", "c"):
+        cache.put(key, response, ttl=60)
+    assert cache.get("a") == response
+
+    cache.put("d", response, ttl=60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == response
+    assert cache.size <= 160
+
+    cache.put("too large", {"statusCode": 200, "body": "x" * 200}, ttl=60)
+    assert cache.get("too large") is None
+
+
+def test_entries_expire(monkeypatch):
+    from aws_serverless_wrapper import _response_cache
+
+    now = [100.0]
+    monkeypatch.setattr(_response_cache, "monotonic", lambda: now[0])
+    cache = ResponseCache(max_bytes=1000)
+    cache.put("key", {"statusCode": 200}, ttl=5)
+
+    now[0] += 4
+    assert cache.get("key") == {"statusCode": 200}
+    now[0] += 1
+    assert cache.get("key") is None
+    assert len(cache) == 0 and cache.size == 0
+
+
+def counting_api(**config):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    calls = list()
+
+    @aws_serverless_wrapper(API_INPUT_VERIFICATION=False, API_RESPONSE_VERIFICATION=False, **config)
+    def api(event_data):
+        calls.append(event_data)
+        return {
+            "statusCode": 200,
+            "body": {"call": len(calls)},
+            "headers": {"Content-Type": "application/json", **event_data.get("response_headers", dict())},
+        }
+
+    return api, calls
+
+
+def get_event(resource="/items", query=None, headers=None):
+    event = compose_ReST_event(httpMethod="GET", resource=resource)
+    event["queryStringParameters"] = query or {"page": "1"}
+    event["headers"] = headers or dict()
+    return event
+
+
+def test_cached_response_skips_function(cache_environ):
+    api, calls = counting_api(RESPONSE_CACHE=True)
+
+    first = api(get_event(), context)
+    second = api(get_event(), context)
+    other_query = api(get_event(query={"page": "2"}), context)
+
+    assert len(calls) == 2
+    assert first == second
+    assert loads(other_query["body"]) == {"call": 2}
+
+
+def test_callers_cached_separately(cache_environ):
+    api, calls = counting_api(RESPONSE_CACHE=True)
+
+    alice = api(get_event(resource="/me", headers={"Authorization": "Bearer alice"}), context)
+    bob = api(get_event(resource="/me", headers={"Authorization": "Bearer bob"}), context)
+    assert api(get_event(resource="/me", headers={"Authorization": "Bearer alice"}), context) == alice
+
+    event = get_event(resource="/me")
+    event["requestContext"]["authorizer"] = {"claims": {"sub": "carol"}}
+    api(event, context)
+
+    assert len(calls) == 3
+    assert loads(alice["body"]) != loads(bob["body"])
+    assert len(response_cache) == 3
+
+
+def test_configured_headers_case_insensitive(cache_environ):
+    api, calls = counting_api(RESPONSE_CACHE={"HEADERS": ["Accept-Language"]})
+
+    german = api(get_event(headers={"Accept-Language": "de"}), context)
+    english = api(get_event(headers={"accept-language": "en"}), context)
+    assert api(get_event(headers={"ACCEPT-LANGUAGE": "de"}), context) == german
+
+    assert len(calls) == 2
+    assert loads(german["body"]) != loads(english["body"])
+
+
+def test_only_get_requests_cached(cache_environ):
+    api, calls = counting_api(RESPONSE_CACHE=True)
+    event = compose_ReST_event(httpMethod="POST", resource="/test_request_no_verification")
+
+    api(dict(event), context)
+    api(dict(event), context)
+
+    assert len(calls) == 2
+    assert len(response_cache) == 0
+
+
+def test_request_cache_control(cache_environ):
+    api, calls = counting_api(RESPONSE_CACHE=True)
+
+    api(get_event(), context)
+    refreshed = api(get_event(headers={"Cache-Control": "no-cache"}), context)
+    assert len(calls) == 2
+    assert api(get_event(), context) == refreshed
+
+    api(get_event(headers={"Cache-Control": "no-store"}), context)
+    assert len(calls) == 3
+    assert api(get_event(), context) == refreshed
+
+
+def test_response_cache_control(cache_environ, monkeypatch):
+    from aws_serverless_wrapper import _response_cache
+
+    now = [100.0]
+    monkeypatch.setattr(_response_cache, "monotonic", lambda: now[0])
+    api, calls = counting_api(RESPONSE_CACHE={"TTL": 60})
+
+    def event_with_response_headers(cache_control, page):
+        event = get_event(query={"page": page})
+        event["response_headers"] = {"Cache-Control": cache_control}
+        return event
+
+    for _ in range(2):
+        api(event_with_response_headers("no-store", "1"), context)
+        api(event_with_response_headers("max-age=10", "2"), context)
+    assert len(calls) == 3
+
+    now[0] += 10
+    api(event_with_response_headers("max-age=10", "2"), context)
+    assert len(calls) == 4
+
+
+def test_routes_config(cache_environ):
+    api, calls = counting_api(RESPONSE_CACHE={"ROUTES": {"/items": {"KEY_FIELDS": ["resource"]}, "/other": False}})
+
+    api(get_event(query={"page": "1"}), context)
+    api(get_event(query={"page": "2"}), context)
+    assert len(calls) == 1
+
+    for resource in ("/other", "/not_configured"):
+        api(get_event(resource=resource), context)
+        api(get_event(resource=resource), context)
+    assert len(calls) == 5
+
+
+def test_cached_response_compressed_per_request(cache_environ):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    @aws_serverless_wrapper(
+        API_INPUT_VERIFICATION=False,
+        API_RESPONSE_VERIFICATION=False,
+        RESPONSE_CACHE={"HEADERS": []},
+        RESPONSE_COMPRESSION={"MIN_SIZE": 10},
+    )
+    def api(event_data):
+        return {"statusCode": 200, "body": "x" * 100, "headers": {"Content-Type": "text/plain"}}
+
+    compressed = api(get_event(headers={"Accept-Encoding": "gzip"}), context)
+    plain = api(get_event(), context)
+
+    assert compressed["headers"]["Content-Encoding"] == "gzip"
+    assert "Content-Encoding" not in plain["headers"]
+    assert plain["body"] == "x" * 100
@@ -0,0 +1,199 @@
+from threading import Barrier, Lock
+from json import dumps
+from os import environ as os_environ
+from pytest import fixture
+from aws_serverless_wrapper._environ_variables import environ
+from aws_serverless_wrapper.testing import fake_context as context
+from .test_wrapper import run_from_file_directory
+
+
+@fixture
+def sqs_environ(run_from_file_directory):
+    wrapper_config_file = os_environ.pop("WRAPPER_CONFIG_FILE", None)
+    environ._load_config_from_file("api_response_wrapper_config.json")
+    yield
+    if wrapper_config_file:
+        os_environ["WRAPPER_CONFIG_FILE"] = wrapper_config_file
+
+
+def compose_sqs_event(*bodies, message_group_ids=None):
+    records = list()
+    for index, body in enumerate(bodies):
+        record = {
+            "messageId": f"message-{index}",
+            "receiptHandle": f"handle-{index}",
+            "body": dumps(body),
+            "attributes": {"ApproximateReceiveCount": "1"},
+            "messageAttributes": {},
+            "eventSource": "aws:sqs",
+            "eventSourceARN": "arn:aws:sqs:eu-central-1:123456789012:test_queue",
+            "awsRegion": "eu-central-1",
+        }
+        if message_group_ids:
+            record["attributes"]["MessageGroupId"] = message_group_ids[index]
+        records.append(record)
+    return {"Records": records}
+
+
+def not_found(key):
+    return FileNotFoundError(
+        {
+            "statusCode": 404,
+            "body": f"{key} not found",
+            "headers": {"Content-Type": "text/plain"},
+        }
+    )
+
+
+def test_every_record_processed_with_parsed_body(sqs_environ):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    processed = list()
+    lock = Lock()
+
+    @aws_serverless_wrapper(SQS_BATCH=True)
+    def sqs_handler(record):
+        with lock:
+            processed.append(record["body"]["key"])
+
+    response = sqs_handler(compose_sqs_event(*({"key": i} for i in range(5))), context)
+
+    assert response == {"batchItemFailures": []}
+    assert sorted(processed) == [0, 1, 2, 3, 4]
+
+
+def test_only_failed_records_reported(sqs_environ):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    @aws_serverless_wrapper(SQS_BATCH={"MAX_WORKERS": 2})
+    def sqs_handler(record):
+        if record["body"]["key"] % 2:
+            raise not_found(record["body"]["key"])
+
+    response = sqs_handler(compose_sqs_event(*({"key": i} for i in range(5))), context)
+
+    assert response == {"batchItemFailures": [{"itemIdentifier": "message-1"}, {"itemIdentifier": "message-3"}]}
+
+
+def test_unparsable_record_reported(sqs_environ):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    @aws_serverless_wrapper(SQS_BATCH=True)
+    def sqs_handler(record):
+        pass
+
+    event = compose_sqs_event({"key": 0}, {"key": 1})
+    event["Records"][1]["body"] = "{no json"
+
+    assert sqs_handler(event, context) == {"batchItemFailures": [{"itemIdentifier": "message-1"}]}
+
+
+def test_records_processed_concurrently(sqs_environ):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    barrier = Barrier(3, timeout=5)
+
+    @aws_serverless_wrapper(SQS_BATCH={"MAX_WORKERS": 3})
+    def sqs_handler(_):
+        barrier.wait()
+
+    assert sqs_handler(compose_sqs_event({}, {}, {}), context) == {"batchItemFailures": []}
+
+
+def test_message_group_processed_in_order_and_stopped_after_failure(sqs_environ):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    processed = list()
+    lock = Lock()
+
+    @aws_serverless_wrapper(SQS_BATCH={"MAX_WORKERS": 4, "ORDER_BY_MESSAGE_GROUP": True})
+    def sqs_handler(record):
+        with lock:
+            processed.append((record["attributes"]["MessageGroupId"], record["body"]["key"]))
+        if record["body"]["key"] == "a2":
+            raise not_found(record["body"]["key"])
+
+    event = compose_sqs_event(
+        *({"key": key} for key in ("a1", "b1", "a2", "b2", "a3", "b3")),
+        message_group_ids=["a", "b", "a", "b", "a", "b"],
+    )
+    response = sqs_handler(event, context)
+
+    assert response == {"batchItemFailures": [{"itemIdentifier": "message-2"}, {"itemIdentifier": "message-4"}]}
+    assert [key for group, key in processed if group == "a"] == ["a1", "a2"]
+    assert [key for group, key in processed if group == "b"] == ["b1", "b2", "b3"]
+
+
+def test_async_handler_in_batch_mode(sqs_environ):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+    import asyncio
+
+    @aws_serverless_wrapper(SQS_BATCH=True)
+    async def sqs_handler(record):
+        await asyncio.sleep(0)
+        if record["body"]["key"] == 1:
+            raise not_found(1)
+
+    response = sqs_handler(compose_sqs_event(*({"key": i} for i in range(4))), context)
+
+    assert response == {"batchItemFailures": [{"itemIdentifier": "message-1"}]}
+
+
+def test_sqs_event_passed_on_without_batch_mode(sqs_environ):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    event = compose_sqs_event({"key": 0})
+
+    @aws_serverless_wrapper(API_INPUT_VERIFICATION=False, API_RESPONSE_VERIFICATION=False)
+    def sqs_handler(event_data):
+        assert event_data == event
+
+    assert sqs_handler(event, context) == {"statusCode": 200}
+
+
+def test_reraised_exception_fails_only_its_record(sqs_environ, caplog):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    @aws_serverless_wrapper(SQS_BATCH={"MAX_WORKERS": 2})
+    def sqs_handler(record):
+        if record["body"]["key"] == 1:
+            # re-raised by handle_exception
+            raise TypeError("Can't instantiate abstract class Handler")
+
+    response = sqs_handler(compose_sqs_event(*({"key": i} for i in range(3))), context)
+
+    assert response == {"batchItemFailures": [{"itemIdentifier": "message-1"}]}
+    assert "processing record message-1 failed" in caplog.text
+
+
+def test_records_of_event_not_altered(sqs_environ):
+    from copy import deepcopy
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    @aws_serverless_wrapper(SQS_BATCH=True)
+    def sqs_handler(record):
+        pass
+
+    event = compose_sqs_event({"key": 0}, {"key": 1})
+    original = deepcopy(event)
+    sqs_handler(event, context)
+
+    assert event == original
+
+
+def test_failed_record_sent_to_error_sink_without_input_verification(sqs_environ, monkeypatch):
+    from aws_serverless_wrapper import aws_serverless_wrapper, error_logging
+
+    sent = list()
+    monkeypatch.setattr(error_logging, "_send_to_sinks", lambda config, item: sent.append(item))
+
+    @aws_serverless_wrapper(SQS_BATCH=True, API_INPUT_VERIFICATION=False)
+    def sqs_handler(record):
+        raise not_found(record["body"]["key"])
+
+    response = sqs_handler(compose_sqs_event({"key": 0}), context)
+
+    assert response == {"batchItemFailures": [{"itemIdentifier": "message-0"}]}
+    (item,) = sent
+    assert item["statusCode"] == 404
+    assert item["body"] == "0 not found"
@@ -0,0 +1,36 @@
+from pytest import mark
+from aws_serverless_wrapper._status_codes import status_phrase, status_code_of
+
+
+@mark.parametrize(
+    ("status_code", "phrase"),
+    (
+        (400, "Bad Request"),
+        (402, "Payment Required"),
+        (404, "Not Found"),
+        (413, "Request Entity Too Large"),
+        (418, "Im A Teapot"),
+        (422, "Unprocessable Entity"),
+        (500, "Internal Server Error"),
+        (501, "Not Implemented"),
+    )
+)
+def test_status_phrase(status_code, phrase):
+    assert status_phrase(status_code) == phrase
+
+
+@mark.parametrize(
+    ("name", "status_code"),
+    (
+        ("Unauthorized", 401),
+        ("payment", 402),
+        ("Payment Required", 402),
+        ("not found", 404),
+        ("teapot", 418),
+        ("precondition", 428),
+        ("unprocessable content", 422),
+        ("some unexpected exception", None),
+    )
+)
+def test_status_code_of(name, status_code):
+    assert status_code_of(name) == status_code
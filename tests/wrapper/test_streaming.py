@@ -0,0 +1,201 @@
+from json import loads
+from os import environ as os_environ
+from pytest import fixture
+from aws_serverless_wrapper._environ_variables import environ
+from aws_serverless_wrapper._streaming import encode_stream, prepare_stream, streaming_sink, stream_response, BufferedSink
+from aws_serverless_wrapper.testing import fake_context as context, compose_ReST_event
+from .test_wrapper import run_from_file_directory
+
+
+@fixture
+def streaming_environ(run_from_file_directory):
+    wrapper_config_file = os_environ.pop("WRAPPER_CONFIG_FILE", None)
+    environ._load_config_from_file("api_response_wrapper_config.json")
+    yield
+    if wrapper_config_file:
+        os_environ["WRAPPER_CONFIG_FILE"] = wrapper_config_file
+
+
+def compose_event():
+    return compose_ReST_event(httpMethod="POST", resource="/test_request_no_verification")
+
+
+def test_encode_ndjson():
+    assert b"".join(encode_stream(iter([1, "two"]), "ndjson")) == b'1\n"two"\n'
+    assert [loads(line) for line in b"".join(encode_stream(iter([{"a": 1}, [2]]), "ndjson")).splitlines()] == [
+        {"a": 1},
+        [2],
+    ]
+
+
+def test_encode_json_array():
+    assert loads(b"".join(encode_stream(iter([{"a": 1}, 2, "three"]), "json_array"))) == [{"a": 1}, 2, "three"]
+    assert b"".join(encode_stream(iter([]), "json_array")) == b"[]"
+
+
+def test_encode_raw():
+    assert b"".join(encode_stream(iter(["a", b"b", bytearray(b"c")]), "raw")) == b"abc"
+
+
+def test_chunks_bounded_by_chunk_size(streaming_environ):
+    environ["STREAMING_RESPONSE"] = {"FORMAT": "raw", "CHUNK_SIZE": 10}
+    produced = list()
+
+    def records():
+        for i in range(100):
+            produced.append(i)
+            yield "x" * 4
+
+    response = prepare_stream(records())
+    # only the first chunk is produced in advance
+    assert len(produced) == 3
+
+    chunks = list(response["body"])
+    assert all(len(chunk) == 12 for chunk in chunks[:-1])
+    assert b"".join(chunks) == b"x" * 400
+    assert response["statusCode"] == 200
+    assert response["headers"] == {"Content-Type": "application/octet-stream"}
+
+
+def test_generator_returned_by_handler(streaming_environ):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    @aws_serverless_wrapper(STREAMING_RESPONSE={"SINK": "buffered"})
+    def api_basic(event_data):
+        return ({"record": i} for i in range(3))
+
+    response = api_basic(compose_event(), context)
+    assert response["statusCode"] == 200
+    assert response["headers"] == {"Content-Type": "application/x-ndjson"}
+    assert [loads(line) for line in response["body"].splitlines()] == [{"record": i} for i in range(3)]
+
+
+def test_response_with_iterator_body(streaming_environ):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    @aws_serverless_wrapper(STREAMING_RESPONSE={"SINK": "buffered", "FORMAT": "json_array"})
+    def api_basic(event_data):
+        return {"statusCode": 206, "headers": {"X-Partial": "yes"}, "body": iter(range(5))}
+
+    response = api_basic(compose_event(), context)
+    assert response == {
+        "statusCode": 206,
+        "headers": {"X-Partial": "yes", "Content-Type": "application/json"},
+        "body": response["body"],
+    }
+    assert loads(response["body"]) == [0, 1, 2, 3, 4]
+
+
+def test_regular_response_not_streamed(streaming_environ):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    @aws_serverless_wrapper(STREAMING_RESPONSE={"SINK": "buffered"}, API_RESPONSE_VERIFICATION=False)
+    def api_basic(event_data):
+        return {"statusCode": 200, "body": [1, 2], "headers": {"Content-Type": "application/json"}}
+
+    response = api_basic(compose_event(), context)
+    assert response["statusCode"] == 200
+    assert loads(response["body"]) == [1, 2]
+
+
+def test_exception_before_first_chunk_is_regular_error_response(streaming_environ):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    @aws_serverless_wrapper(STREAMING_RESPONSE={"SINK": "buffered"})
+    def api_basic(event_data):
+        def records():
+            raise FileNotFoundError(
+                {"statusCode": 404, "body": "nothing found", "headers": {"Content-Type": "text/plain"}}
+            )
+            yield
+
+        return records()
+
+    assert api_basic(compose_event(), context) == {
+        "statusCode": 404,
+        "body": "nothing found",
+        "headers": {"Content-Type": "text/plain"},
+    }
+
+
+def test_exception_while_buffering_is_regular_error_response(streaming_environ):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    @aws_serverless_wrapper(STREAMING_RESPONSE={"SINK": "buffered", "FORMAT": "json_array", "CHUNK_SIZE": 1})
+    def api_basic(event_data):
+        def records():
+            yield {"a": 1}
+            yield {"a": 2}
+            raise FileNotFoundError(
+                {"statusCode": 404, "body": "nothing found", "headers": {"Content-Type": "text/plain"}}
+            )
+
+        return records()
+
+    assert api_basic(compose_event(), context) == {
+        "statusCode": 404,
+        "body": "nothing found",
+        "headers": {"Content-Type": "text/plain"},
+    }
+
+
+class IncrementalSink(BufferedSink):
+    incremental = True
+
+
+def test_exception_while_streaming_truncates_response(streaming_environ, caplog):
+    environ["STREAMING_RESPONSE"] = {"FORMAT": "ndjson", "CHUNK_SIZE": 1}
+
+    def records():
+        yield "complete"
+        raise ValueError("broken")
+
+    response = stream_response(prepare_stream(records()), IncrementalSink())
+    assert response["body"] == '"complete"\n'
+    assert "streaming response aborted" in caplog.text
+
+
+def test_binary_stream_base64_encoded(streaming_environ):
+    from base64 import b64decode
+
+    environ["STREAMING_RESPONSE"] = {"FORMAT": "raw", "CHUNK_SIZE": 2}
+
+    response = stream_response(prepare_stream(iter([b"\xff\xfe", "text"])), BufferedSink())
+    assert response["isBase64Encoded"] is True
+    assert b64decode(response["body"]) == b"\xff\xfetext"
+
+    response = prepare_stream({"body": iter(["\u00e4"]), "headers": {"Content-Type": "text/plain"}})
+    response = stream_response(response, BufferedSink())
+    assert response["body"] == "\u00e4"
+    assert "isBase64Encoded" not in response
+
+
+def test_chunks_released_when_buffered(streaming_environ):
+    environ["STREAMING_RESPONSE"] = {"FORMAT": "ndjson", "CHUNK_SIZE": 1}
+    sink = BufferedSink()
+
+    response = stream_response(prepare_stream(iter([1, 2])), sink)
+    assert response["body"] == "1\n2\n"
+    assert sink.body is None
+
+
+def test_buffered_by_default(streaming_environ):
+    environ["STREAMING_RESPONSE"] = True
+
+    response = stream_response(prepare_stream(iter([1, 2])), streaming_sink(context))
+    assert response["body"] == "1\n2\n"
+
+
+def test_runtime_api_sink_not_used_by_managed_runtime(streaming_environ, monkeypatch, caplog):
+    from aws_serverless_wrapper import _streaming
+
+    def runtime_api_sink(_):
+        raise AssertionError("the runtime api must not be used")
+
+    monkeypatch.setitem(_streaming.sinks, "lambda", runtime_api_sink)
+    monkeypatch.setenv("AWS_EXECUTION_ENV", "AWS_Lambda_python3.11")
+    environ["STREAMING_RESPONSE"] = {"SINK": "lambda"}
+
+    response = stream_response(prepare_stream(iter([1])), streaming_sink(context))
+    assert response["body"] == "1\n"
+    assert "only possible with a custom runtime" in caplog.text
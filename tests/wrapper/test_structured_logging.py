@@ -0,0 +1,205 @@
+import logging
+from io import StringIO
+from json import loads
+from pytest import fixture
+from aws_serverless_wrapper._structured_logging import StructuredLogger, DeferredJSON
+from aws_serverless_wrapper.testing import fake_context as context
+from .test_wrapper import run_from_file_directory
+
+
+class Unserializable:
+    def __repr__(self):
+        return "<Unserializable>"
+
+
+@fixture(autouse=True)
+def info_enabled(caplog):
+    caplog.set_level(logging.INFO, logger="aws_serverless_wrapper._structured_logging")
+
+
+def test_one_json_line_per_record_with_metadata():
+    stream = StringIO()
+    logger = StructuredLogger(stream)
+    logger.bind(context)
+
+    logger.info("raw event", event={"body": "{}"})
+    logger.info("raw response", response={"statusCode": 200})
+
+    first, second = [loads(line) for line in stream.getvalue().splitlines()]
+    assert first["message"] == "raw event"
+    assert first["event"] == {"body": "{}"}
+    assert first["level"] == "INFO"
+    assert first["aws_request_id"] == context.aws_request_id
+    assert first["function_name"] == context.function_name
+    assert first["function_version"] == context.function_version
+    assert isinstance(first["timestamp"], float)
+    assert second["response"] == {"statusCode": 200}
+
+
+def test_record_serialized_only_when_emitted(monkeypatch):
+    from aws_serverless_wrapper import _structured_logging
+
+    serialized = list()
+
+    class CountingCodec:
+        @staticmethod
+        def dumps(obj):
+            serialized.append(obj)
+            return "{}"
+
+    monkeypatch.setattr(_structured_logging, "json_codec", CountingCodec)
+    stream = StringIO()
+    logger = StructuredLogger(stream)
+    event = {"body": "{}"}
+
+    record = logger.record("INFO", "raw event", event=event)
+    assert record.fields["event"] is event
+    assert serialized == []
+    assert stream.getvalue() == ""
+
+    logger.emit(record)
+    assert len(serialized) == 1
+    assert stream.getvalue() == "{}\n"
+
+
+def test_nothing_serialized_below_log_level(caplog, monkeypatch):
+    from aws_serverless_wrapper import _structured_logging
+
+    class FailingCodec:
+        @staticmethod
+        def dumps(obj):
+            raise AssertionError("must not be serialized")
+
+    monkeypatch.setattr(_structured_logging, "json_codec", FailingCodec)
+    caplog.set_level(logging.WARNING, logger="aws_serverless_wrapper._structured_logging")
+    logger = sampled_logger(0.5)
+
+    logger.info("raw event", event={"body": "{}"})
+    logger.payload({"SAMPLE_RATE": 0.01}, "raw event", event={})
+    logger.finish_invocation(500)
+
+    assert logger.stream.getvalue() == ""
+
+
+def test_unserializable_fields_logged_as_repr():
+    stream = StringIO()
+    logger = StructuredLogger(stream)
+
+    logger.info("raw event", event=Unserializable(), status=200)
+
+    record = loads(stream.getvalue())
+    assert record["event"] == "<Unserializable>"
+    assert record["status"] == 200
+
+
+def test_deferred_json_not_serialized_if_not_emitted(caplog, monkeypatch):
+    from aws_serverless_wrapper import _structured_logging
+
+    serialized = list()
+
+    class CountingCodec:
+        @staticmethod
+        def dumps(obj):
+            serialized.append(obj)
+            return '{"key": "value"}'
+
+    monkeypatch.setattr(_structured_logging, "json_codec", CountingCodec)
+    caplog.set_level(logging.ERROR)
+
+    logging.getLogger("deferred").info(DeferredJSON({"key": "value"}))
+    assert serialized == []
+
+    logging.getLogger("deferred").error(DeferredJSON({"key": "value"}))
+    assert loads(caplog.messages[0]) == {"key": "value"}
+    assert serialized
+
+
+def sampled_logger(sample_value):
+    logger = StructuredLogger(StringIO())
+    logger.start_invocation(context)
+    logger.sample_value = sample_value
+    return logger
+
+
+def logged_messages(logger):
+    return [loads(line)["message"] for line in logger.stream.getvalue().splitlines()]
+
+
+def test_sampling_decided_once_per_invocation():
+    for sample_value, expected in ((0.005, ["raw event", "raw response"]), (0.5, [])):
+        logger = sampled_logger(sample_value)
+        logger.payload({"SAMPLE_RATE": 0.01, "ALWAYS_ON_ERROR": False}, "raw event", event={})
+        logger.finish_invocation(200)
+        logger.payload({"SAMPLE_RATE": 0.01, "ALWAYS_ON_ERROR": False}, "raw response", response={})
+        assert logged_messages(logger) == expected
+
+
+def test_boolean_flag_logs_every_invocation():
+    logger = sampled_logger(0.999)
+    logger.payload(True, "raw event", event={})
+    assert logged_messages(logger) == ["raw event"]
+
+
+def test_not_sampled_payloads_logged_on_5xx():
+    logger = sampled_logger(0.5)
+    event = {"body": "raw"}
+    logger.payload({"SAMPLE_RATE": 0.01}, "raw event", event=event)
+    event["body"] = {"parsed": True}
+    assert logged_messages(logger) == []
+
+    logger.finish_invocation(502)
+    logger.payload({"SAMPLE_RATE": 0.01}, "raw response", response={"statusCode": 502})
+
+    assert logged_messages(logger) == ["raw event", "raw response"]
+    assert loads(logger.stream.getvalue().splitlines()[0])["event"] == {"body": "raw"}
+
+
+def test_not_sampled_payloads_dropped_without_error():
+    logger = sampled_logger(0.5)
+    logger.payload({"SAMPLE_RATE": 0.01}, "raw event", event={})
+    logger.finish_invocation(404)
+    logger.payload({"SAMPLE_RATE": 0.01}, "raw response", response={"statusCode": 404})
+    assert logged_messages(logger) == []
+    assert logger.deferred == []
+
+
+def test_payload_truncated_to_max_size():
+    logger = sampled_logger(0.0)
+    logger.payload({"MAX_SIZE": 20}, "raw event", event={"body": "x" * 1000, "headers": {}})
+    logger.payload({"MAX_SIZE": 20}, "raw response", response=["y" * 50])
+    logger.payload({"MAX_SIZE": 20}, "small response", response={"statusCode": 200})
+
+    event, response, small = [loads(line) for line in logger.stream.getvalue().splitlines()]
+    assert event["event"].startswith('{"body": "xxxxxxxxxx')
+    assert event["event"].endswith("characters]")
+    assert len(event["event"]) < 100
+    assert response["response"] == '["yyyyyyyyyyyyyyyyyy...[truncated 34 characters]'
+    assert small["response"] == {"statusCode": 200}
+
+
+def test_sampled_logging_through_wrapper(run_from_file_directory, capsys, monkeypatch):
+    from aws_serverless_wrapper import _structured_logging
+    from aws_serverless_wrapper._environ_variables import environ
+    from aws_serverless_wrapper.serverless_handler import LambdaHandlerOfFunction
+    from aws_serverless_wrapper.testing import compose_ReST_event
+
+    monkeypatch.delenv("WRAPPER_CONFIG_FILE", raising=False)
+    monkeypatch.setattr(_structured_logging, "random", lambda: 0.5)
+    environ._load_config_from_file("api_response_wrapper_config.json")
+    log_config = {"SAMPLE_RATE": 0.1}
+
+    def api(event):
+        if event["body"]["fail"]:
+            raise Exception({"statusCode": 503, "body": "unavailable", "headers": {"Content-Type": "text/plain"}})
+        return {"statusCode": 200, "body": "ok", "headers": {"Content-Type": "text/plain"}}
+
+    for fail in (False, True):
+        event = compose_ReST_event(httpMethod="POST", resource="/test_request_no_verification", body={"fail": fail})
+        event["headers"] = {"content-type": "application/json"}
+        LambdaHandlerOfFunction(
+            api, LOG_RAW_EVENT=log_config, LOG_RAW_RESPONSE=log_config, API_RESPONSE_VERIFICATION=False
+        ).wrap_lambda(event, context)
+
+    records = [loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [record["message"] for record in records] == ["raw event", "raw response"]
+    assert records[1]["response"]["statusCode"] == 503
@@ -0,0 +1,128 @@
+from pytest import fixture, raises
+from os import utime, environ as os_environ
+from json import dump, load
+from shutil import copy
+from aws_serverless_wrapper._environ_variables import environ
+from aws_serverless_wrapper.testing import fake_context as context, compose_ReST_event
+from .test_api_responses import run_from_file_directory
+
+request_schema = "../schema_validation/test_data/api/test_request_resource||{path_level1}||{path_level2}-POST.json"
+
+
+@fixture
+def validator_cache(run_from_file_directory):
+    from aws_serverless_wrapper._api_validation import validator_cache
+
+    wrapper_config_file = os_environ.pop("WRAPPER_CONFIG_FILE", None)
+    environ._load_config_from_file("api_response_wrapper_config.json")
+    validator_cache.clear()
+    yield validator_cache
+    validator_cache.clear()
+    if wrapper_config_file:
+        os_environ["WRAPPER_CONFIG_FILE"] = wrapper_config_file
+
+
+def compose_event(parsed=False):
+    from aws_serverless_wrapper._body_parsing import parse_body
+
+    event = compose_ReST_event(
+        httpMethod="POST",
+        resource="/test_request_resource/{path_level1}/{path_level2}",
+        pathParameters={"path_level1": "path_value1", "path_level2": "path_value2"},
+        body={"body_key1": "some_string"},
+    )
+    return parse_body(event) if parsed else event
+
+
+def test_validator_reused_across_invocations(validator_cache):
+    from aws_serverless_wrapper.serverless_handler import LambdaHandlerOfFunction
+
+    def api_basic(_):
+        pass
+
+    for _ in range(3):
+        response = LambdaHandlerOfFunction(api_basic, API_RESPONSE_VERIFICATION=False).wrap_lambda(
+            compose_event(), context
+        )
+        assert response == {"statusCode": 200}
+
+    assert validator_cache.misses == 1
+    assert validator_cache.hits == 2
+    assert len(validator_cache) == 1
+
+
+def test_request_and_response_cached_separately(validator_cache):
+    from aws_serverless_wrapper._api_validation import verify_api_input, verify_api_response
+    from aws_serverless_wrapper._body_parsing import parse_body
+
+    event = compose_ReST_event(
+        httpMethod="POST",
+        resource="/test_response_resource",
+        body={"response_statusCode": 200, "response_body": "single_allowed_answer"},
+    )
+    verify_api_input(parse_body(event), "/test_response_resource", "file", "../schema_validation/test_data/api/")
+    verify_api_response(
+        {"statusCode": 200, "body": "single_allowed_answer", "headers": {"Content-Type": "text/plain"}},
+        "POST", "/test_response_resource", "file", "../schema_validation/test_data/response/",
+    )
+
+    assert validator_cache.stats() == {"hits": 0, "misses": 2, "size": 2, "maxsize": 64}
+
+
+def test_missing_schema_cached_until_created(validator_cache, tmp_path):
+    from aws_serverless_wrapper._api_validation import verify_api_input
+
+    for _ in range(2):
+        with raises(NotImplementedError) as NE:
+            verify_api_input(
+                compose_event(parsed=True), "/test_request_resource/{path_level1}/{path_level2}", "file", f"{tmp_path}/"
+            )
+        assert NE.value.args[0]["statusCode"] == 501
+
+    assert validator_cache.stats()["misses"] == 1
+    assert validator_cache.stats()["hits"] == 1
+
+    copy(request_schema, tmp_path / "test_request_resource||{path_level1}||{path_level2}-POST.json")
+    verify_api_input(
+        compose_event(parsed=True), "/test_request_resource/{path_level1}/{path_level2}", "file", f"{tmp_path}/"
+    )
+    assert validator_cache.stats()["misses"] == 2
+
+
+def test_least_recently_used_validator_evicted(validator_cache):
+    from aws_serverless_wrapper._api_validation import ValidatorCache
+
+    cache = ValidatorCache(maxsize=2)
+    for key in ("a", "b", "a", "c"):
+        cache.get((key,), "file", request_schema)
+
+    assert ("a",) in cache
+    assert ("b",) not in cache
+    assert ("c",) in cache
+    assert cache.stats() == {"hits": 1, "misses": 3, "size": 2, "maxsize": 2}
+
+
+def test_validator_reloaded_on_changed_schema_file(validator_cache, tmp_path):
+    from aws_serverless_wrapper._api_validation import verify_api_input
+
+    schema_file = tmp_path / "test_request_resource||{path_level1}||{path_level2}-POST.json"
+    copy(request_schema, schema_file)
+
+    verify_api_input(
+        compose_event(parsed=True), "/test_request_resource/{path_level1}/{path_level2}", "file", f"{tmp_path}/"
+    )
+
+    with open(schema_file, "r") as f:
+        schema = load(f)
+    schema["properties"]["body"]["properties"]["body_key1"]["type"] = "integer"
+    with open(schema_file, "w") as f:
+        dump(schema, f)
+    utime(schema_file, ns=(0, 0))
+
+    with raises(TypeError) as TE:
+        verify_api_input(
+            compose_event(parsed=True), "/test_request_resource/{path_level1}/{path_level2}", "file", f"{tmp_path}/"
+        )
+
+    assert TE.value.args[0]["statusCode"] == 400
+    assert validator_cache.misses == 2
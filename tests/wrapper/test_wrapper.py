@@ -156,3 +156,67 @@ def test_wrapper_with_charset_utf8_content_type(run_from_file_directory):
 
     response = api_basic(event, context)
     assert response["statusCode"] == 200
+
+
+def test_invalid_config_raises_at_decoration(run_from_file_directory):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+    from aws_serverless_wrapper.serverless_handler import __file__ as handler_file
+    from jsonschema.exceptions import ValidationError
+    from json import load
+
+    environ._load_config_from_file("api_response_wrapper_config.json")
+    with open(f"{dirname(realpath(handler_file))}/wrapper_config_schema.json", "r") as f:
+        environ.set_schema(load(f))
+
+    with raises(ValidationError):
+        @aws_serverless_wrapper(LOG_PARSED_EVENT=True, PARSE_BODY=False)
+        def api_basic(event_data):
+            pass
+
+
+def test_stages_selected_once_for_warm_invocations(run_from_file_directory, monkeypatch):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+    from aws_serverless_wrapper.serverless_handler import PipelineStages
+
+    environ._load_config_from_file("api_response_wrapper_config.json")
+
+    selections = list()
+    from_environ = PipelineStages.from_environ.__func__
+
+    def counting_from_environ(cls):
+        selections.append(1)
+        return from_environ(cls)
+
+    monkeypatch.setattr(PipelineStages, "from_environ", classmethod(counting_from_environ))
+
+    @aws_serverless_wrapper(API_RESPONSE_VERIFICATION=False)
+    def api_basic(event_data):
+        pass
+
+    for _ in range(3):
+        event = load_single(f"../schema_validation/test_data/api/request_basic.json")
+        assert api_basic(event, context)["statusCode"] == 200
+
+    assert len(selections) == 1
+
+
+def test_stages_reselected_after_environ_change(run_from_file_directory):
+    from aws_serverless_wrapper import aws_serverless_wrapper
+
+    environ._load_config_from_file("api_response_wrapper_config.json")
+
+    @aws_serverless_wrapper
+    def api_basic(event_data):
+        return {
+            "statusCode": 200,
+            "body": {"key": "value"},
+            "headers": {"Content-Type": "application/json"},
+        }
+
+    event = load_single(f"../schema_validation/test_data/api/request_basic.json")
+    environ["API_RESPONSE_VERIFICATION"] = False
+    assert api_basic(event, context)["body"] == '{"key": "value"}'
+
+    environ["PARSE_RESPONSE_BODY"] = False
+    event = load_single(f"../schema_validation/test_data/api/request_basic.json")
+    assert api_basic(event, context)["body"] == {"key": "value"}